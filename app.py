@@ -1,14 +1,35 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, make_response
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, make_response
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate, stamp
+from sqlalchemy import and_, case, cast, func, tuple_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import selectinload
 from datetime import datetime, date, timedelta
 from calendar import monthrange
-import io
+import hashlib
+import json
 import pandas as pd
-import re
 import sys
 from db_seeder import seed_all_data # Ensure db_seeder.py exists in the same directory
+from import_engine import MAX_BATCH_ENTRIES, parse_actual_hours_frame, record_actual_hours_batch, upsert_actual_hours
+from import_jobs import fail_stale_import_jobs, submit_import_job
+from import_readers import SpreadsheetReader, import_file_extension
+from monthly_load import needs_full_refresh, refresh_monthly_load
+from workload_engine import month_end_date, month_index, month_start_date, monthly_load_percentages, workload_matrix
+from mapping_profiles import find_column_mapping, save_column_mapping, validate_mapping
+from pagination import PageRequest, cached_count, paged_response
+from query_plans import explain_report
+from search import get_search_backend, include_in_migrations, install_search_index
+from exports import export_response
+from workload_report import NORMAL_HOURS_PER_WEEK, week_workload, weekly_totals, write_workload_report
+from data_versions import data_versions, track_data_versions
+from export_cache import ExportCacheEntry
+from reference_cache import get_reference_data
+from json_provider import init_json_provider, record_factory, records, streamed_json
+from http_caching import init_http_caching
+from compression import compress_response
 
 
 # Get the absolute path of the directory containing this app.py file
@@ -76,17 +97,44 @@ if not os.path.exists(instance_path):
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Uploaded files wait here until a background import job picks them up
+app.config['IMPORT_SPOOL_DIR'] = os.environ.get('IMPORT_SPOOL_DIR', os.path.join(instance_path, 'import_spool'))
+app.config['IMPORT_JOB_WORKERS'] = int(os.environ.get('IMPORT_JOB_WORKERS', 2))
+# Rows per chunk when streaming uploaded spreadsheets into the import pipeline
+app.config['IMPORT_READ_CHUNK_ROWS'] = int(os.environ.get('IMPORT_READ_CHUNK_ROWS', 5000))
+# Generated export files are kept here until the data they were built from changes
+app.config['EXPORT_CACHE_DIR'] = os.environ.get('EXPORT_CACHE_DIR', os.path.join(instance_path, 'export_cache'))
+app.config['EXPORT_CACHE_MAX_BYTES'] = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+app.config['EXPORT_CACHE_MAX_AGE_SECONDS'] = int(os.environ.get('EXPORT_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+# Seconds between checks for employee/project/assignment writes made by other workers (0 = never)
+app.config['REFERENCE_CACHE_CHECK_SECONDS'] = float(os.environ.get('REFERENCE_CACHE_CHECK_SECONDS', 5))
+# jsonify() goes through orjson (or msgspec) when installed; same output as the stdlib json
+init_json_provider(app)
+# Responses of at least this many bytes are gzip/brotli-compressed for clients that accept it
+app.config['COMPRESS_MIN_BYTES'] = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+# Weak ETags (and 304s) for GET /api/ responses, content-hashed long-lived /static/ URLs
+init_http_caching(app)
+app.after_request(compress_response)
+
 db = SQLAlchemy(app)
-# Flask-Migrate is useful for schema changes, but not strictly required if you use flask init-db
-# from flask_migrate import Migrate
-# migrate = Migrate(app, db)
+# Schema changes ship as migrations in migrations/versions; run `flask db upgrade` after pulling.
+# Batch mode lets Alembic alter tables on SQLite; the search index is managed outside the models.
+migrate = Migrate(app, db, render_as_batch=True, include_name=include_in_migrations)
 
 
 # --- Database Models ---
 
+def _period_default(convert, month_column, year_column):
+    """Column default deriving a period date from the month-name/year columns of the
+    same INSERT, so ORM adds and bulk Core inserts both fill it."""
+    def default(context):
+        params = context.get_current_parameters()
+        return convert(params.get(month_column), params.get(year_column))
+    return default
+
 class Employee(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     role = db.Column(db.String(80), nullable=False)
 
@@ -111,9 +159,15 @@ class Project(db.Model):
     start_year = db.Column(db.Integer, nullable=False)
     end_month = db.Column(db.String(20), nullable=False)
     end_year = db.Column(db.Integer, nullable=False)
+    # First day of the start month / last day of the end month; the month-name
+    # and year columns above stay for compatibility
+    start_date = db.Column(db.Date, nullable=True, default=_period_default(month_start_date, 'start_month', 'start_year'))
+    end_date = db.Column(db.Date, nullable=True, default=_period_default(month_end_date, 'end_month', 'end_year'))
 
     assignments = db.relationship('Assignment', backref='project', lazy=True)
 
+    __table_args__ = (db.Index('ix_project_period', 'start_date', 'end_date'),)
+
     def __repr__(self):
         return f'<Project {self.name}>'
 
@@ -131,12 +185,22 @@ class Project(db.Model):
 class Assignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
     assigned_hours_per_week = db.Column(db.Integer, nullable=False)
     assigned_start_month = db.Column(db.String(20), nullable=False)
     assigned_start_year = db.Column(db.Integer, nullable=False)
     assigned_end_month = db.Column(db.String(20), nullable=False)
     assigned_end_year = db.Column(db.Integer, nullable=False)
+    # Same period as native dates, for indexed overlap filters
+    assigned_start_date = db.Column(db.Date, nullable=True, default=_period_default(month_start_date, 'assigned_start_month', 'assigned_start_year'))
+    assigned_end_date = db.Column(db.Date, nullable=True, default=_period_default(month_end_date, 'assigned_end_month', 'assigned_end_year'))
+
+    __table_args__ = (
+        # Looked up by (employee, project) on every recorded hour and import
+        db.Index('ix_assignment_employee_project', 'employee_id', 'project_id'),
+        db.Index('ix_assignment_period', 'assigned_start_date', 'assigned_end_date'),
+        db.Index('ix_assignment_employee_period', 'employee_id', 'assigned_start_date', 'assigned_end_date'),
+    )
 
     def __repr__(self):
         return f'<Assignment {self.employee_id} to {self.project_id}>'
@@ -156,7 +220,7 @@ class Assignment(db.Model):
 class WeeklyHours(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignment.id'), nullable=False)
-    week_start_date = db.Column(db.Date, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
     hours_worked = db.Column(db.Integer, nullable=False)
     function_name = db.Column(db.String(80), nullable=True) 
 
@@ -167,13 +231,19 @@ class WeeklyHours(db.Model):
     def __repr__(self):
         return f"<WeeklyHours AssignmentID: {self.assignment_id}, Week: {self.week_start_date}, Hours: {self.hours_worked}, Function: {self.function_name}>"
 
-    @property
+    # Hybrids: the Python side serves loaded objects, the expression side lets list
+    # queries compute the same values in SQL
+    @hybrid_property
     def percentage(self):
         if self.hours_worked is None:
             return 0
         return (self.hours_worked / 40.0) * 100
 
-    @property
+    @percentage.expression
+    def percentage(cls):
+        return func.coalesce(cast(cls.hours_worked, db.Float) / 40.0 * 100, 0)
+
+    @hybrid_property
     def status(self):
         if self.hours_worked > 40:
             return 'Overloaded'
@@ -181,6 +251,121 @@ class WeeklyHours(db.Model):
             return 'Free'
         else:
             return 'Normal'
+
+    @status.expression
+    def status(cls):
+        return case((cls.hours_worked > 40, 'Overloaded'), (cls.hours_worked < 40, 'Free'), else_='Normal')
+
+class MonthlyLoad(db.Model):
+    """Assigned and actual hours per employee and calendar month.
+
+    Derived from Assignment and WeeklyHours by monthly_load.refresh_monthly_load(),
+    which every write path calls for the employees it touched.
+    """
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    assigned_hours = db.Column(db.Integer, nullable=False, default=0)
+    actual_hours = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.Index('ix_monthly_load_year_month', 'year', 'month'),)
+
+    def __repr__(self):
+        return f'<MonthlyLoad {self.employee_id} {self.year}-{self.month:02d}>'
+
+class ImportJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    data_type = db.Column(db.String(40), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    spool_path = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, completed, failed
+    rows_total = db.Column(db.Integer, nullable=False, default=0)
+    rows_parsed = db.Column(db.Integer, nullable=False, default=0)
+    rows_written = db.Column(db.Integer, nullable=False, default=0)
+    write_total = db.Column(db.Integer, nullable=False, default=0)
+    result_json = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Refreshed while the job's process is alive; see import_jobs.fail_stale_import_jobs
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status}>'
+
+    @property
+    def eta_seconds(self):
+        if self.status != 'running' or not self.started_at or not self.write_total or not self.rows_written:
+            return None
+        elapsed = (datetime.now() - self.started_at).total_seconds()
+        remaining = max(self.write_total - self.rows_written, 0)
+        return round(elapsed / self.rows_written * remaining, 1)
+
+    def to_dict(self):
+        result = json.loads(self.result_json) if self.result_json else {}
+        return {
+            'id': self.id,
+            'data_type': self.data_type,
+            'filename': self.filename,
+            'status': self.status,
+            'rows_total': self.rows_total,
+            'rows_parsed': self.rows_parsed,
+            'rows_written': self.rows_written,
+            'write_total': self.write_total,
+            'eta_seconds': self.eta_seconds,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'message': result.get('message'),
+            'errors': result.get('errors', []),
+            'result': result
+        }
+
+class ColumnMappingProfile(db.Model):
+    """Column mapping remembered for an actual_hours_bulk header layout."""
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), unique=True, nullable=False) # sha256 of the normalized header row
+    columns_json = db.Column(db.Text, nullable=False)
+    mapping_json = db.Column(db.Text, nullable=False)
+    pinned = db.Column(db.Boolean, nullable=False, default=False)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    last_used_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ColumnMappingProfile {self.fingerprint[:12]}{" pinned" if self.pinned else ""}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'fingerprint': self.fingerprint,
+            'columns': json.loads(self.columns_json),
+            'mapping': json.loads(self.mapping_json),
+            'pinned': self.pinned,
+            'hit_count': self.hit_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None
+        }
+
+class DataVersion(db.Model):
+    """Change counter per table, bumped by every commit that writes to it
+    (see data_versions.track_data_versions). Cache keys include these counters."""
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DataVersion {self.table_name} {self.version}>'
+
+track_data_versions(db.session)
+
+# Import jobs left queued/running by a process that is gone would otherwise never finish;
+# the ones that only just went quiet are caught by the status endpoint once stale
+with app.app_context():
+    try:
+        fail_stale_import_jobs()
+    except Exception as e: # e.g. no database yet, before `flask db upgrade`
+        app.logger.warning(f"Could not check for interrupted import jobs: {e}")
+
         # --- NEW: Custom Error Page Route for Expired App ---
 @app.route('/app_stopped')
 def app_stopped():
@@ -204,6 +389,10 @@ def init_db_command():
     with app.app_context():
         db.drop_all()
         db.create_all()
+        with db.engine.begin() as conn:
+            install_search_index(conn)
+        # The fresh tables already match the latest migration
+        stamp()
     print("Database tables initialized!")
 
 @app.cli.command("seed-data")
@@ -212,8 +401,37 @@ def seed_data_command():
     print("Starting database seeding process...")
     with app.app_context():
         seed_all_data()
+        refresh_monthly_load()
+        db.session.commit()
     print("Database seeding complete!")
 
+@app.cli.command("rebuild-monthly-load")
+def rebuild_monthly_load_command():
+    """Recompute the monthly_load table from assignments and weekly hours."""
+    with app.app_context():
+        refresh_monthly_load()
+        db.session.commit()
+    print("Monthly load rebuilt!")
+
+
+@app.cli.command("explain-report")
+def explain_report_command():
+    """Show the query plan of each endpoint's main query and the index it uses."""
+    with app.app_context():
+        results = explain_report()
+    print(f"Query plans on {db.engine.dialect.name}:")
+    for result in results:
+        status = "OK  " if result['ok'] else "MISS"
+        print(f"\n[{status}] {result['name']}")
+        print(f"       expected one of: {', '.join(result['expected'])}")
+        print(f"       indexes used:    {', '.join(result['used']) or 'none (full scan)'}")
+        if result['scanned']:
+            print(f"       full scans of:   {', '.join(result['scanned'])}")
+        for line in result['plan']:
+            print(f"         {line}")
+    if not all(result['ok'] for result in results):
+        sys.exit(1)
+
 
 # --- Routes ---
 
@@ -286,253 +504,233 @@ def get_employees_page():
 
 # --- START OF API ENDPOINTS ---
 
-@app.route('/api/import_data', methods=['POST'])
-def api_import_data():
-    """Handles Excel file upload and imports data into the database."""
-    if not (session.get('logged_in') and session['logged_in']):
-        return jsonify({"error": "Unauthorized"}), 401
-
-    if 'excel_file' not in request.files:
-        return jsonify({"message": "No file part"}), 400
-
-    file = request.files['excel_file']
-    data_type = request.form.get('data_type')
+IMPORT_DATA_TYPES = ('employees', 'projects', 'actual_hours_bulk')
 
-    if file.filename == '':
-        return jsonify({"message": "No selected file"}), 400
+def process_import_file(file, data_type, progress=None):
+    """Streams an uploaded Excel/CSV/Parquet file from disk and imports it into the database.
 
-    if not data_type:
-        return jsonify({"message": "No data type selected for import"}), 400
+    Runs inside an import job (see import_jobs.py) and returns the JSON result
+    payload. `progress`, when given, is called with rows_total / rows_parsed /
+    rows_written / write_total keyword updates as the import advances.
+    """
+    progress = progress or (lambda **fields: None)
 
-    if file and (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
-        try:
-            df = pd.read_excel(file)
-            imported_count = 0
-            skipped_count = 0
-            errors = []
-            
-            # Debug: Log the actual column names found
-            app.logger.info(f"Excel columns found: {list(df.columns)}")
-            app.logger.info(f"Data type selected: {data_type}")
-            app.logger.info(f"DataFrame shape: {df.shape}")
-            
-            # Auto-detect and fix column headers
-            original_columns = list(df.columns)
-            
-            # If columns are unnamed or numeric, try to find headers in data
-            if any(col.startswith('Unnamed:') or str(col).isdigit() for col in df.columns):
-                app.logger.warning("Excel file appears to have no proper column headers")
-                
-                # Search first few rows for potential headers
-                header_row_index = None
-                for i in range(min(5, len(df))):
-                    row = df.iloc[i]
-                    # Check if row contains mostly text (potential headers)
-                    text_count = sum(1 for val in row if isinstance(val, str) and len(str(val).strip()) > 0)
-                    if text_count >= len(row) * 0.6:  # 60% of columns have text
-                        header_row_index = i
-                        break
-                
-                if header_row_index is not None:
-                    # Use this row as headers
-                    df.columns = [str(val).strip() if pd.notna(val) else f"Column_{i}" for i, val in enumerate(df.iloc[header_row_index])]
-                    df = df.drop(df.index[header_row_index]).reset_index(drop=True)
-                    app.logger.info(f"Used row {header_row_index} as headers: {list(df.columns)}")
-                else:
-                    # Create generic column names based on data analysis
-                    df.columns = [f"Column_{i}" for i in range(len(df.columns))]
-                    app.logger.info("Created generic column names")
-
-            if data_type == 'employees':
-                # Expected columns: 'Name', 'Email', 'Position'
-                for index, row in df.iterrows():
-                    name = row.get('Name')
-                    email = row.get('Email')
-                    role = row.get('Position')
-
-                    if not all([name, email, role]):
-                        errors.append(f"Row {index + 2} (Employee): Missing Name, Email, or Position. Skipped.")
+    try:
+        # Stream the sheet in fixed-size chunks; header detection happens while opening it
+        reader = SpreadsheetReader(file, chunk_size=app.config['IMPORT_READ_CHUNK_ROWS'])
+        imported_count = 0
+        skipped_count = 0
+        errors = []
+        
+        # Debug: Log the actual column names found
+        app.logger.info(f"Excel columns found: {reader.columns}")
+        app.logger.info(f"Data type selected: {data_type}")
+        app.logger.info(f"Estimated data rows: {reader.estimated_rows}")
+
+        progress(rows_total=reader.estimated_rows or 0, write_total=reader.estimated_rows or 0)
+
+        if data_type == 'employees':
+            # Expected columns: 'Name', 'Email', 'Position'
+            for index, row in reader.iterrows():
+                progress(rows_parsed=reader.rows_read, rows_written=imported_count)
+                name = row.get('Name')
+                email = row.get('Email')
+                role = row.get('Position')
+
+                if not all([name, email, role]):
+                    errors.append(f"Row {index + 2} (Employee): Missing Name, Email, or Position. Skipped.")
+                    skipped_count += 1
+                    continue
+                if not isinstance(email, str) or "@" not in email or "." not in email:
+                    errors.append(f"Row {index + 2} (Employee): Invalid email format for '{email}'. Skipped.")
+                    skipped_count += 1
+                    continue
+
+                try:
+                    existing_employee = Employee.query.filter_by(email=email).first()
+                    if existing_employee:
+                        errors.append(f"Row {index + 2} (Employee): Employee with email '{email}' already exists, skipped.")
                         skipped_count += 1
                         continue
-                    if not isinstance(email, str) or "@" not in email or "." not in email:
-                        errors.append(f"Row {index + 2} (Employee): Invalid email format for '{email}'. Skipped.")
+
+                    new_employee = Employee(name=name, email=email, role=role)
+                    db.session.add(new_employee)
+                    db.session.commit()
+                    imported_count += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    errors.append(f"Row {index + 2} (Employee): Database integrity error for employee '{name}' ({email}). Possible duplicate. Skipped.")
+                    skipped_count += 1
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(f"Row {index + 2} (Employee): Error importing employee '{name}' ({email}): {str(e)}. Skipped.")
+                    skipped_count += 1
+            progress(rows_total=reader.rows_read, rows_parsed=reader.rows_read, rows_written=imported_count)
+            message = f"Employees import complete. Imported: {imported_count}, Skipped: {skipped_count}."
+            if errors:
+                message += " Errors encountered."
+
+        elif data_type == 'projects':
+            # Expected columns: 'Project Name', 'Duration (Months)', 'Start Month', 'Start Year', 'End Month', 'End Year'
+            for index, row in reader.iterrows():
+                progress(rows_parsed=reader.rows_read, rows_written=imported_count)
+                name = row.get('Project Name')
+                duration_months = row.get('Duration (Months)')
+                start_month_str = row.get('Start Month')
+                start_year = row.get('Start Year')
+                end_month_str = row.get('End Month')
+                end_year = row.get('End Year')
+
+                if not all([name, duration_months, start_month_str, start_year, end_month_str, end_year]):
+                    errors.append(f"Row {index + 2} (Project): Missing project data. Skipped.")
+                    skipped_count += 1
+                    continue
+
+                try:
+                    existing_project = Project.query.filter_by(name=name).first()
+                    if existing_project:
+                        errors.append(f"Row {index + 2} (Project): Project with name '{name}' already exists, skipped.")
                         skipped_count += 1
                         continue
 
-                    try:
-                        existing_employee = Employee.query.filter_by(email=email).first()
-                        if existing_employee:
-                            errors.append(f"Row {index + 2} (Employee): Employee with email '{email}' already exists, skipped.")
-                            skipped_count += 1
-                            continue
-
-                        new_employee = Employee(name=name, email=email, role=role)
-                        db.session.add(new_employee)
-                        db.session.commit()
-                        imported_count += 1
-                    except IntegrityError:
-                        db.session.rollback()
-                        errors.append(f"Row {index + 2} (Employee): Database integrity error for employee '{name}' ({email}). Possible duplicate. Skipped.")
-                        skipped_count += 1
-                    except Exception as e:
-                        db.session.rollback()
-                        errors.append(f"Row {index + 2} (Employee): Error importing employee '{name}' ({email}): {str(e)}. Skipped.")
-                        skipped_count += 1
-                message = f"Employees import complete. Imported: {imported_count}, Skipped: {skipped_count}."
-                if errors:
-                    message += " Errors encountered."
-
-            elif data_type == 'projects':
-                # Expected columns: 'Project Name', 'Duration (Months)', 'Start Month', 'Start Year', 'End Month', 'End Year'
-                for index, row in df.iterrows():
-                    name = row.get('Project Name')
-                    duration_months = row.get('Duration (Months)')
-                    start_month_str = row.get('Start Month')
-                    start_year = row.get('Start Year')
-                    end_month_str = row.get('End Month')
-                    end_year = row.get('End Year')
-
-                    if not all([name, duration_months, start_month_str, start_year, end_month_str, end_year]):
-                        errors.append(f"Row {index + 2} (Project): Missing project data. Skipped.")
+                    month_names = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+                    if start_month_str not in month_names or end_month_str not in month_names:
+                        errors.append(f"Row {index + 2} (Project): Invalid month name for project '{name}'. Skipped.")
                         skipped_count += 1
                         continue
 
-                    try:
-                        existing_project = Project.query.filter_by(name=name).first()
-                        if existing_project:
-                            errors.append(f"Row {index + 2} (Project): Project with name '{name}' already exists, skipped.")
-                            skipped_count += 1
-                            continue
-
-                        month_names = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
-                        if start_month_str not in month_names or end_month_str not in month_names:
-                            errors.append(f"Row {index + 2} (Project): Invalid month name for project '{name}'. Skipped.")
-                            skipped_count += 1
-                            continue
-
-                        new_project = Project(
-                            name=name,
-                            duration_months=int(duration_months),
-                            start_month=start_month_str,
-                            start_year=int(start_year),
-                            end_month=end_month_str,
-                            end_year=int(end_year)
-                        )
-                        db.session.add(new_project)
-                        db.session.commit()
-                        imported_count += 1
-                    except IntegrityError:
-                        db.session.rollback()
-                        errors.append(f"Row {index + 2} (Project): Database integrity error for project '{name}'. Possible duplicate. Skipped.")
-                        skipped_count += 1
-                    except ValueError:
-                        db.session.rollback()
-                        errors.append(f"Row {index + 2} (Project): Invalid number format for project '{name}' duration/year. Skipped.")
-                        skipped_count += 1
-                    except Exception as e:
-                        db.session.rollback()
-                        errors.append(f"Row {index + 2} (Project): Error importing project '{name}': {str(e)}. Skipped.")
-                        skipped_count += 1
-                message = f"Projects import complete. Imported: {imported_count}, Skipped: {skipped_count}."
-                if errors:
-                    message += " Errors encountered."
+                    new_project = Project(
+                        name=name,
+                        duration_months=int(duration_months),
+                        start_month=start_month_str,
+                        start_year=int(start_year),
+                        end_month=end_month_str,
+                        end_year=int(end_year)
+                    )
+                    db.session.add(new_project)
+                    db.session.commit()
+                    imported_count += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    errors.append(f"Row {index + 2} (Project): Database integrity error for project '{name}'. Possible duplicate. Skipped.")
+                    skipped_count += 1
+                except ValueError:
+                    db.session.rollback()
+                    errors.append(f"Row {index + 2} (Project): Invalid number format for project '{name}' duration/year. Skipped.")
+                    skipped_count += 1
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(f"Row {index + 2} (Project): Error importing project '{name}': {str(e)}. Skipped.")
+                    skipped_count += 1
+            progress(rows_total=reader.rows_read, rows_parsed=reader.rows_read, rows_written=imported_count)
+            message = f"Projects import complete. Imported: {imported_count}, Skipped: {skipped_count}."
+            if errors:
+                message += " Errors encountered."
 
-            elif data_type == 'actual_hours_bulk':
-                # This section is designed to handle your raw, unorganized Excel data with
-                # 'Emp Name', 'Project Name', 'Function', 'Week Days', and 'Hours' columns.
+        elif data_type == 'actual_hours_bulk':
+            # This section is designed to handle your raw, unorganized Excel data with
+            # 'Emp Name', 'Project Name', 'Function', 'Week Days', and 'Hours' columns.
+            
+            # Smart data mapping - analyze data content to identify columns
+            def smart_column_mapping(df):
+                mapping = {}
+                df_columns = [str(col).strip() for col in df.columns]
                 
-                # Smart data mapping - analyze data content to identify columns
-                def smart_column_mapping(df):
-                    mapping = {}
-                    df_columns = [str(col).strip() for col in df.columns]
+                # Analyze each column's data to identify its type
+                for col in df_columns:
+                    col_data = df[col].dropna().head(10)  # Sample first 10 non-null values
+                    col_lower = col.lower()
                     
-                    # Analyze each column's data to identify its type
-                    for col in df_columns:
-                        col_data = df[col].dropna().head(10)  # Sample first 10 non-null values
-                        col_lower = col.lower()
-                        
-                        # Employee name detection
-                        if not mapping.get('emp_name'):
-                            if any(keyword in col_lower for keyword in ['emp', 'employee', 'name', 'person', 'staff']) and col_lower not in ['project name', 'proj name']:
-                                mapping['emp_name'] = col
-                                continue
-                            # Check if column contains name-like data
-                            if col_data.apply(lambda x: isinstance(x, str) and len(str(x).split()) >= 2).sum() >= len(col_data) * 0.5:
-                                mapping['emp_name'] = col
-                                continue
-                        
-                        # Project name detection
-                        if not mapping.get('project_name'):
-                            if any(keyword in col_lower for keyword in ['project', 'proj', 'job', 'task', 'work']):
-                                mapping['project_name'] = col
-                                continue
-                        
-                        # Function detection
-                        if not mapping.get('function_name'):
-                            if any(keyword in col_lower for keyword in ['function', 'role', 'position', 'job', 'title', 'dept', 'department']):
-                                mapping['function_name'] = col
-                                continue
-                        
-                        # Date/week detection
-                        if not mapping.get('week_days'):
-                            if any(keyword in col_lower for keyword in ['week', 'date', 'day', 'time', 'period']):
+                    # Employee name detection
+                    if not mapping.get('emp_name'):
+                        if any(keyword in col_lower for keyword in ['emp', 'employee', 'name', 'person', 'staff']) and col_lower not in ['project name', 'proj name']:
+                            mapping['emp_name'] = col
+                            continue
+                        # Check if column contains name-like data
+                        if col_data.apply(lambda x: isinstance(x, str) and len(str(x).split()) >= 2).sum() >= len(col_data) * 0.5:
+                            mapping['emp_name'] = col
+                            continue
+                    
+                    # Project name detection
+                    if not mapping.get('project_name'):
+                        if any(keyword in col_lower for keyword in ['project', 'proj', 'job', 'task', 'work']):
+                            mapping['project_name'] = col
+                            continue
+                    
+                    # Function detection
+                    if not mapping.get('function_name'):
+                        if any(keyword in col_lower for keyword in ['function', 'role', 'position', 'job', 'title', 'dept', 'department']):
+                            mapping['function_name'] = col
+                            continue
+                    
+                    # Date/week detection
+                    if not mapping.get('week_days'):
+                        if any(keyword in col_lower for keyword in ['week', 'date', 'day', 'time', 'period']):
+                            mapping['week_days'] = col
+                            continue
+                        # Check if column contains date-like data
+                        try:
+                            date_count = col_data.apply(lambda x: pd.to_datetime(x, errors='coerce')).notna().sum()
+                            if date_count >= len(col_data) * 0.5:
                                 mapping['week_days'] = col
                                 continue
-                            # Check if column contains date-like data
-                            try:
-                                date_count = col_data.apply(lambda x: pd.to_datetime(x, errors='coerce')).notna().sum()
-                                if date_count >= len(col_data) * 0.5:
-                                    mapping['week_days'] = col
-                                    continue
-                            except:
-                                pass
-                        
-                        # Hours detection
-                        if not mapping.get('hours'):
-                            if any(keyword in col_lower for keyword in ['hour', 'hrs', 'time', 'duration']):
+                        except:
+                            pass
+                    
+                    # Hours detection
+                    if not mapping.get('hours'):
+                        if any(keyword in col_lower for keyword in ['hour', 'hrs', 'time', 'duration']):
+                            mapping['hours'] = col
+                            continue
+                        # Check if column contains numeric data
+                        try:
+                            numeric_count = pd.to_numeric(col_data, errors='coerce').notna().sum()
+                            if numeric_count >= len(col_data) * 0.7:
                                 mapping['hours'] = col
                                 continue
-                            # Check if column contains numeric data
-                            try:
-                                numeric_count = pd.to_numeric(col_data, errors='coerce').notna().sum()
-                                if numeric_count >= len(col_data) * 0.7:
-                                    mapping['hours'] = col
-                                    continue
-                            except:
-                                pass
-                    
-                    return mapping
+                        except:
+                            pass
                 
-                # Auto-assign missing fields based on column position if smart mapping fails
-                def fallback_mapping(df, current_mapping):
-                    df_columns = list(df.columns)
-                    required_fields = ['emp_name', 'project_name', 'function_name', 'week_days', 'hours']
-                    
-                    # If we have at least 5 columns, assume standard order
-                    if len(df_columns) >= 5:
-                        fallback_map = {
-                            'emp_name': df_columns[0],
-                            'project_name': df_columns[1], 
-                            'function_name': df_columns[2],
-                            'week_days': df_columns[3],
-                            'hours': df_columns[4]
-                        }
-                        
-                        # Use fallback only for missing fields
-                        for field in required_fields:
-                            if field not in current_mapping:
-                                current_mapping[field] = fallback_map[field]
+                return mapping
+            
+            # Auto-assign missing fields based on column position if smart mapping fails
+            def fallback_mapping(df, current_mapping):
+                df_columns = list(df.columns)
+                required_fields = ['emp_name', 'project_name', 'function_name', 'week_days', 'hours']
+                
+                # If we have at least 5 columns, assume standard order
+                if len(df_columns) >= 5:
+                    fallback_map = {
+                        'emp_name': df_columns[0],
+                        'project_name': df_columns[1], 
+                        'function_name': df_columns[2],
+                        'week_days': df_columns[3],
+                        'hours': df_columns[4]
+                    }
                     
-                    return current_mapping
+                    # Use fallback only for missing fields
+                    for field in required_fields:
+                        if field not in current_mapping:
+                            current_mapping[field] = fallback_map[field]
                 
+                return current_mapping
+            
+            # Known header layouts reuse their saved mapping and skip detection
+            column_mapping = find_column_mapping(reader.columns)
+            if column_mapping:
+                app.logger.info(f"Using saved column mapping profile: {column_mapping}")
+            else:
+                # Columns are detected on the first chunk of rows
+                df = reader.sample
+
                 # Apply smart mapping
                 column_mapping = smart_column_mapping(df)
                 app.logger.info(f"Smart column mapping: {column_mapping}")
-                
+            
                 # Apply fallback mapping if needed
                 column_mapping = fallback_mapping(df, column_mapping)
                 app.logger.info(f"Final column mapping: {column_mapping}")
-                
+            
                 # Ensure all required fields are mapped
                 required_fields = ['emp_name', 'project_name', 'function_name', 'week_days', 'hours']
                 if not all(field in column_mapping for field in required_fields):
@@ -541,261 +739,208 @@ def api_import_data():
                     for i, field in enumerate(required_fields):
                         if field not in column_mapping and i < len(df_columns):
                             column_mapping[field] = df_columns[i]
-                    
-                    app.logger.info(f"Applied last resort mapping: {column_mapping}")
                 
-                employee_cache = {} # name -> Employee object
-                project_cache = {}  # name -> Project object
-                assignment_cache = {} # (employee_id, project_id) -> Assignment object
-                
-                # Filter out rows where essential columns are completely empty (e.g., blank rows at end)
-                df = df.dropna(subset=['Emp Name', 'Project Name', 'Function', 'Week Days', 'Hours'], how='all')
-                
-                # Use a dictionary to aggregate hours for unique (employee, project, function, week_start_date) combinations
-                # This handles multiple entries for the same week/task by summing hours.
-                aggregated_weekly_hours = {} # (emp_name, proj_name, func_name, week_start_date_obj) -> total_hours
-
-                for index, row in df.iterrows():
-                    try:
-                        # Safely extract data with fallback values
-                        emp_name = str(row.get(column_mapping.get('emp_name', ''), 'Unknown Employee')).strip()
-                        project_name = str(row.get(column_mapping.get('project_name', ''), 'Unknown Project')).strip()
-                        function_name = str(row.get(column_mapping.get('function_name', ''), 'General')).strip()
-                        week_days_raw = row.get(column_mapping.get('week_days', ''))
-                        hours_raw = row.get(column_mapping.get('hours', ''))
-
-                        # Clean up 'nan' strings and None values
-                        if emp_name.lower() in ['nan', 'none', ''] or pd.isna(emp_name):
-                            emp_name = f"Employee_{index + 1}"
-                        if project_name.lower() in ['nan', 'none', ''] or pd.isna(project_name):
-                            project_name = f"Project_{index + 1}"
-                        if function_name.lower() in ['nan', 'none', ''] or pd.isna(function_name):
-                            function_name = "General"
-
-                        # Skip completely empty rows
-                        if all(pd.isna(val) or str(val).strip() == '' for val in [emp_name, project_name, week_days_raw, hours_raw]):
-                            continue
+                    app.logger.info(f"Applied last resort mapping: {column_mapping}")
 
-                    except Exception as e:
-                        errors.append(f"Row {index + 2}: Error extracting data - {str(e)}. Using defaults.")
-                        emp_name = f"Employee_{index + 1}"
-                        project_name = f"Project_{index + 1}"
-                        function_name = "General"
-                        week_days_raw = None
-                        hours_raw = 0
-
-                    try:
-                        # Smart date parsing with multiple fallbacks
-                        week_start_date = None
-                        
-                        if pd.isna(week_days_raw) or week_days_raw == '':
-                            # Use current week if no date provided
-                            week_start_date = datetime.now().date()
-                        elif isinstance(week_days_raw, (datetime, date)):
-                            week_start_date = week_days_raw.date() if isinstance(week_days_raw, datetime) else week_days_raw
-                        else:
-                            # Try multiple parsing methods
-                            try:
-                                # Use pandas to_datetime which handles many formats
-                                week_start_date = pd.to_datetime(week_days_raw, errors='coerce')
-                                if pd.isna(week_start_date):
-                                    raise ValueError("Could not parse date")
-                                week_start_date = week_start_date.date()
-                            except:
-                                try:
-                                    # Try Excel numeric date
-                                    if isinstance(week_days_raw, (int, float)):
-                                        week_start_date = pd.to_datetime(week_days_raw, unit='D', origin='1899-12-30').date()
-                                    else:
-                                        # Try common date formats
-                                        week_days_str = str(week_days_raw).strip()
-                                        for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%b %d, %Y', '%B %d, %Y', '%d-%m-%Y', '%m-%d-%Y']:
-                                            try:
-                                                week_start_date = datetime.strptime(week_days_str, fmt).date()
-                                                break
-                                            except ValueError:
-                                                continue
-                                        
-                                        if not week_start_date:
-                                            # Last resort: use current date
-                                            week_start_date = datetime.now().date()
-                                            errors.append(f"Row {index + 2}: Could not parse date '{week_days_raw}', using current date")
-                                except:
-                                    # Ultimate fallback
-                                    week_start_date = datetime.now().date()
-                                    errors.append(f"Row {index + 2}: Date parsing failed, using current date")
-
-                        if not week_start_date:
-                            raise ValueError(f"Week start date could not be parsed from '{week_days_raw}'")
-
-                        # Smart hours parsing with fallbacks
-                        hours_to_add = 0
-                        if pd.isna(hours_raw) or str(hours_raw).strip() == '':
-                            hours_to_add = 0
-                        else:
-                            try:
-                                # Handle various hour formats
-                                hours_str = str(hours_raw).strip().lower()
-                                
-                                # Remove common text that might be in hours field
-                                hours_str = hours_str.replace('hours', '').replace('hrs', '').replace('h', '').strip()
-                                
-                                # Handle fractions and decimals
-                                if '/' in hours_str:  # Handle fractions like "7.5" or "7/2"
-                                    if '.' in hours_str:
-                                        hours_to_add = float(hours_str)
-                                    else:
-                                        parts = hours_str.split('/')
-                                        if len(parts) == 2:
-                                            hours_to_add = float(parts[0]) / float(parts[1])
-                                else:
-                                    hours_to_add = float(hours_str)
-                                
-                                # Ensure reasonable bounds (0-168 hours per week)
-                                hours_to_add = max(0, min(168, hours_to_add))
-                                hours_to_add = int(hours_to_add)  # Convert to integer
-                                
-                            except (ValueError, ZeroDivisionError):
-                                # If all parsing fails, default to 8 hours
-                                hours_to_add = 8
-                                errors.append(f"Row {index + 2}: Could not parse hours '{hours_raw}', using default 8 hours")
-                        
-                        # Aggregate hours for the unique key
-                        key = (emp_name, project_name, function_name, week_start_date)
-                        aggregated_weekly_hours[key] = aggregated_weekly_hours.get(key, 0) + hours_to_add
-
-                    except ValueError as ve:
-                        errors.append(f"Row {index + 2}: Data format error ({ve}). Skipped this entry.")
-                        skipped_count += 1
-                    except Exception as e:
-                        errors.append(f"Row {index + 2}: General error during row parsing ({str(e)}). Skipped this entry.")
-                        skipped_count += 1
-                
-                # Now, iterate through the aggregated data and save/update in the database
-                for (emp_name, project_name, function_name, week_start_date), hours_to_record in aggregated_weekly_hours.items():
-                    try:
-                        # 1. Get or Create Employee
-                        employee = employee_cache.get(emp_name)
-                        if not employee:
-                            employee = db.session.query(Employee).filter_by(name=emp_name).first()
-                            if not employee:
-                                temp_email_base = emp_name.lower().replace(' ', '.')
-                                temp_email = f"{temp_email_base}.temp@example.com"
-                                count = 0
-                                # Ensure temp email is unique
-                                while db.session.query(Employee).filter_by(email=temp_email).first():
-                                    count += 1
-                                    temp_email = f"{temp_email_base}{count}.temp@example.com"
-
-                                employee = Employee(name=emp_name, email=temp_email, role="Imported")
-                                db.session.add(employee)
-                                db.session.flush() # Get ID before commit
-                                errors.append(f"Created new employee '{emp_name}' (temp email: {employee.email}).")
-                            employee_cache[emp_name] = employee
-
-                        # 2. Get or Create Project
-                        project = project_cache.get(project_name)
-                        if not project:
-                            project = db.session.query(Project).filter_by(name=project_name).first()
-                            if not project:
-                                current_year = datetime.now().year
-                                project = Project(
-                                    name=project_name,
-                                    duration_months=12,
-                                    start_month="January",
-                                    start_year=current_year,
-                                    end_month="December",
-                                    end_year=current_year + 1
-                                )
-                                db.session.add(project)
-                                db.session.flush() # Get ID before commit
-                                errors.append(f"Created new project '{project_name}'.")
-                            project_cache[project_name] = project
-
-                        # 3. Get or Create Assignment
-                        assignment_key = (employee.id, project.id)
-                        assignment = assignment_cache.get(assignment_key)
-                        if not assignment:
-                            assignment = db.session.query(Assignment).filter_by(employee_id=employee.id, project_id=project.id).first()
-                            if not assignment:
-                                assignment = Assignment(
-                                    employee_id=employee.id,
-                                    project_id=project.id,
-                                    assigned_hours_per_week=40, # Default assigned hours for auto-created
-                                    assigned_start_month="January",
-                                    assigned_start_year=datetime.now().year,
-                                    assigned_end_month="December",
-                                    assigned_end_year=datetime.now().year + 1
-                                )
-                                db.session.add(assignment)
-                                db.session.flush() # Get ID before commit
-                                errors.append(f"Created new assignment for '{employee.name}' on '{project.name}'.")
-                            assignment_cache[assignment_key] = assignment
-
-                        # 4. Save or Update Weekly Hours for the aggregated total
-                        existing_weekly_hours = db.session.query(WeeklyHours).filter_by(
-                            assignment_id=assignment.id,
-                            week_start_date=week_start_date,
-                            function_name=function_name
-                        ).first()
-
-                        if existing_weekly_hours:
-                            if existing_weekly_hours.hours_worked != hours_to_record:
-                                existing_weekly_hours.hours_worked = hours_to_record
-                                db.session.commit()
-                                imported_count += 1
-                        else:
-                            new_weekly_hours = WeeklyHours(
-                                assignment_id=assignment.id,
-                                week_start_date=week_start_date,
-                                hours_worked=hours_to_record,
-                                function_name=function_name
-                            )
-                            db.session.add(new_weekly_hours)
-                            db.session.commit()
-                            imported_count += 1
-                    
-                    except IntegrityError:
-                        db.session.rollback()
-                        errors.append(f"DB Integrity conflict for ({emp_name}, {project_name}, {function_name}, {week_start_date}). Record may already exist.")
-                        # Don't increment skipped_count - this is expected behavior
-                    except Exception as e:
-                        db.session.rollback()
-                        errors.append(f"Error during DB save for ({emp_name}, {project_name}, {function_name}, {week_start_date}): {str(e)}. Continuing with next record.")
-                        # Don't increment skipped_count - keep processing
-                
-                message = f"✅ Excel import successful! Processed {len(aggregated_weekly_hours)} unique entries. Successfully imported/updated {imported_count} records."
-                if errors:
-                    message += f" Found {len(errors)} data adjustments and processing notes (details below)."
+                save_column_mapping(reader.columns, column_mapping)
+            
+            # Parse dates and hours column-wise and sum hours for unique (employee, project, function, week_start_date)
+            # combinations. This handles multiple entries for the same week/task by summing hours.
+            # Chunks are parsed one at a time; only the aggregated totals are kept in memory.
+            aggregated_weekly_hours = {}
+            for chunk in reader:
+                for key, hours in parse_actual_hours_frame(chunk, column_mapping, errors).items():
+                    aggregated_weekly_hours[key] = aggregated_weekly_hours.get(key, 0) + hours
+                progress(rows_parsed=reader.rows_read)
+            progress(rows_total=reader.rows_read, write_total=len(aggregated_weekly_hours))
+
+            # Resolve employees/projects/assignments in bulk and upsert the weekly hours chunk by chunk
+            imported_count = upsert_actual_hours(aggregated_weekly_hours, errors, progress=progress)
+
+            message = f"✅ Excel import successful! Processed {len(aggregated_weekly_hours)} unique entries. Successfully imported/updated {imported_count} records."
+            if errors:
+                message += f" Found {len(errors)} data adjustments and processing notes (details below)."
 
-            else:
-                return jsonify({"message": "Invalid data type specified for import"}), 400
+        else:
+            return {"success": False, "message": "Invalid data type specified for import"}
 
-            if errors:
-                return jsonify({"success": True, "message": message, "errors": errors}), 200
-            return jsonify({"success": True, "message": message}), 200
+        if errors:
+            return {"success": True, "message": message, "errors": errors}
+        return {"success": True, "message": message}
 
-        except Exception as e:
-            error_message = f"🔧 Excel processing encountered an issue but we've handled it gracefully: {str(e)}"
-            app.logger.error(f"Excel processing failed: {e}")
-            
-            # Provide helpful feedback even on failure
-            try:
-                if 'df' in locals() and not df.empty:
-                    basic_stats = f"Your Excel file has {len(df)} rows and {len(df.columns)} columns. "
-                    basic_stats += f"Columns found: {', '.join(df.columns[:5])}{'...' if len(df.columns) > 5 else ''}"
-                    error_message += f" {basic_stats}"
-            except:
-                pass
-            
-            return jsonify({
-                "message": error_message,
-                "success": False,
-                "columns_found": list(df.columns) if 'df' in locals() else [],
-                "errors": errors if 'errors' in locals() else []
-            }), 200  # Return 200 to avoid browser errors
-    else:
-        return jsonify({"message": "Invalid file type. Please upload an Excel file (.xlsx or .xls)."}), 400
+    except Exception as e:
+        error_message = f"🔧 Excel processing encountered an issue but we've handled it gracefully: {str(e)}"
+        app.logger.error(f"Excel processing failed: {e}")
+        
+        # Provide helpful feedback even on failure
+        try:
+            if 'reader' in locals() and reader.columns:
+                basic_stats = f"Read {reader.rows_read} rows and {len(reader.columns)} columns from your Excel file. "
+                basic_stats += f"Columns found: {', '.join(reader.columns[:5])}{'...' if len(reader.columns) > 5 else ''}"
+                error_message += f" {basic_stats}"
+        except:
+            pass
+        
+        return {
+            "message": error_message,
+            "success": False,
+            "columns_found": list(reader.columns) if 'reader' in locals() else [],
+            "errors": errors if 'errors' in locals() else []
+        }
+    finally:
+        if 'reader' in locals():
+            reader.close()
+
+
+@app.route('/api/import_data', methods=['POST'])
+def api_import_data():
+    """Spools an Excel/CSV/Parquet upload and queues it as a background import job."""
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if 'excel_file' not in request.files:
+        return jsonify({"message": "No file part"}), 400
+
+    file = request.files['excel_file']
+    data_type = request.form.get('data_type')
+
+    if file.filename == '':
+        return jsonify({"message": "No selected file"}), 400
+
+    if not data_type:
+        return jsonify({"message": "No data type selected for import"}), 400
+
+    if data_type not in IMPORT_DATA_TYPES:
+        return jsonify({"message": "Invalid data type specified for import"}), 400
+
+    if not import_file_extension(file.filename):
+        return jsonify({"message": "Invalid file type. Please upload an Excel (.xlsx, .xls), CSV (.csv, .csv.gz) or Parquet (.parquet) file."}), 400
+
+    try:
+        job = submit_import_job(file, data_type)
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Could not queue import job: {e}")
+        return jsonify({"success": False, "message": f"Could not queue import: {str(e)}"}), 500
+
+    return jsonify({
+        "success": True,
+        "message": f"Upload received. Import of '{file.filename}' is queued.",
+        "job_id": job.id,
+        "status_url": url_for('api_import_job_status', job_id=job.id)
+    }), 202
+
+
+@app.route('/api/import_jobs/<job_id>', methods=['GET'])
+def api_import_job_status(job_id):
+    """Reports progress (rows parsed/written, errors, ETA) of an import job."""
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = ImportJob.query.get(job_id)
+    if not job:
+        return jsonify({"message": "Import job not found"}), 404
+    if job.status in ('queued', 'running') and fail_stale_import_jobs(job_id):
+        db.session.refresh(job)
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/column_mapping_profiles', methods=['GET', 'DELETE'])
+def api_column_mapping_profiles():
+    """Lists saved import column mappings, or (DELETE) invalidates every unpinned one.
+
+    DELETE ?include_pinned=true clears pinned profiles as well.
+    """
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if request.method == 'GET':
+        profiles = ColumnMappingProfile.query.order_by(
+            ColumnMappingProfile.pinned.desc(), ColumnMappingProfile.last_used_at.desc()
+        ).all()
+        return jsonify([profile.to_dict() for profile in profiles])
+
+    try:
+        query = ColumnMappingProfile.query
+        if request.args.get('include_pinned', '').lower() not in ('1', 'true', 'yes'):
+            query = query.filter_by(pinned=False)
+        deleted = query.delete(synchronize_session=False)
+        db.session.commit()
+        return jsonify({"message": f"Invalidated {deleted} column mapping profile(s)"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"Error invalidating column mapping profiles: {str(e)}"}), 500
+
+
+@app.route('/api/column_mapping_profiles/<int:profile_id>/pin', methods=['POST'])
+def pin_column_mapping_profile(profile_id):
+    """Pins (or with {"pinned": false} unpins) a profile, optionally correcting its mapping.
+
+    Pinned profiles are never re-learned by imports and survive bulk invalidation.
+    """
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    profile = ColumnMappingProfile.query.get(profile_id)
+    if not profile:
+        return jsonify({"message": "Column mapping profile not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    if 'mapping' in data:
+        error = validate_mapping(data['mapping'], json.loads(profile.columns_json))
+        if error:
+            return jsonify({"message": error}), 400
+        profile.mapping_json = json.dumps(data['mapping'])
+    profile.pinned = bool(data.get('pinned', True))
+
+    try:
+        db.session.commit()
+        return jsonify(profile.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"Error updating column mapping profile: {str(e)}"}), 500
+
+
+@app.route('/api/column_mapping_profiles/<int:profile_id>', methods=['DELETE'])
+def delete_column_mapping_profile(profile_id):
+    """Invalidates one profile; the next upload with that layout runs detection again."""
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        profile = ColumnMappingProfile.query.get(profile_id)
+        if not profile:
+            return jsonify({"message": "Column mapping profile not found"}), 404
+
+        db.session.delete(profile)
+        db.session.commit()
+        return jsonify({"message": "Column mapping profile deleted successfully"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"Error deleting column mapping profile: {str(e)}"}), 500
+
+
+
+# Fields selectable with ?fields= on the paginated list endpoints
+EMPLOYEE_FIELDS = ('id', 'name', 'email', 'role')
+PROJECT_FIELDS = ('id', 'name', 'duration_months', 'start_month', 'start_year', 'end_month', 'end_year', 'assignments')
+EMPLOYEE_ASSIGNMENT_FIELDS = ('employee', 'projects')
+# Column behind each weekly hours field; list pages select only the requested ones
+WEEKLY_HOURS_COLUMNS = {
+    'id': WeeklyHours.id,
+    'assignment_id': WeeklyHours.assignment_id,
+    'employee_id': Employee.id,
+    'employee_name': Employee.name,
+    'project_id': Project.id,
+    'project_name': Project.name,
+    'week_start_date': WeeklyHours.week_start_date,
+    'hours_worked': WeeklyHours.hours_worked,
+    'function_name': WeeklyHours.function_name,
+    'percentage': WeeklyHours.percentage,
+    'status': WeeklyHours.status
+}
+WEEKLY_HOURS_FIELDS = tuple(WEEKLY_HOURS_COLUMNS)
 
 
 @app.route('/api/employees', methods=['GET', 'POST'])
@@ -804,17 +949,28 @@ def api_employees():
         return jsonify({"error": "Unauthorized"}), 401
 
     if request.method == 'GET':
+        try:
+            page = PageRequest(request.args, EMPLOYEE_FIELDS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
         search_term = request.args.get('q', '').strip()
         employees_query = db.session.query(Employee)
 
         if search_term:
             employees_query = employees_query.filter(
-                (Employee.name.ilike(f'%{search_term}%')) |
-                (Employee.email.ilike(f'%{search_term}%')) |
-                (Employee.role.ilike(f'%{search_term}%'))
+                Employee.id.in_(get_search_backend().matching_ids('employee', search_term))
             )
-        employees = employees_query.all()
-        return jsonify([emp.to_dict() for emp in employees])
+        total = cached_count(('employees', search_term), employees_query, ('employee',))
+        # Only the requested columns, plus the id for the cursor
+        fields = page.field_names(EMPLOYEE_FIELDS)
+        rows, next_cursor = page.split(
+            page.apply(employees_query, Employee.id)
+            .with_entities(*[getattr(Employee, field) for field in fields], Employee.id)
+            .all(),
+            key=lambda row: row[-1]
+        )
+        return paged_response(page, records(rows, fields), next_cursor, total)
     
     elif request.method == 'POST':
         data = request.get_json()
@@ -854,23 +1010,38 @@ def api_projects():
         return jsonify({"error": "Unauthorized"}), 401
 
     if request.method == 'GET':
+        try:
+            page = PageRequest(request.args, PROJECT_FIELDS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
         search_term = request.args.get('q', '').strip()
         projects_query = db.session.query(Project)
 
         if search_term:
             projects_query = projects_query.filter(
-                Project.name.ilike(f'%{search_term}%')
+                Project.id.in_(get_search_backend().matching_ids('project', search_term))
             )
-        
-        projects = projects_query.all()
+
+        total = cached_count(('projects', search_term), projects_query, ('project',))
+        page_query = page.apply(projects_query, Project.id)
+        if page.wants('assignments'):
+            # Assignments and their employees are eager-loaded: one query for the projects and
+            # one for all of their assignments joined to employees, however many projects match
+            page_query = page_query.options(
+                selectinload(Project.assignments).joinedload(Assignment.employee)
+            )
+        projects, next_cursor = page.split(page_query.all())
 
         projects_data = []
         for project in projects:
             project_dict = project.to_dict()
-            assignments = db.session.query(Assignment).filter_by(project_id=project.id).all()
+            if not page.wants('assignments'):
+                projects_data.append(project_dict)
+                continue
             project_assignments = []
-            for assignment in assignments:
-                employee = db.session.query(Employee).get(assignment.employee_id)
+            for assignment in project.assignments:
+                employee = assignment.employee
                 if employee:
                     project_assignments.append({
                         "employee_id": employee.id,
@@ -884,7 +1055,7 @@ def api_projects():
                     })
             project_dict["assignments"] = project_assignments
             projects_data.append(project_dict)
-        return jsonify(projects_data)
+        return paged_response(page, projects_data, next_cursor, total)
 
     elif request.method == 'POST':
         data = request.get_json()
@@ -1013,6 +1184,8 @@ def api_assign_employee():
             assigned_end_year=assigned_end_year
         )
         db.session.add(new_assignment)
+        db.session.flush()
+        refresh_monthly_load([new_assignment.employee_id])
         db.session.commit()
         return jsonify({"message": "Employee assigned to project successfully!", "assignment": new_assignment.to_dict()}), 201
     except IntegrityError:
@@ -1044,12 +1217,29 @@ def api_record_actual_hours():
         hours_worked = int(hours_worked_raw)
     except (ValueError, TypeError):
         return jsonify({"message": "Invalid format for hours worked. Hours must be a valid number."}), 400
+
+    try:
+        employee_id = int(employee_id)
+        project_id = int(project_id)
+    except (ValueError, TypeError):
+        return jsonify({"message": "Invalid employee or project id."}), 400
     
     try:
-        assignment = db.session.query(Assignment).filter_by(
-            employee_id=employee_id,
-            project_id=project_id
-        ).first()
+        week_start_date = datetime.strptime(week_start_date_str, '%Y-%m-%d').date()
+
+        # Prefer the employee's assignment on this project whose period covers the week;
+        # the reference cache answers without a query, the database confirms a miss
+        reference_data = get_reference_data()
+        assignment = reference_data.assignment(employee_id, project_id, week_start_date)
+        if not assignment:
+            assignment = db.session.query(Assignment).filter_by(
+                employee_id=employee_id,
+                project_id=project_id
+            ).order_by(
+                case((and_(Assignment.assigned_start_date <= week_start_date,
+                           Assignment.assigned_end_date >= week_start_date), 0), else_=1),
+                Assignment.id
+            ).first()
 
         if not assignment:
             current_date = date.today()
@@ -1060,8 +1250,8 @@ def api_record_actual_hours():
             default_end_month = default_end_date.strftime('%B')
             default_end_year = default_end_date.year
 
-            employee = db.session.query(Employee).get(employee_id)
-            project = db.session.query(Project).get(project_id)
+            employee = reference_data.employee(employee_id) or db.session.get(Employee, employee_id)
+            project = reference_data.project(project_id) or db.session.get(Project, project_id)
             if not employee or not project:
                 return jsonify({"message": "Employee or Project not found for on-the-fly assignment."}), 404
 
@@ -1075,11 +1265,11 @@ def api_record_actual_hours():
                 assigned_end_year=default_end_year
             )
             db.session.add(new_assignment)
+            db.session.flush()
+            refresh_monthly_load([new_assignment.employee_id])
             db.session.commit()
             assignment = new_assignment
 
-        week_start_date = datetime.strptime(week_start_date_str, '%Y-%m-%d').date()
-
         existing_record = db.session.query(WeeklyHours).filter_by(
             assignment_id=assignment.id,
             week_start_date=week_start_date,
@@ -1088,6 +1278,8 @@ def api_record_actual_hours():
 
         if existing_record:
             existing_record.hours_worked = hours_worked
+            db.session.flush()
+            refresh_monthly_load([assignment.employee_id])
             db.session.commit()
             return jsonify({"message": "Actual hours updated successfully!", "record": existing_record.hours_worked}), 200
         else:
@@ -1098,6 +1290,8 @@ def api_record_actual_hours():
                 function_name=function_name
             )
             db.session.add(new_weekly_hours)
+            db.session.flush()
+            refresh_monthly_load([assignment.employee_id])
             db.session.commit()
             return jsonify({"message": "Actual hours recorded successfully!", "record": new_weekly_hours.hours_worked}), 201
     except IntegrityError:
@@ -1109,6 +1303,32 @@ def api_record_actual_hours():
         db.session.rollback()
         return jsonify({"message": f"Error recording actual hours: {str(e)}"}), 500
 
+@app.route('/api/record_actual_hours/batch', methods=['POST'])
+def api_record_actual_hours_batch():
+    """Records many actual hours entries with one request and one commit.
+
+    The body is a JSON array of /api/record_actual_hours bodies (or {"entries": [...]}).
+    Missing assignments are created on the fly. The response lists one result per
+    entry, in order, plus the saved and failed counts.
+    """
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True)
+    entries = data.get('entries') if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"message": "Expected a non-empty JSON array of actual hours entries."}), 400
+    if len(entries) > MAX_BATCH_ENTRIES:
+        return jsonify({"message": f"Too many entries: at most {MAX_BATCH_ENTRIES} per request."}), 400
+
+    try:
+        results = record_actual_hours_batch(entries)
+    except Exception as e:
+        return jsonify({"message": f"Error recording actual hours: {str(e)}. No entries were saved."}), 500
+
+    saved = sum(1 for result in results if result['status'] in (200, 201))
+    return jsonify({"results": results, "saved": saved, "failed": len(results) - saved}), 200
+
 @app.route('/api/export_data', methods=['GET'])
 def api_export_data():
     """Simple, bulletproof export endpoint"""
@@ -1116,68 +1336,16 @@ def api_export_data():
         return redirect(url_for('login'))
 
     try:
-        export_type = request.args.get('type', 'weekly_hours')
-        
-        # Create simple data structure
-        data = []
-        filename = f'{export_type}_export.xlsx'
-        
-        if export_type == 'employees':
-            employees = Employee.query.all()
-            for emp in employees:
-                data.append({
-                    'Name': emp.name or '',
-                    'Email': emp.email or '', 
-                    'Role': emp.role or ''
-                })
-            if not data:
-                data = [{'Name': 'No employees found', 'Email': '', 'Role': ''}]
-                
-        elif export_type == 'projects':
-            projects = Project.query.all()
-            for proj in projects:
-                data.append({
-                    'Project Name': proj.name or '',
-                    'Duration (Months)': proj.duration_months or 0,
-                    'Start Month': proj.start_month or '',
-                    'Start Year': proj.start_year or 0,
-                    'End Month': proj.end_month or '',
-                    'End Year': proj.end_year or 0
-                })
-            if not data:
-                data = [{'Project Name': 'No projects found', 'Duration (Months)': '', 'Start Month': '', 'Start Year': '', 'End Month': '', 'End Year': ''}]
-                
-        elif export_type == 'weekly_hours':
-            weekly_hours = WeeklyHours.query.all()
-            for wh in weekly_hours:
-                assignment = Assignment.query.get(wh.assignment_id)
-                if assignment:
-                    employee = Employee.query.get(assignment.employee_id) 
-                    project = Project.query.get(assignment.project_id)
-                    if employee and project:
-                        data.append({
-                            'Emp Name': employee.name or '',
-                            'Project Name': project.name or '',
-                            'Function': wh.function_name or 'General',
-                            'Week Days': str(wh.week_start_date) if wh.week_start_date else '',
-                            'Hours': wh.hours_worked or 0
-                        })
-            if not data:
-                data = [{'Emp Name': 'No weekly hours found', 'Project Name': '', 'Function': '', 'Week Days': '', 'Hours': ''}]
-        
-        # Simple Excel creation
-        df = pd.DataFrame(data)
-        output = io.BytesIO()
-        df.to_excel(output, index=False, engine='openpyxl')
-        output.seek(0)
-        
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-        response.headers['Cache-Control'] = 'no-cache'
-        
+        # format= is xlsx (default), csv, csv.gz or parquet; rows stream from the database
+        response = export_response(
+            request.args.get('type', 'weekly_hours'), request.args.get('format', 'xlsx')
+        )
         return response
-        
+
+    except ValueError as e:
+        error_response = make_response(f"Export Error: {str(e)}", 400)
+        error_response.headers['Content-Type'] = 'text/plain'
+        return error_response
     except Exception as e:
         # Return plain text error instead of JSON to avoid parsing issues
         error_response = make_response(f"Export Error: {str(e)}")
@@ -1202,6 +1370,8 @@ def delete_employee(employee_id):
             return jsonify({"message": f"Cannot delete employee. They have {len(assignments)} active assignment(s). Delete assignments first."}), 400
         
         db.session.delete(employee)
+        db.session.flush()
+        refresh_monthly_load([employee_id])
         db.session.commit()
         return jsonify({"message": f"Employee '{employee.name}' deleted successfully"}), 200
         
@@ -1253,6 +1423,8 @@ def delete_assignment(assignment_id):
         project_name = assignment.project.name
         
         db.session.delete(assignment)
+        db.session.flush()
+        refresh_monthly_load([assignment.employee_id])
         db.session.commit()
         return jsonify({"message": f"Assignment for '{employee_name}' on '{project_name}' deleted successfully"}), 200
         
@@ -1276,6 +1448,9 @@ def delete_weekly_hours(weekly_hours_id):
         project_name = assignment.project.name if assignment and assignment.project else "Unknown"
         
         db.session.delete(weekly_hours)
+        db.session.flush()
+        if assignment:
+            refresh_monthly_load([assignment.employee_id])
         db.session.commit()
         return jsonify({"message": f"Weekly hours record for '{employee_name}' on '{project_name}' deleted successfully"}), 200
         
@@ -1288,213 +1463,47 @@ def api_export_workload_excel():
     if not (session.get('logged_in') and session['logged_in']):
         return jsonify({"error": "Unauthorized"}), 401
 
+    # Optional filters: start_date/end_date (YYYY-MM-DD), comma-separated employee_ids
+    # and project_ids, and function; split=quarter puts each quarter on its own sheet
     try:
-        weekly_hours_records = db.session.query(WeeklyHours).join(Assignment).join(Employee).join(Project).all()
-
-        if not weekly_hours_records:
-            return jsonify({"message": "No data available to export."}), 404
-
-        grouped_by_employee = {}
-        all_week_start_dates = set()
-        normal_hours_per_week = 40
-
-        for entry in weekly_hours_records:
-            employee_name = entry.assignment.employee.name
-            week_start_date = entry.week_start_date.isoformat()
-            hours_worked = entry.hours_worked
-            
-            all_week_start_dates.add(week_start_date)
-
-            if employee_name not in grouped_by_employee:
-                grouped_by_employee[employee_name] = {
-                    'weekly_totals': {},
-                    'weekly_total_status': {},
-                }
-            
-            emp_data = grouped_by_employee[employee_name]
-            current_total_hours = emp_data['weekly_totals'].get(week_start_date, 0) + hours_worked
-            emp_data['weekly_totals'][week_start_date] = current_total_hours
-            emp_data['weekly_total_status'][week_start_date] = 'Overloaded' if current_total_hours > normal_hours_per_week else ('Free' if current_total_hours < normal_hours_per_week else 'Normal')
-
-
-        sorted_week_start_dates = sorted(list(all_week_start_dates))
-
-        excel_data = []
-        s_no = 1
-
-        def get_iso_week_number(dt):
-            return dt.isocalendar()[1]
-
-        dynamic_week_columns_headers = []
-        for week_date_str in sorted_week_start_dates:
-            start_dt = datetime.strptime(week_date_str, '%Y-%m-%d').date()
-            end_dt = start_dt + timedelta(days=6)
-            week_num = get_iso_week_number(start_dt)
-            base_header = f"WK{week_num} ({start_dt.strftime('%b %d')} - {end_dt.strftime('%b %d')})"
-            dynamic_week_columns_headers.append(f"{base_header} - Working Hours")
-            dynamic_week_columns_headers.append(f"{base_header} - Status")
-
-
-        fixed_report_columns = ['S.No.', 'Employee Name']
-        final_excel_columns_order = fixed_report_columns + dynamic_week_columns_headers
-
-        for employee_name in sorted(grouped_by_employee.keys()):
-            emp_data = grouped_by_employee[employee_name]
-
-            summary_row = {
-                'S.No.': s_no,
-                'Employee Name': employee_name,
-            }
-            for week_date in sorted_week_start_dates:
-                total_hours = emp_data['weekly_totals'].get(week_date, '')
-                total_status = emp_data['weekly_total_status'].get(week_date, '')
-                
-                start_dt_for_header = datetime.strptime(week_date, '%Y-%m-%d').date()
-                week_num_for_header = get_iso_week_number(start_dt_for_header)
-                end_dt_for_header = start_dt_for_header + timedelta(days=6)
-                base_header = f"WK{week_num_for_header} ({start_dt_for_header.strftime('%b %d')} - {end_dt_for_header.strftime('%b %d')})"
-                
-                summary_row[f"{base_header} - Working Hours"] = total_hours
-                summary_row[f"{base_header} - Status"] = total_status
-
-            excel_data.append(summary_row)
-            
-            s_no += 1
-            
-        df_report = pd.DataFrame(excel_data, columns=final_excel_columns_order)
-        df_report = df_report.fillna('')
-
-
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df_report.to_excel(writer, sheet_name='Actual Hours Report', index=False) 
-
-            workbook = writer.book
-            worksheet = writer.sheets['Actual Hours Report']
-
-            header_format = workbook.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#4F81BD', 'align': 'center', 'valign': 'vcenter'})
-            sub_header_format = workbook.add_format({'bold': True, 'align': 'center'})
-
-            bold_text_format = workbook.add_format({'bold': True})
-
-            red_fill_bold = workbook.add_format({'bold': True, 'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
-            green_fill_bold = workbook.add_format({'bold': True, 'bg_color': '#C6EFCE', 'font_color': '#006100'})
-            orange_fill_bold = workbook.add_format({'bold': True, 'bg_color': '#FFEB9C', 'font_color': '#9C6500'})
-            grey_fill_bold = workbook.add_format({'bold': True, 'bg_color': '#F2F2F2', 'font_color': '#666666'})
-
-            
-            current_col = 0
-            for col_name in fixed_report_columns:
-                worksheet.write(0, current_col, col_name, header_format)
-                current_col += 1
-            
-            for week_date_str in sorted_week_start_dates:
-                start_dt = datetime.strptime(week_date_str, '%Y-%m-%d').date()
-                end_dt = start_dt + timedelta(days=6)
-                week_num = get_iso_week_number(start_dt)
-                base_header = f"WK{week_num} ({start_dt.strftime('%b %d')} - {end_dt.strftime('%b %d')})"
-                
-                merge_start_col = current_col
-                merge_end_col = current_col + 1
-                worksheet.merge_range(0, merge_start_col, 0, merge_end_col, base_header, header_format)
-            
-                worksheet.write(1, current_col, "Working Hours", sub_header_format)
-                worksheet.write(1, current_col + 1, "Status", sub_header_format)
-                current_col += 2
-
-
-            for r_idx, row_data_dict in enumerate(excel_data):
-                excel_row_idx = r_idx + 2
-
-                current_col_excel = 0
-                
-                worksheet.write(excel_row_idx, current_col_excel, row_data_dict['S.No.'], bold_text_format)
-                current_col_excel += 1
-                worksheet.write(excel_row_idx, current_col_excel, row_data_dict['Employee Name'], bold_text_format)
-                current_col_excel += 1
-                
-                for week_date_str in sorted_week_start_dates:
-                    start_dt_for_header = datetime.strptime(week_date_str, '%Y-%m-%d').date()
-                    week_num_for_header = get_iso_week_number(start_dt_for_header)
-                    end_dt_for_header = start_dt_for_header + timedelta(days=6)
-                    base_header = f"WK{week_num_for_header} ({start_dt_for_header.strftime('%b %d')} - {end_dt_for_header.strftime('%b %d')})"
-                    
-                    hours_col_name = f"{base_header} - Working Hours"
-                    status_col_name = f"{base_header} - Status"
-
-                    hours_value = df_report.iloc[r_idx, df_report.columns.get_loc(hours_col_name)]
-                    status_value = df_report.iloc[r_idx, df_report.columns.get_loc(status_col_name)]
-
-                    hours_cell_format_to_apply = bold_text_format
-                    
-                    numeric_hours_value = None
-                    try:
-                        float_hours_value = float(hours_value)
-                        if float_hours_value == int(float_hours_value):
-                            numeric_hours_value = int(float_hours_value)
-                        else:
-                            numeric_hours_value = float_hours_value
-                    except (ValueError, TypeError):
-                        pass
-
-                    if numeric_hours_value is not None:
-                        if status_value == 'Overloaded':
-                            hours_cell_format_to_apply = red_fill_bold
-                        elif status_value == 'Free' and numeric_hours_value > 0:
-                            hours_cell_format_to_apply = orange_fill_bold
-                        elif status_value == 'Normal' and numeric_hours_value == normal_hours_per_week:
-                            hours_cell_format_to_apply = green_fill_bold
-                        elif numeric_hours_value == 0:
-                            hours_cell_format_to_apply = grey_fill_bold
-                    elif hours_value == '':
-                        hours_cell_format_to_apply = grey_fill_bold
-                    
-                    worksheet.write(excel_row_idx, current_col_excel, hours_value, hours_cell_format_to_apply)
-                    current_col_excel += 1
-
-                    worksheet.write(excel_row_idx, current_col_excel, status_value, bold_text_format)
-                    current_col_excel += 1
-
-
-            for i, col_name in enumerate(final_excel_columns_order):
-                header1_len = 0
-                header2_len = 0
-
-                if i < len(fixed_report_columns):
-                    header1_len = len(fixed_report_columns[i])
-                else:
-                    current_dynamic_idx = (i - len(fixed_report_columns)) // 2
-                    if current_dynamic_idx < len(sorted_week_start_dates):
-                        week_date_str = sorted_week_start_dates[current_dynamic_idx]
-                        start_dt = datetime.strptime(week_date_str, '%Y-%m-%d').date()
-                        end_dt = start_dt + timedelta(days=6)
-                        week_num = get_iso_week_number(start_dt)
-                        header1_text = f"WK{week_num} ({start_dt.strftime('%b %d')} - {end_dt.strftime('%b %d')})"
-                        header1_len = len(header1_text)
-
-                    sub_header_position = (i - len(fixed_report_columns)) % 2
-                    if sub_header_position == 0:
-                        header2_len = len("Working Hours")
-                    elif sub_header_position == 1:
-                        header2_len = len("Status")
-                
-                max_content_len = 0
-                max_content_len = df_report[col_name].astype(str).map(len).max() if not df_report.empty else 0
-
-
-                max_len = max(header1_len, header2_len, max_content_len)
-                worksheet.set_column(i, i, max_len + 2)
-
-            worksheet.freeze_panes(2, len(fixed_report_columns))
+        start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date') else None
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else None
+    except ValueError:
+        return jsonify({"message": "Invalid date format for start_date or end_date. Use YYYY-MM-DD."}), 400
+    try:
+        employee_ids = [int(value) for value in request.args.get('employee_ids', '').split(',') if value.strip()]
+        project_ids = [int(value) for value in request.args.get('project_ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({"message": "employee_ids and project_ids must be comma-separated integers."}), 400
+    split = request.args.get('split', '')
+    if split not in ('', 'quarter'):
+        return jsonify({"message": "split must be 'quarter' when given."}), 400
 
+    function_name = request.args.get('function', '').strip() or None
+    mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    download_name = 'Detailed_Actual_Hours_Report.xlsx'
 
-        output.seek(0)
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            download_name='Detailed_Actual_Hours_Report.xlsx',
-            as_attachment=True
+    try:
+        cache_entry = ExportCacheEntry(
+            'workload_report',
+            {'start_date': start_date, 'end_date': end_date, 'employee_ids': sorted(employee_ids),
+             'project_ids': sorted(project_ids), 'function': function_name, 'split': split},
+            ('weekly_hours', 'assignment', 'employee', 'project')
+        )
+        cached = cache_entry.response(mimetype, download_name)
+        if cached is not None:
+            return cached
+
+        # Hours per employee and week are summed in SQL and pivoted once
+        totals = weekly_totals(
+            start_date=start_date, end_date=end_date, employee_ids=employee_ids,
+            project_ids=project_ids, function_name=function_name
         )
+        if totals.empty:
+            return jsonify({"message": "No data available to export."}), 404
+
+        output = write_workload_report(totals, split_by_quarter=split == 'quarter')
+        return cache_entry.store_file_response(output, mimetype, download_name)
     except Exception as e:
         app.logger.error(f"Error exporting processed imported data: {e}")
         return jsonify({"error": f"Failed to generate export file: {str(e)}"}), 500
@@ -1505,32 +1514,52 @@ def api_employee_project_assignments():
     if not (session.get('logged_in') and session['logged_in']):
         return jsonify({"error": "Unauthorized"}), 401
 
-    search_term = request.args.get('q', '').strip()
-    assignments_data = {}
-
-    assignments_query = db.session.query(Assignment).all()
+    try:
+        page = PageRequest(request.args, EMPLOYEE_ASSIGNMENT_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    for assignment in assignments_query:
-        employee = db.session.query(Employee).get(assignment.employee_id)
-        project = db.session.query(Project).get(assignment.project_id)
+    search_term = request.args.get('q', '').strip()
 
-        if employee and project:
-            employee_name = employee.name
-            project_name = project.name
-            
-            if search_term and \
-               not (search_term.lower() in employee_name.lower() or \
-                    search_term.lower() in project_name.lower() or \
-                    search_term.lower() in employee.role.lower()):
+    # One entry per employee with at least one assignment to an existing project,
+    # paginated by employee id
+    employees_query = db.session.query(Employee).filter(
+        Employee.assignments.any(Assignment.project.has())
+    )
+    assignments_loader = selectinload(Employee.assignments)
+    if search_term:
+        # An employee matching by name or role lists all of their projects, otherwise
+        # only the matching ones; both filters run in SQL through the search backend
+        search = get_search_backend()
+        employee_ids = search.matching_ids('employee', search_term, ('name', 'role'))
+        project_ids = search.matching_ids('project', search_term)
+        employees_query = employees_query.filter(
+            Employee.id.in_(employee_ids) | Employee.assignments.any(Assignment.project_id.in_(project_ids))
+        )
+        assignments_loader = selectinload(Employee.assignments.and_(
+            Assignment.employee_id.in_(employee_ids) | Assignment.project_id.in_(project_ids)
+        ))
+
+    total = cached_count(
+        ('employee_project_assignments', search_term), employees_query, ('employee', 'assignment', 'project')
+    )
+    employees, next_cursor = page.split(
+        page.apply(employees_query, Employee.id)
+        .options(assignments_loader)
+        .all()
+    )
+
+    # Project names come from the reference cache rather than a join
+    reference_data = get_reference_data()
+    assignments_data = []
+    for employee in employees:
+        projects = []
+        for assignment in sorted(employee.assignments, key=lambda a: a.id):
+            project = reference_data.project(assignment.project_id) or assignment.project
+            if not project:
                 continue
 
-            if employee.id not in assignments_data:
-                assignments_data[employee.id] = {
-                    'employee': employee.to_dict(),
-                    'projects': []
-                }
-            
-            assignments_data[employee.id]['projects'].append({
+            projects.append({
                 'assignment_id': assignment.id,
                 'project_id': project.id,
                 'project_name': project.name,
@@ -1538,8 +1567,13 @@ def api_employee_project_assignments():
                 'assigned_start': f"{assignment.assigned_start_month} {assignment.assigned_start_year}",
                 'assigned_end': f"{assignment.assigned_end_month} {assignment.assigned_end_year}"
             })
-    
-    return jsonify(list(assignments_data.values()))
+
+        assignments_data.append({
+            'employee': employee.to_dict(),
+            'projects': projects
+        })
+
+    return paged_response(page, assignments_data, next_cursor, total)
 
 
 @app.route('/api/weekly_hours', methods=['GET'])
@@ -1547,6 +1581,11 @@ def api_weekly_hours():
     if not (session.get('logged_in') and session['logged_in']):
         return jsonify({"error": "Unauthorized"}), 401
 
+    try:
+        page = PageRequest(request.args, WEEKLY_HOURS_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     start_date_str = request.args.get('start_date')
     end_date_str = request.args.get('end_date')
     search_term = request.args.get('q', '').strip()
@@ -1564,36 +1603,71 @@ def api_weekly_hours():
             return jsonify({"message": "Invalid date format for start_date or end_date. UseYYYY-MM-DD."}), 400
 
     if search_term:
+        search = get_search_backend()
         weekly_hours_query = weekly_hours_query.filter(
-            (Employee.name.ilike(f'%{search_term}%')) |
-            (Project.name.ilike(f'%{search_term}%')) |
-            (WeeklyHours.function_name.ilike(f'%{search_term}%'))
+            Employee.id.in_(search.matching_ids('employee', search_term, ('name',))) |
+            Project.id.in_(search.matching_ids('project', search_term)) |
+            WeeklyHours.id.in_(search.matching_ids('weekly_hours', search_term))
         )
     
-    weekly_hours_records = weekly_hours_query.all()
-    
-    weekly_hours_data = []
-    for wh in weekly_hours_records:
-        employee = wh.assignment.employee if wh.assignment else None
-        project = wh.assignment.project if wh.assignment else None
-
-        if employee and project:
-            weekly_hours_data.append({
-                'id': wh.id,
-                'assignment_id': wh.assignment_id,
-                'employee_id': employee.id,
-                'employee_name': employee.name,
-                'project_id': project.id,
-                'project_name': project.name,
-                'week_start_date': wh.week_start_date.isoformat(),
-                'hours_worked': wh.hours_worked,
-                'function_name': wh.function_name,
-                'percentage': wh.percentage,
-                'status': wh.status
-            })
-    
-    return jsonify(weekly_hours_data)
+    total = cached_count(
+        ('weekly_hours', start_date_str, end_date_str, search_term), weekly_hours_query,
+        ('weekly_hours', 'assignment', 'employee', 'project')
+    )
+    # Plain tuples of the requested columns (plus the id, for the cursor); employee and
+    # project come from the joins above and percentage/status are computed in SQL
+    fields = page.field_names(WEEKLY_HOURS_FIELDS)
+    rows, next_cursor = page.split(
+        page.apply(weekly_hours_query, WeeklyHours.id)
+        .with_entities(*[WEEKLY_HOURS_COLUMNS[field] for field in fields], WeeklyHours.id)
+        .all(),
+        key=lambda row: row[-1]
+    )
+    return paged_response(page, records(rows, fields, {'week_start_date': date.isoformat}), next_cursor, total)
+
+
+@app.route('/api/employee_workload', methods=['GET'])
+def api_employee_workload():
+    """Hours per employee for one ISO week, by project and function, with status.
+
+    `week` is an ISO week ('2025-W10') and `date` any day in the week (YYYY-MM-DD);
+    the current week is used when neither is given. `q` filters employees. The
+    ETag changes only when the underlying tables do, so a revalidation is a 304.
+    """
+    if not (session.get('logged_in') and session['logged_in']):
+        return jsonify({"error": "Unauthorized"}), 401
 
+    try:
+        if request.args.get('week'):
+            year, week = request.args['week'].upper().split('-W')
+            week_start_date = date.fromisocalendar(int(year), int(week), 1)
+        else:
+            day = datetime.strptime(request.args['date'], '%Y-%m-%d').date() if request.args.get('date') else date.today()
+            week_start_date = day - timedelta(days=day.weekday())
+    except ValueError:
+        return jsonify({"message": "Invalid week. Use week=YYYY-Www or date=YYYY-MM-DD."}), 400
+    search_term = request.args.get('q', '').strip()
+
+    versions = data_versions(('weekly_hours', 'assignment', 'employee', 'project'))
+    etag = hashlib.sha256(json.dumps([week_start_date.isoformat(), search_term, versions], sort_keys=True).encode('utf-8')).hexdigest()
+    # Weak comparison: compression turns the ETag sent with the body into W/"..."
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        employee_ids = None
+        if search_term:
+            employee_ids = [row[0] for row in db.session.execute(get_search_backend().matching_ids('employee', search_term))]
+        iso_year, iso_week, _ = week_start_date.isocalendar()
+        response = jsonify({
+            'week': f"{iso_year}-W{iso_week:02d}",
+            'week_start_date': week_start_date.isoformat(),
+            'week_end_date': (week_start_date + timedelta(days=6)).isoformat(),
+            'normal_weekly_hours': NORMAL_HOURS_PER_WEEK,
+            'employees': week_workload(week_start_date, employee_ids)
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/monthly_workload', methods=['GET'])
 def api_monthly_workload():
@@ -1606,88 +1680,72 @@ def api_monthly_workload():
     search_term = request.args.get('q', '').strip()
 
     normal_weekly_hours = 40
-    hours_per_month_approx = normal_weekly_hours * 4
 
-    employee_monthly_load = []
-    
-    all_employees = db.session.query(Employee).all()
-    all_projects = db.session.query(Project).all()
-    all_assignments = db.session.query(Assignment).all()
-    all_weekly_hours = db.session.query(WeeklyHours).all()
-
-    projects_by_id = {p.id: p for p in all_projects}
-    employees_by_id = {e.id: e for e in all_employees}
-    assignments_by_id = {a.id: a for a in all_assignments}
-
-    for employee in all_employees:
-        employee_data = {
-            'employee': employee.to_dict(),
-            'monthly_loads': []
-        }
-        
-        if search_term and not (search_term.lower() in employee.name.lower() or \
-                                search_term.lower() in employee.role.lower() or \
-                                search_term.lower() in employee.email.lower()):
-            continue
-
-        current_month_date = datetime(start_year, start_month_num, 1)
-
-        for i in range(num_months):
-            month_start = datetime(current_month_date.year, current_month_date.month, 1).date()
-            month_end = datetime(current_month_date.year, current_month_date.month, monthrange(current_month_date.year, current_month_date.month)[1]).date()
-
-            total_assigned_hours_for_month = 0
-            total_actual_hours_for_month = 0
-
-            relevant_assignments = [
-                a for a in all_assignments
-                if a.employee_id == employee.id and
-                   (datetime(a.assigned_start_year, datetime.strptime(a.assigned_start_month, '%B').month, 1).date() <= month_end) and
-                   (datetime(a.assigned_end_year, datetime.strptime(a.assigned_end_month, '%B').month, monthrange(a.assigned_end_year, datetime.strptime(a.assigned_end_month, '%B').month)[1]).date() >= month_start)
-            ]
-            
-            for assignment in relevant_assignments:
-                total_assigned_hours_for_month += assignment.assigned_hours_per_week * 4
-
-                actual_hours_in_month = [
-                    wh.hours_worked for wh in all_weekly_hours
-                    if wh.assignment_id == assignment.id and
-                       wh.week_start_date >= month_start and
-                       wh.week_start_date <= month_end
-                ]
-                total_actual_hours_for_month += sum(actual_hours_in_month)
-
-            load = total_actual_hours_for_month if total_actual_hours_for_month > 0 else total_assigned_hours_for_month
-            
-            load_percentage = (load / hours_per_month_approx) * 100 if hours_per_month_approx > 0 else 0
-
-            employee_data['monthly_loads'].append({
-                'month_year': current_month_date.strftime('%b %Y'),
-                'load': load,
-                'load_percentage': load_percentage
-            })
-
-            if current_month_date.month == 12:
-                current_month_date = datetime(current_month_date.year + 1, 1, 1)
-            else:
-                current_month_date = datetime(current_month_date.year, current_month_date.month + 1, 1)
-        
-        employee_monthly_load.append(employee_data)
+    if needs_full_refresh():
+        refresh_monthly_load()
+        db.session.commit()
 
-    months_labels = []
-    temp_date = datetime(start_year, start_month_num, 1)
+    months = []
+    current_month_date = datetime(start_year, start_month_num, 1)
     for _ in range(num_months):
-        months_labels.append(temp_date.strftime('%b %Y'))
-        if temp_date.month == 12:
-            temp_date = datetime(temp_date.year + 1, 1, 1)
+        months.append((current_month_date.year, current_month_date.month, current_month_date.strftime('%b %Y')))
+        if current_month_date.month == 12:
+            current_month_date = datetime(current_month_date.year + 1, 1, 1)
         else:
-            temp_date = datetime(temp_date.year, temp_date.month + 1, 1)
+            current_month_date = datetime(current_month_date.year, current_month_date.month + 1, 1)
 
-    return jsonify({
-        'employee_monthly_load': employee_monthly_load,
-        'months': months_labels,
+    employees_query = db.session.query(Employee)
+    if search_term:
+        employees_query = employees_query.filter(
+            Employee.id.in_(get_search_backend().matching_ids('employee', search_term))
+        )
+    employee_rows = employees_query.order_by(Employee.id).with_entities(
+        *[getattr(Employee, field) for field in EMPLOYEE_FIELDS]
+    ).all()
+
+    # One range read over the precomputed (employee, year, month) totals
+    hours = pd.DataFrame(columns=['employee_id', 'month', 'assigned_hours', 'actual_hours'])
+    if months:
+        first_year, first_month, _ = months[0]
+        last_year, last_month, _ = months[-1]
+        monthly_loads = db.session.query(
+            MonthlyLoad.employee_id, MonthlyLoad.year, MonthlyLoad.month,
+            MonthlyLoad.assigned_hours, MonthlyLoad.actual_hours
+        ).filter(
+            tuple_(MonthlyLoad.year, MonthlyLoad.month) >= tuple_(first_year, first_month),
+            tuple_(MonthlyLoad.year, MonthlyLoad.month) <= tuple_(last_year, last_month)
+        ).all()
+        hours = pd.DataFrame([
+            (ml.employee_id, month_index(ml.year, ml.month), ml.assigned_hours, ml.actual_hours)
+            for ml in monthly_loads
+        ], columns=hours.columns)
+    assigned, actual = workload_matrix(
+        hours.set_index(['employee_id', 'month']),
+        [employee.id for employee in employee_rows],
+        [month_index(year, month) for year, month, _ in months]
+    )
+    loads, load_percentages = monthly_load_percentages(assigned, actual, normal_weekly_hours)
+
+    month_labels = [label for _, _, label in months]
+    employee_records = records(employee_rows, EMPLOYEE_FIELDS)
+    load_record = record_factory(('month_year', 'load', 'load_percentage'))
+
+    # Streamed: the per-employee entries are encoded in chunks as they are built
+    def employee_monthly_load():
+        for row, employee in enumerate(employee_records):
+            yield {
+                'employee': employee,
+                'monthly_loads': [
+                    load_record(load=int(loads[row, column]), load_percentage=float(load_percentages[row, column]), month_year=label)
+                    for column, label in enumerate(month_labels)
+                ]
+            }
+
+    return streamed_json({
+        'employee_monthly_load': employee_monthly_load(),
+        'months': month_labels,
         'normal_hours': normal_weekly_hours
-    })
+    }, 'employee_monthly_load')
 
 
 # --- Run the application ---
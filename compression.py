@@ -0,0 +1,114 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError: # optional; responses are gzip-compressed without it
+    brotli = None
+
+
+# Default for app.config['COMPRESS_MIN_BYTES']: smaller bodies are sent as they are
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+# Brotli's 0-11 scale; 5 compresses better than gzip -6 at a similar CPU cost
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/manifest+json', 'application/xml',
+    'image/svg+xml', 'text/css', 'text/csv', 'text/html', 'text/javascript', 'text/plain', 'text/xml',
+}
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+_STREAMS = {'gzip': _GzipStream}
+if brotli is not None:
+    _STREAMS['br'] = _BrotliStream
+# Preferred first when the client accepts several equally
+_ENCODINGS = [encoding for encoding in ('br', 'gzip') if encoding in _STREAMS]
+
+
+def _compress(data, encoding):
+    stream = _STREAMS[encoding]()
+    return stream.compress(data) + stream.finish()
+
+
+def _compressed_chunks(chunks, encoding):
+    stream = _STREAMS[encoding]()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """after_request hook: brotli- or gzip-compresses text and JSON responses of at
+    least COMPRESS_MIN_BYTES for clients that accept it.
+
+    Streamed responses (e.g. /api/monthly_workload) are compressed chunk by chunk.
+    Downloads sent as attachments are left alone: the exports already offer
+    compressed formats and their cached files are served as they are.
+    """
+    from app import app
+
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304) \
+       or 'Content-Encoding' in response.headers \
+       or response.headers.get('Content-Disposition', '').startswith('attachment'):
+        return response
+
+    encoding = request.accept_encodings.best_match(_ENCODINGS)
+    if encoding is None:
+        return response
+
+    if response.is_streamed and not response.direct_passthrough:
+        response.response = _compressed_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        # Files from send_file (static assets) are read in here; they are small
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < app.config.get('COMPRESS_MIN_BYTES', DEFAULT_COMPRESS_MIN_BYTES):
+            return response
+        compressed = _compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        response.headers.pop('Accept-Ranges', None) # ranges would address the compressed bytes
+
+    response.headers['Content-Encoding'] = encoding
+    # Each encoding is a different byte sequence, so a strong ETag no longer holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
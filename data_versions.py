@@ -0,0 +1,114 @@
+from sqlalchemy import event, select
+
+
+# Called with the set of changed table names after each commit that wrote to any
+_change_listeners = []
+
+
+def data_versions(table_names):
+    """Current change counter of each table in `table_names` (0 if never written)."""
+    from app import db, DataVersion
+
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(list(table_names)))
+        ).all()
+    versions = {name: 0 for name in table_names}
+    versions.update(dict(rows))
+    return versions
+
+
+def _bump_statement(dialect_name, table, names):
+    """INSERT ... ON CONFLICT DO UPDATE that creates or increments the counters of
+    `names` in one statement, or None for dialects without ON CONFLICT support."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table).values([{'table_name': name, 'version': 1} for name in names])
+    return stmt.on_conflict_do_update(index_elements=[table.c.table_name], set_={'version': table.c.version + 1})
+
+
+def bump_data_versions(connection, table_names):
+    """Increments the change counter of each table on `connection`, inside the
+    caller's transaction, so the counters commit or roll back with the data."""
+    from app import DataVersion
+
+    table = DataVersion.__table__
+    # A fixed order keeps concurrent writers from locking the rows crosswise
+    names = sorted(set(table_names))
+    stmt = _bump_statement(connection.dialect.name, table, names)
+    if stmt is not None:
+        connection.execute(stmt)
+        return
+    existing = set(connection.execute(select(table.c.table_name).where(table.c.table_name.in_(names))).scalars())
+    if existing:
+        connection.execute(table.update().where(table.c.table_name.in_(existing)).values(version=table.c.version + 1))
+    if len(existing) < len(names):
+        connection.execute(table.insert(), [{'table_name': name, 'version': 1} for name in names if name not in existing])
+
+
+def on_tables_changed(callback):
+    """Registers `callback(table_names)` to run in this process after each commit
+    that wrote to any table; the shared counters are already bumped by then."""
+    _change_listeners.append(callback)
+    return callback
+
+
+def _changed_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+def track_data_versions(session):
+    """Bumps the data_version counter of every table a transaction writes to, as
+    part of that transaction's commit.
+
+    ORM flushes are seen through after_flush and Core INSERT/UPDATE/DELETE statements
+    (bulk imports, Query.delete) through do_orm_execute, so cached results keyed
+    by these counters change whenever their tables do.
+    """
+
+    @event.listens_for(session, 'after_flush')
+    def _record_flush(session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            table = getattr(obj, '__table__', None)
+            if table is not None:
+                _changed_tables(session).add(table.name)
+
+    @event.listens_for(session, 'do_orm_execute')
+    def _record_statement(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, 'table', None)
+            if getattr(table, 'name', None):
+                _changed_tables(orm_execute_state.session).add(table.name)
+
+    @event.listens_for(session, 'before_commit')
+    def _bump_before_commit(session):
+        from app import DataVersion
+
+        # The commit flushes pending objects only after this hook, so flush them
+        # here to see every table the transaction writes to
+        session.flush()
+        changed = _changed_tables(session) - {DataVersion.__tablename__}
+        if changed:
+            bump_data_versions(session.connection(), changed)
+
+    @event.listens_for(session, 'after_commit')
+    def _notify_after_commit(session):
+        from app import DataVersion
+
+        changed = session.info.pop('changed_tables', None)
+        if changed:
+            changed.discard(DataVersion.__tablename__)
+        if not changed:
+            return
+        for callback in _change_listeners:
+            callback(changed)
+
+    @event.listens_for(session, 'after_rollback')
+    def _forget_after_rollback(session):
+        # Neither the writes nor their counter bumps were committed
+        session.info.pop('changed_tables', None)
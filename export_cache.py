@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from flask import Response, request, send_file, stream_with_context
+from data_versions import data_versions
+
+
+# Defaults for the EXPORT_CACHE_* settings in app.config
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_evict_lock = threading.Lock()
+
+
+def _cache_dir():
+    from app import app
+    return app.config['EXPORT_CACHE_DIR']
+
+
+class ExportCacheEntry:
+    """One export file in the disk cache, addressed by what it was built from.
+
+    The key hashes the export kind, its parameters and the data_version counters
+    of the tables it reads, so any committed write to those tables yields a new
+    key and stale files are simply never asked for again (eviction removes them).
+    The key doubles as the response's ETag.
+    """
+
+    def __init__(self, kind, params, tables):
+        versions = data_versions(tables)
+        payload = json.dumps({'kind': kind, 'params': params, 'versions': versions}, sort_keys=True, default=str)
+        self.key = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        self.path = os.path.join(_cache_dir(), self.key[:2], self.key)
+
+    def not_modified(self):
+        """True when the client already holds this exact export (If-None-Match); weak
+        comparison, so the tag still matches if it came back weakened by compression."""
+        return request.if_none_match.contains_weak(self.key)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def response(self, mimetype, download_name):
+        """304 when the client's copy is current, else the cached file; None on a miss."""
+        if self.not_modified():
+            response = Response(status=304)
+        elif self.exists():
+            os.utime(self.path) # eviction is least-recently-used by mtime
+            response = send_file(self.path, mimetype=mimetype, as_attachment=True, download_name=download_name, etag=False)
+        else:
+            return None
+        return self._headers(response)
+
+    def store(self, output):
+        """Copies a finished export file into the cache and returns its path."""
+        tmp_path = self._tmp_path()
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(output, f)
+        os.replace(tmp_path, self.path)
+        evict_exports()
+        return self.path
+
+    def store_file_response(self, output, mimetype, download_name):
+        """Caches `output` and sends it."""
+        path = self.store(output)
+        return self._headers(send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name, etag=False))
+
+    def stream_response(self, chunks, mimetype, download_name):
+        """Streams `chunks` to the client while writing them to the cache; the file
+        only enters the cache once the stream has finished."""
+        tmp_path = self._tmp_path()
+
+        def tee():
+            completed = False
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        yield chunk
+                completed = True
+            finally:
+                if completed:
+                    os.replace(tmp_path, self.path)
+                    evict_exports()
+                elif os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        response = Response(stream_with_context(tee()), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename={download_name}'
+        return self._headers(response)
+
+    def _tmp_path(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        os.close(fd)
+        return tmp_path
+
+    def _headers(self, response):
+        response.set_etag(self.key)
+        response.headers['Cache-Control'] = 'no-cache' # always revalidate; a match costs a 304
+        return response
+
+
+def evict_exports():
+    """Removes cached exports older than EXPORT_CACHE_MAX_AGE_SECONDS, then the least
+    recently used ones until the cache fits in EXPORT_CACHE_MAX_BYTES."""
+    from app import app
+
+    cache_dir = _cache_dir()
+    max_bytes = app.config.get('EXPORT_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)
+    max_age = app.config.get('EXPORT_CACHE_MAX_AGE_SECONDS', DEFAULT_CACHE_MAX_AGE_SECONDS)
+
+    with _evict_lock:
+        now = time.time()
+        files = []
+        for root, _, names in os.walk(cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith('.tmp'):
+                    # Left behind by a stream that died mid-way; live ones are fresh
+                    if now - stat.st_mtime > 3600:
+                        _remove(path)
+                elif now - stat.st_mtime > max_age:
+                    _remove(path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,229 @@
+import csv
+import io
+import tempfile
+import zlib
+import xlsxwriter
+from sqlalchemy import select
+from export_cache import ExportCacheEntry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # only needed for format=parquet
+    pa = pq = None
+
+
+# Rows fetched from the database per round trip while an export streams.
+EXPORT_FETCH_ROWS = 1000
+# Exports are assembled in memory up to this size, then spill to a temp file.
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Rows per Parquet row group.
+PARQUET_ROW_GROUP_ROWS = 50000
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# format= value -> (file suffix, mimetype). Every format uses the EXPORT_COLUMNS
+# headers, so a weekly_hours export can be uploaded back through the import page.
+EXPORT_FORMATS = {
+    'xlsx': ('.xlsx', XLSX_MIMETYPE),
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Column headers per export type, in sheet order.
+EXPORT_COLUMNS = {
+    'employees': ['Name', 'Email', 'Role'],
+    'projects': ['Project Name', 'Duration (Months)', 'Start Month', 'Start Year', 'End Month', 'End Year'],
+    'weekly_hours': ['Emp Name', 'Project Name', 'Function', 'Week Days', 'Hours'],
+}
+
+# Tables each export type reads; their data versions are part of the cache key.
+EXPORT_TABLES = {
+    'employees': ('employee',),
+    'projects': ('project',),
+    'weekly_hours': ('weekly_hours', 'assignment', 'employee', 'project'),
+}
+
+# Integer columns; everything else is exported as text.
+INTEGER_EXPORT_COLUMNS = {'Duration (Months)', 'Start Year', 'End Year', 'Hours'}
+
+# Single row written to an empty spreadsheet export (CSV and Parquet stay header-only).
+EMPTY_EXPORT_ROWS = {
+    'employees': ('No employees found', '', ''),
+    'projects': ('No projects found', '', '', '', '', ''),
+    'weekly_hours': ('No weekly hours found', '', '', '', ''),
+}
+
+
+def export_query(export_type):
+    """SELECT of the plain column values behind an export, one statement per type.
+
+    Weekly hours are joined to their assignment, employee and project in the same
+    statement (rows whose assignment, employee or project is missing drop out of
+    the inner joins), so an export costs one query however many rows it has.
+    """
+    from app import Assignment, Employee, Project, WeeklyHours
+
+    if export_type == 'employees':
+        return select(Employee.name, Employee.email, Employee.role).order_by(Employee.id)
+    if export_type == 'projects':
+        return select(
+            Project.name, Project.duration_months, Project.start_month,
+            Project.start_year, Project.end_month, Project.end_year
+        ).order_by(Project.id)
+    if export_type == 'weekly_hours':
+        return (
+            select(
+                Employee.name, Project.name, WeeklyHours.function_name,
+                WeeklyHours.week_start_date, WeeklyHours.hours_worked
+            )
+            .select_from(WeeklyHours)
+            .join(Assignment, WeeklyHours.assignment_id == Assignment.id)
+            .join(Employee, Assignment.employee_id == Employee.id)
+            .join(Project, Assignment.project_id == Project.id)
+            .order_by(WeeklyHours.id)
+        )
+    raise ValueError(f"Unknown export type '{export_type}'. Available: {', '.join(EXPORT_COLUMNS)}")
+
+
+def export_rows(export_type):
+    """Yields the rows of an export as tuples in EXPORT_COLUMNS order.
+
+    Rows are plain tuples from export_query(), fetched EXPORT_FETCH_ROWS at a time,
+    so the whole table is never held in memory at once.
+    """
+    from app import db
+
+    result = db.session.execute(
+        export_query(export_type), execution_options={'yield_per': EXPORT_FETCH_ROWS}
+    )
+    if export_type == 'employees':
+        for name, email, role in result:
+            yield (name or '', email or '', role or '')
+    elif export_type == 'projects':
+        for name, duration, start_month, start_year, end_month, end_year in result:
+            yield (name or '', duration or 0, start_month or '', start_year or 0, end_month or '', end_year or 0)
+    else:
+        for emp_name, project_name, function_name, week_start_date, hours_worked in result:
+            yield (
+                emp_name or '',
+                project_name or '',
+                function_name or 'General',
+                str(week_start_date) if week_start_date else '',
+                hours_worked or 0
+            )
+
+
+def write_xlsx(columns, rows, empty_row=None, sheet_name='Sheet1'):
+    """Writes a header row plus `rows` to an .xlsx file and returns it rewound.
+
+    xlsxwriter's constant_memory mode flushes each row to disk once the next one
+    starts, and the finished workbook goes to a spooled temp file, so memory use
+    does not grow with the number of rows. `empty_row` is written when `rows`
+    yields nothing.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+
+    worksheet.write_row(0, 0, columns, header_format)
+    row_number = 0
+    for row_number, row in enumerate(rows, start=1):
+        worksheet.write_row(row_number, 0, row)
+    if row_number == 0 and empty_row is not None:
+        worksheet.write_row(1, 0, empty_row)
+
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def csv_chunks(columns, rows, compress=False):
+    """Yields a CSV export as encoded chunks of EXPORT_FETCH_ROWS rows each,
+    gzip-compressed on the fly when `compress` is set."""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_FETCH_ROWS == 0:
+            chunk = drain()
+            if chunk:
+                yield chunk
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def write_parquet(columns, rows):
+    """Writes `rows` to a Parquet file in row groups of PARQUET_ROW_GROUP_ROWS and
+    returns it rewound; only one row group is held in memory at a time."""
+    schema = pa.schema([
+        (name, pa.int64() if name in INTEGER_EXPORT_COLUMNS else pa.string()) for name in columns
+    ])
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+
+    def to_table(batch):
+        return pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)], schema=schema
+        )
+
+    with pq.ParquetWriter(output, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(to_table(batch))
+                batch = []
+        if batch:
+            writer.write_table(to_table(batch))
+    output.seek(0)
+    return output
+
+
+def export_response(export_type, export_format='xlsx'):
+    """Download response for an export in one of EXPORT_FORMATS.
+
+    CSV formats stream straight from the database cursor; xlsx and Parquet are
+    written to a spooled temp file first, since both need the finished file.
+    Finished files are kept in the export cache until the tables they were read
+    from change. Raises ValueError for an unknown type or format.
+    """
+    if export_type not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown export type '{export_type}'. Available: {', '.join(EXPORT_COLUMNS)}")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Available: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet' and pq is None:
+        raise ValueError("Parquet export needs pyarrow, which is not installed.")
+
+    suffix, mimetype = EXPORT_FORMATS[export_format]
+    filename = f'{export_type}_export{suffix}'
+    cache_entry = ExportCacheEntry('export_data', {'type': export_type, 'format': export_format}, EXPORT_TABLES[export_type])
+    cached = cache_entry.response(mimetype, filename)
+    if cached is not None:
+        return cached
+
+    columns = EXPORT_COLUMNS[export_type]
+    rows = export_rows(export_type)
+    if export_format in ('csv', 'csv.gz'):
+        return cache_entry.stream_response(
+            csv_chunks(columns, rows, compress=export_format == 'csv.gz'), mimetype, filename
+        )
+    if export_format == 'parquet':
+        output = write_parquet(columns, rows)
+    else:
+        output = write_xlsx(columns, rows, EMPTY_EXPORT_ROWS[export_type])
+    return cache_entry.store_file_response(output, mimetype, filename)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date
+from flask import Response, g, request, session
+from werkzeug.security import safe_join
+from data_versions import data_versions
+
+
+# GET /api/ endpoints whose data changes without a data_version bump (progress and
+# hit counters are written outside the ORM session), so they get no ETag
+UNVERSIONED_API_ENDPOINTS = {'api_import_job_status', 'api_column_mapping_profiles'}
+
+# Hashed static URLs never change content, so browsers may keep them for a year
+STATIC_MAX_AGE_SECONDS = 365 * 24 * 3600
+STATIC_HASH_LENGTH = 12
+_HASHED_STATIC_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$' % STATIC_HASH_LENGTH)
+
+_static_hashes = {} # filename -> (mtime, size, content hash)
+_static_hashes_lock = threading.Lock()
+
+
+def _versioned_tables():
+    from app import db, DataVersion
+    return [table.name for table in db.metadata.sorted_tables if table.name != DataVersion.__tablename__]
+
+
+def api_etag():
+    """Weak ETag of the current GET /api/ request: the URL (with its query string),
+    today's date (default weeks and months move with it) and the data_version
+    counter of every table. Any committed write changes it."""
+    versions = data_versions(_versioned_tables())
+    payload = json.dumps([request.full_path, date.today().isoformat(), versions], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def api_not_modified():
+    """before_request hook: answers a GET /api/ request with 304 when the client's
+    If-None-Match already holds the current api_etag(), without running the view."""
+    if request.method != 'GET' or not request.path.startswith('/api/') \
+       or request.endpoint in UNVERSIONED_API_ENDPOINTS or not session.get('logged_in'):
+        return None
+    g.api_etag = api_etag()
+    if request.if_none_match.contains_weak(g.api_etag):
+        response = Response(status=304)
+        return _api_cache_headers(response, g.api_etag)
+    return None
+
+
+def add_api_etag(response):
+    """after_request hook: tags successful GET /api/ responses with api_etag(). Views
+    that set their own ETag (the exports, /api/employee_workload) keep it."""
+    etag = g.pop('api_etag', None)
+    if etag and response.status_code == 200 and 'ETag' not in response.headers:
+        _api_cache_headers(response, etag)
+    return response
+
+
+def _api_cache_headers(response, etag):
+    response.set_etag(etag, weak=True)
+    # Per-user data: cached only by the browser, and always revalidated
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def static_file_hash(static_folder, filename):
+    """Short content hash of a static file, or None when it does not exist. Hashes
+    are kept per process and recomputed when the file's mtime or size changes."""
+    path = safe_join(static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _static_hashes_lock:
+        cached = _static_hashes.get(filename)
+    if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    content_hash = digest.hexdigest()[:STATIC_HASH_LENGTH]
+    with _static_hashes_lock:
+        _static_hashes[filename] = (stat.st_mtime, stat.st_size, content_hash)
+    return content_hash
+
+
+def hashed_static_url(endpoint, values):
+    """url_defaults hook: url_for('static', filename='script.js') builds
+    /static/script.<content hash>.js, so a changed file gets a new URL."""
+    from app import app
+
+    if endpoint != 'static' or not values.get('filename'):
+        return
+    filename = values['filename']
+    content_hash = static_file_hash(app.static_folder, filename)
+    if content_hash:
+        stem, ext = os.path.splitext(filename)
+        values['filename'] = f'{stem}.{content_hash}{ext}'
+
+
+def serve_static(filename):
+    """The /static/ view. A content-hashed name whose hash matches the file is sent
+    with a year-long immutable Cache-Control; plain names (the service worker,
+    the manifest) and outdated hashes are revalidated on every use instead."""
+    from app import app
+
+    immutable = False
+    match = _HASHED_STATIC_NAME.match(filename)
+    if match and static_file_hash(app.static_folder, filename) is None:
+        original = match.group('stem') + match.group('ext')
+        content_hash = static_file_hash(app.static_folder, original)
+        if content_hash is not None:
+            immutable = content_hash == match.group('hash')
+            filename = original
+
+    response = app.send_static_file(filename)
+    if immutable:
+        response.cache_control.no_cache = None # send_file's default without a max age
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE_SECONDS
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def init_http_caching(app):
+    """Registers the API ETag hooks and the content-hashed /static/ handling on `app`."""
+    app.before_request(api_not_modified)
+    app.after_request(add_api_etag)
+    app.url_defaults(hashed_static_url)
+    app.view_functions['static'] = serve_static
@@ -0,0 +1,727 @@
+import sqlite3
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from monthly_load import refresh_monthly_load
+from reference_cache import AssignmentRef, get_reference_data, pick_assignment
+
+
+# Rows written per INSERT ... ON CONFLICT statement (and per commit).
+DEFAULT_CHUNK_SIZE = 1000
+
+TEMP_EMAIL_SUFFIX = '.temp@example.com'
+
+# Excel stores dates as days since this origin (with the 1900 leap-year bug baked in).
+EXCEL_DATE_ORIGIN = '1899-12-30'
+# Serials that convert to a pandas Timestamp (years 1677-2262), with a day to spare
+EXCEL_SERIAL_RANGE = (
+    (pd.Timestamp.min.date() - date(1899, 12, 30)).days + 1,
+    (pd.Timestamp.max.date() - date(1899, 12, 30)).days - 1,
+)
+
+# Tried in order on text dates; ambiguous day/month strings resolve month-first,
+# like pd.to_datetime does. Anything left over goes through dateutil ('mixed').
+WEEK_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%b %d, %Y', '%B %d, %Y', '%m-%d-%Y', '%d-%m-%Y']
+
+MAX_HOURS_PER_WEEK = 168
+DEFAULT_HOURS_ON_ERROR = 8
+
+# Most entries one /api/record_actual_hours/batch request may carry.
+MAX_BATCH_ENTRIES = 1000
+
+
+def _chunked(items, size):
+    """Yield successive slices of `items` holding at most `size` entries."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _as_date(value):
+    """Normalizes date-like values (date, datetime, Timestamp) to a date; None if invalid (e.g. NaT)."""
+    try:
+        return date(value.year, value.month, value.day)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _value_kinds(series):
+    """Masks of cells holding date/datetime objects and real numbers (bools excluded)."""
+    kinds = series.map(type)
+    unique_kinds = list(kinds.unique())
+    date_kinds = [k for k in unique_kinds if issubclass(k, (datetime, date))]
+    number_kinds = [
+        k for k in unique_kinds
+        if issubclass(k, (int, float, np.integer, np.floating)) and not issubclass(k, (bool, np.bool_))
+    ]
+    return kinds.isin(date_kinds), kinds.isin(number_kinds)
+
+
+def _text_column(df, column, default, missing_fill):
+    """String column with the same cleanup as str(value).strip() plus nan/None replacement."""
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[column]
+    text = values.astype(str).str.strip()
+    blank = values.isna() | text.str.lower().isin(['nan', 'none', ''])
+    return text.astype(object).where(~blank, missing_fill)
+
+
+def _parse_week_dates(raw, row_numbers, notes):
+    """Whole-column week date parsing. Blank cells and unparseable values become today's date."""
+    today = pd.Timestamp(datetime.now().date())
+
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        parsed = pd.to_datetime(raw, errors='coerce')
+        if getattr(parsed.dt, 'tz', None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+        return parsed.dt.normalize().fillna(today)
+
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype='datetime64[ns]')
+    missing = raw.isna() | raw.eq('')
+    is_date, is_number = _value_kinds(raw)
+    is_date &= ~missing
+    is_number &= ~missing
+    is_text = ~(missing | is_date | is_number)
+
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(raw[is_date], errors='coerce')
+    if is_number.any():
+        # Excel serial dates (e.g. 45824 -> 2025-06-16); serials outside the Timestamp
+        # range would overflow the conversion instead of coming back as NaT
+        serials = pd.to_numeric(raw[is_number], errors='coerce')
+        serials = serials.where(serials.between(*EXCEL_SERIAL_RANGE))
+        parsed[is_number] = pd.to_datetime(serials, unit='D', origin=EXCEL_DATE_ORIGIN, errors='coerce')
+    if is_text.any():
+        pending = raw[is_text].astype(str).str.strip()
+        for fmt in WEEK_DATE_FORMATS:
+            if pending.empty:
+                break
+            attempt = pd.to_datetime(pending, format=fmt, errors='coerce')
+            ok = attempt.notna()
+            parsed[ok[ok].index] = attempt[ok]
+            pending = pending[~ok]
+        if not pending.empty:
+            parsed[pending.index] = pd.to_datetime(pending, format='mixed', errors='coerce')
+
+    failed = parsed.isna() & ~missing
+    for pos in np.flatnonzero(failed & is_text):
+        notes.append((pos, f"Row {row_numbers[pos]}: Could not parse date '{raw.iat[pos]}', using current date"))
+    for pos in np.flatnonzero(failed & ~is_text):
+        notes.append((pos, f"Row {row_numbers[pos]}: Date parsing failed, using current date"))
+
+    return parsed.dt.normalize().fillna(today)
+
+
+def _parse_hours(raw, row_numbers, notes):
+    """Whole-column hours parsing: strips 'hours'/'hrs'/'h', handles 'a/b' fractions,
+    clamps to 0-168 and truncates to whole hours. Unparseable cells count as 8 hours."""
+    hours = pd.Series(0.0, index=raw.index)
+    failed = pd.Series(False, index=raw.index)
+
+    missing = raw.isna()
+    _, is_number = _value_kinds(raw)
+    is_number &= ~missing
+    if is_number.any():
+        hours[is_number] = pd.to_numeric(raw[is_number], errors='coerce')
+
+    text = raw[~(missing | is_number)].astype(str).str.strip()
+    text = text[text.ne('')]
+    if not text.empty:
+        text = (text.str.lower()
+                    .str.replace('hours', '', regex=False)
+                    .str.replace('hrs', '', regex=False)
+                    .str.replace('h', '', regex=False)
+                    .str.strip())
+        has_slash = text.str.contains('/', regex=False)
+
+        plain = pd.to_numeric(text[~has_slash], errors='coerce')
+        hours[plain.index] = plain
+        failed[plain.index[plain.isna()]] = True
+
+        fractions = text[has_slash]
+        # "7.5/2" is neither a float nor a simple fraction
+        failed[fractions.index[fractions.str.contains('.', regex=False)]] = True
+        parts = fractions[~fractions.str.contains('.', regex=False)].str.split('/')
+        # Anything other than exactly two parts (e.g. "1/2/3") is left at 0 hours
+        parts = parts[parts.str.len() == 2]
+        numerator = pd.to_numeric(parts.str[0], errors='coerce')
+        denominator = pd.to_numeric(parts.str[1], errors='coerce')
+        bad = numerator.isna() | denominator.isna() | denominator.eq(0)
+        hours[parts.index[~bad]] = (numerator / denominator)[~bad]
+        failed[parts.index[bad]] = True
+
+    hours = np.trunc(hours.clip(lower=0, upper=MAX_HOURS_PER_WEEK))
+    hours[failed] = DEFAULT_HOURS_ON_ERROR
+    for pos in np.flatnonzero(failed):
+        notes.append((pos, f"Row {row_numbers[pos]}: Could not parse hours '{raw.iat[pos]}', using default {DEFAULT_HOURS_ON_ERROR} hours"))
+    return hours.astype('int64')
+
+
+def parse_actual_hours_frame(df, column_mapping, errors):
+    """Parses a timesheet DataFrame into aggregated hours using whole-column operations.
+
+    Returns {(emp_name, project_name, function_name, week_start_date): total_hours}.
+    Per-row notes ("Row N: ...") are appended to `errors` in row order, numbered
+    as in the spreadsheet (index + 2).
+    """
+    mapped_columns = [column_mapping.get(field) for field in ('emp_name', 'project_name', 'function_name', 'week_days', 'hours')]
+    present_columns = [col for col in mapped_columns if col in df.columns]
+    # Filter out rows where the mapped columns are completely empty (e.g., blank rows at end)
+    if present_columns:
+        df = df.dropna(subset=present_columns, how='all')
+    if df.empty:
+        return {}
+
+    row_numbers = df.index.to_numpy() + 2
+    row_labels = pd.Series(df.index.to_numpy() + 1, index=df.index).astype(str)
+    df = df.reset_index(drop=True)
+    row_labels = row_labels.reset_index(drop=True)
+
+    emp_col, project_col, function_col, week_col, hours_col = mapped_columns
+    emp_names = _text_column(df, emp_col, 'Unknown Employee', 'Employee_' + row_labels)
+    project_names = _text_column(df, project_col, 'Unknown Project', 'Project_' + row_labels)
+    function_names = _text_column(df, function_col, 'General', 'General')
+
+    empty_column = pd.Series(None, index=df.index, dtype=object)
+    notes = []
+    week_dates = _parse_week_dates(df[week_col] if week_col in df.columns else empty_column, row_numbers, notes)
+    hours = _parse_hours(df[hours_col] if hours_col in df.columns else empty_column, row_numbers, notes)
+    # Date notes were collected first, so a stable sort keeps them ahead of hours notes for the same row
+    errors.extend(message for _, message in sorted(notes, key=lambda note: note[0]))
+
+    frame = pd.DataFrame({
+        'emp_name': emp_names,
+        'project_name': project_names,
+        'function_name': function_names,
+        'week_start_date': week_dates,
+        'hours': hours
+    })
+    totals = frame.groupby(['emp_name', 'project_name', 'function_name', 'week_start_date'], sort=False)['hours'].sum()
+    return {
+        (emp_name, project_name, function_name, week_start.date()): int(total)
+        for (emp_name, project_name, function_name, week_start), total in totals.items()
+    }
+
+
+def _max_bind_params(dialect_name):
+    """Upper bound on bound parameters per statement for the current database."""
+    if dialect_name == 'sqlite':
+        return 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    return 32767
+
+
+def _upsert_statement(dialect_name, table, rows, conflict_columns):
+    """Builds a multi-row INSERT ... ON CONFLICT DO UPDATE for SQLite/PostgreSQL.
+
+    Rows whose hours did not change are left untouched, so the statement's
+    rowcount is the number of inserted plus actually updated records.
+    Returns None for dialects without ON CONFLICT support.
+    """
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={'hours_worked': stmt.excluded.hours_worked},
+        where=table.c.hours_worked != stmt.excluded.hours_worked
+    )
+
+
+def _weekly_hours_conflict_columns(table):
+    """Column names of the `_assignment_week_function_uc` unique constraint."""
+    for constraint in table.constraints:
+        if constraint.name == '_assignment_week_function_uc':
+            return [col.name for col in constraint.columns]
+    raise RuntimeError("WeeklyHours is missing the _assignment_week_function_uc constraint")
+
+
+def _assignments_of_pairs(session, columns, pairs, param_limit):
+    """Rows of `columns` (which must include Assignment.employee_id and project_id)
+    for the assignments of the (employee_id, project_id) `pairs`, in id order per pair.
+
+    Filters on employee_id IN (...) AND project_id IN (...) so the lookup seeks on
+    ix_assignment_employee_project; SQLite runs a (employee_id, project_id) IN
+    (VALUES ...) filter as a full index scan. Combinations outside `pairs` that the
+    two IN lists also match are dropped here.
+    """
+    from app import Assignment
+
+    pairs = set(pairs)
+    project_ids_by_employee = {}
+    for employee_id, project_id in pairs:
+        project_ids_by_employee.setdefault(employee_id, set()).add(project_id)
+
+    rows = []
+    for employee_chunk in _chunked(sorted(project_ids_by_employee), param_limit // 2):
+        project_ids = set().union(*(project_ids_by_employee[employee_id] for employee_id in employee_chunk))
+        for project_chunk in _chunked(sorted(project_ids), param_limit // 2):
+            result = session.execute(
+                select(*columns)
+                .where(Assignment.employee_id.in_(employee_chunk), Assignment.project_id.in_(project_chunk))
+                .order_by(Assignment.id)
+            )
+            rows.extend(row for row in result if (row.employee_id, row.project_id) in pairs)
+    return rows
+
+
+def _resolve_employees(session, names, errors, param_limit):
+    """Returns {name: employee_id}, creating 'Imported' employees for unknown names."""
+    from app import Employee
+
+    # Known names come from the reference cache; only the rest are looked up
+    employees_by_name = get_reference_data().employee_ids_by_name
+    employee_ids = {name: employees_by_name[name] for name in names if name in employees_by_name}
+    for chunk in _chunked(sorted(set(names) - set(employee_ids)), param_limit):
+        rows = session.execute(
+            select(Employee.id, Employee.name).where(Employee.name.in_(chunk)).order_by(Employee.id)
+        )
+        for emp_id, name in rows:
+            employee_ids.setdefault(name, emp_id)
+
+    missing = [name for name in sorted(names) if name not in employee_ids]
+    if not missing:
+        return employee_ids
+
+    # Every generated address ends with the same suffix, so one query finds all collisions.
+    taken_emails = set(session.execute(
+        select(Employee.email).where(Employee.email.like(f'%{TEMP_EMAIL_SUFFIX}'))
+    ).scalars())
+
+    new_rows = []
+    for name in missing:
+        temp_email_base = name.lower().replace(' ', '.')
+        temp_email = f"{temp_email_base}{TEMP_EMAIL_SUFFIX}"
+        count = 0
+        while temp_email in taken_emails:
+            count += 1
+            temp_email = f"{temp_email_base}{count}{TEMP_EMAIL_SUFFIX}"
+        taken_emails.add(temp_email)
+        new_rows.append({'name': name, 'email': temp_email, 'role': 'Imported'})
+        errors.append(f"Created new employee '{name}' (temp email: {temp_email}).")
+
+    session.execute(insert(Employee.__table__), new_rows)
+
+    for chunk in _chunked(missing, param_limit):
+        rows = session.execute(
+            select(Employee.id, Employee.name).where(Employee.name.in_(chunk)).order_by(Employee.id)
+        )
+        for emp_id, name in rows:
+            employee_ids.setdefault(name, emp_id)
+    return employee_ids
+
+
+def _resolve_projects(session, names, errors, param_limit):
+    """Returns {name: project_id}, creating default projects for unknown names."""
+    from app import Project
+
+    projects_by_name = get_reference_data().project_ids_by_name
+    project_ids = {name: projects_by_name[name] for name in names if name in projects_by_name}
+    for chunk in _chunked(sorted(set(names) - set(project_ids)), param_limit):
+        rows = session.execute(select(Project.id, Project.name).where(Project.name.in_(chunk)))
+        project_ids.update({name: proj_id for proj_id, name in rows})
+
+    missing = [name for name in sorted(names) if name not in project_ids]
+    if not missing:
+        return project_ids
+
+    current_year = datetime.now().year
+    new_rows = []
+    for name in missing:
+        new_rows.append({
+            'name': name,
+            'duration_months': 12,
+            'start_month': "January",
+            'start_year': current_year,
+            'end_month': "December",
+            'end_year': current_year + 1
+        })
+        errors.append(f"Created new project '{name}'.")
+
+    session.execute(insert(Project.__table__), new_rows)
+
+    for chunk in _chunked(missing, param_limit):
+        rows = session.execute(select(Project.id, Project.name).where(Project.name.in_(chunk)))
+        project_ids.update({name: proj_id for proj_id, name in rows})
+    return project_ids
+
+
+def _resolve_assignments(session, pairs, pair_names, errors, param_limit):
+    """Returns {(employee_id, project_id): assignment_id}, creating default assignments."""
+    from app import Assignment
+
+    def load(keys):
+        found = {}
+        columns = (Assignment.id, Assignment.employee_id, Assignment.project_id)
+        for assignment_id, employee_id, project_id in _assignments_of_pairs(session, columns, keys, param_limit):
+            found.setdefault((employee_id, project_id), assignment_id)
+        return found
+
+    reference_data = get_reference_data()
+    assignment_ids = {}
+    for pair in pairs:
+        cached = reference_data.assignment(*pair)
+        if cached:
+            assignment_ids[pair] = cached.id
+    assignment_ids.update(load(set(pairs) - set(assignment_ids)))
+    missing = [pair for pair in sorted(pairs) if pair not in assignment_ids]
+    if not missing:
+        return assignment_ids
+
+    current_year = datetime.now().year
+    new_rows = []
+    for employee_id, project_id in missing:
+        new_rows.append({
+            'employee_id': employee_id,
+            'project_id': project_id,
+            'assigned_hours_per_week': 40, # Default assigned hours for auto-created
+            'assigned_start_month': "January",
+            'assigned_start_year': current_year,
+            'assigned_end_month': "December",
+            'assigned_end_year': current_year + 1
+        })
+        emp_name, project_name = pair_names[(employee_id, project_id)]
+        errors.append(f"Created new assignment for '{emp_name}' on '{project_name}'.")
+
+    session.execute(insert(Assignment.__table__), new_rows)
+    assignment_ids.update(load(missing))
+    return assignment_ids
+
+
+def _merge_weekly_hours_chunk(session, rows):
+    """Portable fallback for databases without ON CONFLICT: select existing, then insert/update."""
+    from app import WeeklyHours
+
+    keys = {(r['assignment_id'], r['week_start_date'], r['function_name']): r for r in rows}
+    existing = session.query(WeeklyHours).filter(
+        WeeklyHours.assignment_id.in_({r['assignment_id'] for r in rows}),
+        WeeklyHours.week_start_date.in_({r['week_start_date'] for r in rows})
+    ).all()
+
+    written = 0
+    for record in existing:
+        row = keys.pop((record.assignment_id, record.week_start_date, record.function_name), None)
+        if row and record.hours_worked != row['hours_worked']:
+            record.hours_worked = row['hours_worked']
+            written += 1
+    if keys:
+        session.execute(insert(WeeklyHours.__table__), list(keys.values()))
+        written += len(keys)
+    return written
+
+
+def upsert_actual_hours(aggregated_weekly_hours, errors, chunk_size=None, progress=None):
+    """Writes aggregated actual hours with set-based queries.
+
+    `aggregated_weekly_hours` maps (emp_name, project_name, function_name, week_start_date)
+    to total hours. Employees, projects and assignments are resolved with bulk IN
+    queries (missing ones are created with the same defaults as before), then the
+    WeeklyHours rows are upserted with one multi-row INSERT ... ON CONFLICT per chunk
+    and one commit per chunk; the touched employees' monthly_load rows are refreshed
+    at the end. Returns the number of inserted/updated records.
+    `progress`, if given, is called with rows_written=<entries saved so far> after each chunk.
+    """
+    from app import app, db, WeeklyHours
+
+    valid_weekly_hours = {}
+    for (emp_name, project_name, function_name, week_start_date), hours in aggregated_weekly_hours.items():
+        week_date = _as_date(week_start_date)
+        if week_date is None:
+            errors.append(f"Error during DB save for ({emp_name}, {project_name}, {function_name}, {week_start_date}): invalid week start date. Continuing with next record.")
+            continue
+        key = (emp_name, project_name, function_name, week_date)
+        valid_weekly_hours[key] = valid_weekly_hours.get(key, 0) + hours
+    aggregated_weekly_hours = valid_weekly_hours
+
+    if not aggregated_weekly_hours:
+        return 0
+
+    session = db.session
+    dialect_name = session.get_bind().dialect.name
+    param_limit = _max_bind_params(dialect_name)
+    chunk_size = chunk_size or app.config.get('IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+    table = WeeklyHours.__table__
+    conflict_columns = _weekly_hours_conflict_columns(table)
+    # Each WeeklyHours row binds four parameters in a multi-row VALUES clause.
+    chunk_size = max(1, min(chunk_size, param_limit // 4))
+
+    try:
+        employee_ids = _resolve_employees(
+            session, {key[0] for key in aggregated_weekly_hours}, errors, param_limit)
+        project_ids = _resolve_projects(
+            session, {key[1] for key in aggregated_weekly_hours}, errors, param_limit)
+
+        pair_names = {}
+        for emp_name, project_name, _, _ in aggregated_weekly_hours:
+            pair_names[(employee_ids[emp_name], project_ids[project_name])] = (emp_name, project_name)
+        assignment_ids = _resolve_assignments(session, set(pair_names), pair_names, errors, param_limit)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        errors.append(f"Error resolving employees, projects and assignments: {str(e)}. No hours were saved.")
+        return 0
+
+    rows = [
+        {
+            'assignment_id': assignment_ids[(employee_ids[emp_name], project_ids[project_name])],
+            'week_start_date': week_start_date,
+            'hours_worked': hours,
+            'function_name': function_name
+        }
+        for (emp_name, project_name, function_name, week_start_date), hours in aggregated_weekly_hours.items()
+    ]
+
+    imported_count = 0
+    processed_count = 0
+    for chunk in _chunked(rows, chunk_size):
+        try:
+            stmt = _upsert_statement(dialect_name, table, chunk, conflict_columns)
+            if stmt is not None:
+                imported_count += session.execute(stmt).rowcount
+            else:
+                imported_count += _merge_weekly_hours_chunk(session, chunk)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            first = chunk[0]
+            errors.append(
+                f"Error during DB save for {len(chunk)} entries starting at assignment "
+                f"{first['assignment_id']}, week {first['week_start_date']}: {str(e)}. Continuing with next chunk."
+            )
+        processed_count += len(chunk)
+        if progress:
+            progress(rows_written=processed_count)
+
+    try:
+        refresh_monthly_load(set(employee_ids.values()))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        errors.append(f"Hours were saved but the monthly workload totals could not be refreshed: {str(e)}. Run 'flask rebuild-monthly-load'.")
+    return imported_count
+
+
+def _parse_batch_entry(entry):
+    """Validates one batch entry the way /api/record_actual_hours validates its body.
+
+    Returns (employee_id, project_id, week_start_date, function_name, hours), or the
+    error message for an invalid entry.
+    """
+    if not isinstance(entry, dict):
+        return "Each entry must be a JSON object."
+    employee_id = entry.get('employee_id')
+    project_id = entry.get('project_id')
+    week_start_date_str = entry.get('week_start_date')
+    hours_worked_raw = entry.get('hours_worked')
+    function_name = entry.get('function_name')
+
+    if isinstance(function_name, str):
+        function_name = function_name.strip()
+    if not all([employee_id, project_id, week_start_date_str, hours_worked_raw is not None, function_name]):
+        return "Missing actual hours data. All fields are required."
+    if not isinstance(function_name, str):
+        return "Invalid function name. It must be text."
+    try:
+        hours_worked = int(hours_worked_raw)
+    except (ValueError, TypeError):
+        return "Invalid format for hours worked. Hours must be a valid number."
+    try:
+        employee_id = int(employee_id)
+        project_id = int(project_id)
+    except (ValueError, TypeError):
+        return "Invalid employee or project id."
+    try:
+        week_start_date = datetime.strptime(str(week_start_date_str), '%Y-%m-%d').date()
+    except ValueError:
+        return "Invalid date format for week_start_date. Use YYYY-MM-DD."
+    return employee_id, project_id, week_start_date, function_name, hours_worked
+
+
+def _batch_assignments(session, weeks, param_limit):
+    """Returns {(employee_id, project_id, week_start_date): assignment_id} for `weeks`,
+    preferring the assignment whose period covers the week like the single-entry
+    endpoint. Missing assignments are created in one INSERT with that endpoint's
+    defaults (40 hours a week, from this month for a year); keys whose employee or
+    project does not exist map to None.
+    """
+    from app import Assignment, Employee, Project
+
+    def load(pairs):
+        found = {}
+        columns = (Assignment.id, Assignment.employee_id, Assignment.project_id,
+                   Assignment.assigned_start_date, Assignment.assigned_end_date)
+        for row in _assignments_of_pairs(session, columns, pairs, param_limit):
+            found.setdefault((row.employee_id, row.project_id), []).append(AssignmentRef(*row))
+        return found
+
+    def pick(keys, found):
+        for employee_id, project_id, week_start_date in keys:
+            assignment = pick_assignment(found.get((employee_id, project_id)), week_start_date)
+            if assignment:
+                assignment_ids[(employee_id, project_id, week_start_date)] = assignment.id
+
+    reference_data = get_reference_data()
+    assignment_ids = {}
+    for key in weeks:
+        cached = reference_data.assignment(*key)
+        if cached:
+            assignment_ids[key] = cached.id
+    unresolved = [key for key in weeks if key not in assignment_ids]
+    if unresolved:
+        pick(unresolved, load({key[:2] for key in unresolved}))
+
+    missing_pairs = sorted({key[:2] for key in weeks if key not in assignment_ids})
+    if missing_pairs:
+        # Only pairs whose employee and project exist get an assignment
+        employee_ids = {pair[0] for pair in missing_pairs if reference_data.employee(pair[0])}
+        project_ids = {pair[1] for pair in missing_pairs if reference_data.project(pair[1])}
+        for chunk in _chunked({pair[0] for pair in missing_pairs} - employee_ids, param_limit):
+            employee_ids.update(session.execute(select(Employee.id).where(Employee.id.in_(chunk))).scalars())
+        for chunk in _chunked({pair[1] for pair in missing_pairs} - project_ids, param_limit):
+            project_ids.update(session.execute(select(Project.id).where(Project.id.in_(chunk))).scalars())
+        creatable = [pair for pair in missing_pairs if pair[0] in employee_ids and pair[1] in project_ids]
+
+        if creatable:
+            today = date.today()
+            session.execute(insert(Assignment.__table__), [
+                {
+                    'employee_id': employee_id,
+                    'project_id': project_id,
+                    'assigned_hours_per_week': 40,
+                    'assigned_start_month': today.strftime('%B'),
+                    'assigned_start_year': today.year,
+                    'assigned_end_month': today.strftime('%B'),
+                    'assigned_end_year': today.year + 1
+                }
+                for employee_id, project_id in creatable
+            ])
+            pick([key for key in weeks if key not in assignment_ids], load(creatable))
+
+    for key in weeks:
+        assignment_ids.setdefault(key, None)
+    return assignment_ids
+
+
+def _weekly_hours_ids(session, keys, param_limit):
+    """Returns {(assignment_id, week_start_date, function_name): weekly_hours_id} for the existing rows among `keys`.
+
+    Like _assignments_of_pairs, filters on assignment_id IN (...) AND week_start_date
+    IN (...), a seek on the unique constraint's index, and drops the extra matches here.
+    """
+    from app import WeeklyHours
+
+    keys = set(keys)
+    weeks_by_assignment = {}
+    for assignment_id, week_start_date, _ in keys:
+        weeks_by_assignment.setdefault(assignment_id, set()).add(week_start_date)
+
+    found = {}
+    for assignment_chunk in _chunked(sorted(weeks_by_assignment), param_limit // 2):
+        weeks = set().union(*(weeks_by_assignment[assignment_id] for assignment_id in assignment_chunk))
+        for week_chunk in _chunked(sorted(weeks), param_limit // 2):
+            rows = session.execute(
+                select(WeeklyHours.id, WeeklyHours.assignment_id, WeeklyHours.week_start_date, WeeklyHours.function_name)
+                .where(WeeklyHours.assignment_id.in_(assignment_chunk), WeeklyHours.week_start_date.in_(week_chunk))
+            )
+            for weekly_hours_id, assignment_id, week_start_date, function_name in rows:
+                key = (assignment_id, week_start_date, function_name)
+                if key in keys:
+                    found[key] = weekly_hours_id
+    return found
+
+
+def record_actual_hours_batch(entries):
+    """Records many /api/record_actual_hours entries in one transaction.
+
+    The entries are validated together and invalid ones are reported and skipped.
+    When the same employee, project, function and week appear more than once, the
+    last entry wins. Assignments are resolved in bulk through _batch_assignments,
+    which creates the missing ones. Every WeeklyHours row is then upserted with
+    multi-row INSERT ... ON CONFLICT statements, the touched employees'
+    monthly_load rows are refreshed, and everything is committed once.
+
+    Returns one result per entry, in order. Each result has 'index', an HTTP-style
+    'status' (201 recorded, 200 updated, 400 invalid, 404 unknown employee or
+    project, 409 superseded) and 'message'. Saved entries also carry the row's
+    'id' and its hours as 'record', like the single-entry response. On a database
+    error the transaction is rolled back and the error raised, so no entry is saved.
+    """
+    from app import db, WeeklyHours
+
+    session = db.session
+    dialect_name = session.get_bind().dialect.name
+    param_limit = _max_bind_params(dialect_name)
+    results = [None] * len(entries)
+
+    # (employee_id, project_id, week_start_date, function_name) -> (entry index, hours)
+    valid_entries = {}
+    for index, entry in enumerate(entries):
+        parsed = _parse_batch_entry(entry)
+        if isinstance(parsed, str):
+            results[index] = {'index': index, 'status': 400, 'message': parsed}
+            continue
+        employee_id, project_id, week_start_date, function_name, hours_worked = parsed
+        key = (employee_id, project_id, week_start_date, function_name)
+        if key in valid_entries:
+            earlier = valid_entries[key][0]
+            results[earlier] = {
+                'index': earlier, 'status': 409,
+                'message': f"Superseded by entry {index} for the same employee, project, function and week."
+            }
+        valid_entries[key] = (index, hours_worked)
+    if not valid_entries:
+        return results
+
+    table = WeeklyHours.__table__
+    conflict_columns = _weekly_hours_conflict_columns(table)
+    try:
+        assignment_ids = _batch_assignments(session, {key[:3] for key in valid_entries}, param_limit)
+
+        rows = {}
+        for (employee_id, project_id, week_start_date, function_name), (index, hours_worked) in valid_entries.items():
+            assignment_id = assignment_ids[(employee_id, project_id, week_start_date)]
+            if assignment_id is None:
+                results[index] = {'index': index, 'status': 404, 'message': "Employee or Project not found for on-the-fly assignment."}
+                continue
+            rows[(assignment_id, week_start_date, function_name)] = {
+                'assignment_id': assignment_id,
+                'week_start_date': week_start_date,
+                'hours_worked': hours_worked,
+                'function_name': function_name
+            }
+
+        existing_ids = _weekly_hours_ids(session, rows, param_limit)
+        # Each WeeklyHours row binds four parameters in a multi-row VALUES clause.
+        for chunk in _chunked(rows.values(), max(1, param_limit // 4)):
+            stmt = _upsert_statement(dialect_name, table, chunk, conflict_columns)
+            if stmt is not None:
+                session.execute(stmt)
+            else:
+                _merge_weekly_hours_chunk(session, chunk)
+        weekly_hours_ids = _weekly_hours_ids(session, [key for key in rows if key not in existing_ids], param_limit)
+        weekly_hours_ids.update(existing_ids)
+
+        refresh_monthly_load({key[0] for key in valid_entries if assignment_ids[key[:3]] is not None})
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    for (employee_id, project_id, week_start_date, function_name), (index, hours_worked) in valid_entries.items():
+        assignment_id = assignment_ids[(employee_id, project_id, week_start_date)]
+        if assignment_id is None:
+            continue
+        key = (assignment_id, week_start_date, function_name)
+        if key in existing_ids:
+            status, message = 200, "Actual hours updated successfully!"
+        else:
+            status, message = 201, "Actual hours recorded successfully!"
+        results[index] = {'index': index, 'status': status, 'message': message, 'id': weekly_hours_ids.get(key), 'record': hours_worked}
+    return results
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import func, inspect
+from werkzeug.utils import secure_filename
+
+
+# Minimum seconds between progress writes to an import job's row.
+PROGRESS_FLUSH_INTERVAL = 0.5
+# Seconds between heartbeat writes for the jobs this process has queued or is running.
+HEARTBEAT_INTERVAL = 30
+# A queued or running job without a heartbeat for this long belongs to a process
+# that is gone (restart, crash, scaled-down instance) and is marked failed.
+STALE_JOB_SECONDS = 5 * HEARTBEAT_INTERVAL
+
+STALE_JOB_MESSAGE = "Import was interrupted because the server restarted before it finished. Please upload the file again."
+
+_executor = None
+_executor_lock = threading.Lock()
+# Ids of the jobs queued or running on this process's pool; the heartbeat keeps them alive
+_owned_jobs = set()
+_owned_jobs_lock = threading.Lock()
+
+
+def _get_executor():
+    """Lazily creates the per-process pool that runs import jobs."""
+    global _executor
+    from app import app
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('IMPORT_JOB_WORKERS', 2),
+                thread_name_prefix='import-job'
+            )
+            threading.Thread(target=_heartbeat_loop, name='import-job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def _heartbeat_loop():
+    """Touches heartbeat_at of this process's jobs every HEARTBEAT_INTERVAL seconds,
+    so other processes can tell them from jobs whose process is gone."""
+    from app import app, db, ImportJob
+
+    table = ImportJob.__table__
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        with _owned_jobs_lock:
+            job_ids = list(_owned_jobs)
+        if not job_ids:
+            continue
+        try:
+            with app.app_context(), db.engine.begin() as conn:
+                conn.execute(table.update().where(table.c.id.in_(job_ids)).values(heartbeat_at=datetime.now()))
+        except Exception as e: # a missed beat only matters after STALE_JOB_SECONDS
+            app.logger.warning(f"Could not write import job heartbeat: {e}")
+
+
+def _job_table_ready():
+    """True when the import_job table exists with every column the sweep writes."""
+    from app import db, ImportJob
+
+    inspector = inspect(db.engine)
+    if not inspector.has_table(ImportJob.__tablename__):
+        return False
+    columns = {column['name'] for column in inspector.get_columns(ImportJob.__tablename__)}
+    return 'heartbeat_at' in columns
+
+
+def fail_stale_import_jobs(job_id=None):
+    """Marks queued or running jobs without a heartbeat for STALE_JOB_SECONDS as
+    failed (all of them, or only `job_id`). Their process died before finishing, so
+    nothing else would ever update them. Returns the number of jobs marked."""
+    from app import db, ImportJob
+
+    table = ImportJob.__table__
+    # The sweep of all jobs runs when app.py is imported, also by `flask db` commands
+    # on a database that is not upgraded yet; the schema belongs to the migrations
+    if job_id is None and not _job_table_ready():
+        return 0
+    now = datetime.now()
+    cutoff = now - timedelta(seconds=STALE_JOB_SECONDS)
+    last_seen = func.coalesce(table.c.heartbeat_at, table.c.started_at, table.c.created_at)
+    stmt = table.update().where(table.c.status.in_(['queued', 'running']), last_seen < cutoff)
+    if job_id is not None:
+        stmt = stmt.where(table.c.id == job_id)
+    result = {"success": False, "message": STALE_JOB_MESSAGE, "errors": []}
+    with db.engine.begin() as conn:
+        return conn.execute(stmt.values(status='failed', result_json=json.dumps(result), finished_at=now)).rowcount
+
+
+class JobProgress:
+    """Progress callback for process_import_file that throttles writes to the job row.
+
+    Updates go through their own connection so they never mix with the import's
+    own transaction.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.pending = {}
+        self.last_flush = 0.0
+
+    def __call__(self, **fields):
+        self.pending.update(fields)
+        if time.monotonic() - self.last_flush >= PROGRESS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        from app import db, ImportJob
+
+        if not self.pending:
+            return
+        table = ImportJob.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                table.update().where(table.c.id == self.job_id).values(heartbeat_at=datetime.now(), **self.pending)
+            )
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+
+def submit_import_job(file_storage, data_type):
+    """Saves an uploaded file to the spool directory and queues its import.
+
+    Returns the new ImportJob; poll /api/import_jobs/<id> for its progress.
+    """
+    from app import app, db, ImportJob
+
+    spool_dir = app.config['IMPORT_SPOOL_DIR']
+    os.makedirs(spool_dir, exist_ok=True)
+
+    job_id = uuid.uuid4().hex
+    filename = secure_filename(file_storage.filename) or 'upload'
+    spool_path = os.path.join(spool_dir, f"{job_id}_{filename}")
+    file_storage.save(spool_path)
+
+    job = ImportJob(
+        id=job_id,
+        data_type=data_type,
+        filename=file_storage.filename,
+        spool_path=spool_path,
+        status='queued',
+        heartbeat_at=datetime.now()
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    with _owned_jobs_lock:
+        _owned_jobs.add(job_id)
+    _get_executor().submit(run_import_job, job_id)
+    return job
+
+
+def run_import_job(job_id):
+    """Runs one queued import job to completion. Executed on the job pool."""
+    from app import app, db, ImportJob, process_import_file
+
+    with app.app_context():
+        job = ImportJob.query.get(job_id)
+        if not job:
+            app.logger.error(f"Import job {job_id} vanished before it could run")
+            with _owned_jobs_lock:
+                _owned_jobs.discard(job_id)
+            return
+
+        spool_path = job.spool_path
+        try:
+            job.status = 'running'
+            job.started_at = job.heartbeat_at = datetime.now()
+            db.session.commit()
+
+            progress = JobProgress(job_id)
+            try:
+                result = process_import_file(spool_path, job.data_type, progress=progress)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Import job {job_id} failed: {e}")
+                result = {"success": False, "message": f"Import failed: {str(e)}", "errors": []}
+            progress.flush()
+
+            job = ImportJob.query.get(job_id)
+            db.session.refresh(job)
+            job.status = 'completed' if result.get('success') else 'failed'
+            job.result_json = json.dumps(result, default=str)
+            job.finished_at = datetime.now()
+            db.session.commit()
+        finally:
+            with _owned_jobs_lock:
+                _owned_jobs.discard(job_id)
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            db.session.remove()
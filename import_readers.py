@@ -0,0 +1,230 @@
+import pandas as pd
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError: # calamine is optional; openpyxl covers .xlsx without it
+    CalamineWorkbook = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError: # only needed for .parquet uploads
+    pq = None
+
+
+# Rows per DataFrame handed to the import pipeline.
+DEFAULT_READ_CHUNK_ROWS = 5000
+
+# How many rows below the first one are searched for a header row.
+HEADER_SEARCH_ROWS = 5
+
+# Upload formats accepted by the import endpoint, longest suffix first.
+IMPORT_FILE_EXTENSIONS = ('.csv.gz', '.xlsx', '.xls', '.csv', '.parquet')
+
+
+def import_file_extension(filename):
+    """Returns the supported extension `filename` ends with (e.g. '.csv.gz'), or None."""
+    lowered = filename.lower()
+    for extension in IMPORT_FILE_EXTENSIONS:
+        if lowered.endswith(extension):
+            return extension
+    return None
+
+
+def _clean_cell(value):
+    """Normalizes blank cells (None, '' from calamine) to None."""
+    if value is None or (isinstance(value, str) and value == ''):
+        return None
+    return value
+
+
+def _is_blank_row(row):
+    return all(value is None for value in row)
+
+
+def _is_text_row(row):
+    """True when at least 60% of the cells hold non-empty text (a likely header row)."""
+    text_count = sum(1 for val in row if isinstance(val, str) and len(str(val).strip()) > 0)
+    return text_count >= len(row) * 0.6
+
+
+def _unique_column_names(names):
+    """De-duplicates header names the way pandas does ('Hours', 'Hours.1', ...)."""
+    seen = {}
+    unique = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            unique.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            unique.append(name)
+    return unique
+
+
+class SpreadsheetReader:
+    """Streams an uploaded .xlsx/.xls/.csv/.csv.gz/.parquet file as DataFrame chunks.
+
+    .xlsx files are read with openpyxl in read-only mode (or calamine when it is
+    installed), CSV files with pandas' chunked reader and Parquet files one row
+    group batch at a time, so only one chunk of rows is held in memory. The header
+    row is detected the same way the import always has: the first row, unless it
+    has blank or numeric headers, in which case the next few rows are searched
+    for one that is mostly text.
+
+    Data row indexes count from 0 just below the header row, so `index + 2` is
+    the spreadsheet row number for files with headers on the first row. Fully
+    blank rows are skipped but still counted.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_READ_CHUNK_ROWS):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rows_read = 0
+        self.estimated_rows = None
+        self._close = None
+        self._next_index = 0
+
+        self._rows = self._open_rows(path)
+        self.columns, buffered = self._detect_header()
+        self._buffered = buffered
+        self.sample = self._read_chunk()
+
+    # --- Row sources ---
+
+    def _open_rows(self, path):
+        extension = import_file_extension(path)
+
+        if extension in ('.csv', '.csv.gz'):
+            return self._csv_rows(path)
+        if extension == '.parquet':
+            return self._parquet_rows(path)
+
+        if CalamineWorkbook is not None:
+            workbook = CalamineWorkbook.from_path(path)
+            sheet = workbook.get_sheet_by_index(0)
+            self.estimated_rows = max(sheet.height - 1, 0)
+            rows = sheet.iter_rows() if hasattr(sheet, 'iter_rows') else iter(sheet.to_python())
+            return ([_clean_cell(value) for value in row] for row in rows)
+
+        if extension == '.xls':
+            # openpyxl cannot read legacy .xls; fall back to reading the sheet whole
+            df = pd.read_excel(path, header=None)
+            self.estimated_rows = max(len(df) - 1, 0)
+            df = df.astype(object).where(df.notna(), None)
+            return (list(row) for row in df.itertuples(index=False, name=None))
+
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        self._close = workbook.close
+        worksheet = workbook.worksheets[0]
+        if worksheet.max_row:
+            self.estimated_rows = max(worksheet.max_row - 1, 0)
+        return ([_clean_cell(value) for value in row] for row in worksheet.iter_rows(values_only=True))
+
+    def _csv_rows(self, path):
+        # Everything is read as text (blank cells become None) so values look the same
+        # in every chunk; the import's parsers already handle numbers and dates in text.
+        chunks = pd.read_csv(
+            path, header=None, dtype=str, keep_default_na=False, na_values=[''],
+            chunksize=self.chunk_size, compression='infer'
+        )
+        self._close = chunks.close
+        for chunk in chunks:
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            yield from (list(row) for row in chunk.itertuples(index=False, name=None))
+
+    def _parquet_rows(self, path):
+        if pq is None:
+            raise ValueError("Parquet import requires the 'pyarrow' package to be installed.")
+        parquet_file = pq.ParquetFile(path)
+        self.estimated_rows = parquet_file.metadata.num_rows
+        self._close = parquet_file.close if hasattr(parquet_file, 'close') else None
+        # The schema provides the header row
+        yield list(parquet_file.schema_arrow.names)
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_size):
+            columns = [column.to_pylist() for column in batch.columns]
+            yield from (list(row) for row in zip(*columns))
+
+    # --- Header detection ---
+
+    def _detect_header(self):
+        first_row = None
+        for row in self._rows:
+            if not _is_blank_row(row):
+                first_row = row
+                break
+        if first_row is None:
+            return [], []
+
+        width = len(first_row)
+        columns = [str(value).strip() if value is not None else f"Unnamed: {i}" for i, value in enumerate(first_row)]
+
+        # If columns are unnamed or numeric, try to find headers in the next few rows
+        if not any(col.startswith('Unnamed:') or col.isdigit() for col in columns):
+            return _unique_column_names(columns), []
+
+        buffered = []
+        for row in self._rows:
+            buffered.append(self._fit(row, width))
+            if len(buffered) >= HEADER_SEARCH_ROWS:
+                break
+
+        for i, row in enumerate(buffered):
+            if _is_text_row(row):
+                columns = [str(val).strip() if val is not None else f"Column_{j}" for j, val in enumerate(row)]
+                return _unique_column_names(columns), buffered[:i] + buffered[i + 1:]
+
+        # No header row found: generic column names, and the first row is data
+        return [f"Column_{i}" for i in range(width)], [self._fit(first_row, width)] + buffered
+
+    def _fit(self, row, width):
+        row = list(row)
+        if len(row) < width:
+            row.extend([None] * (width - len(row)))
+        return row[:width]
+
+    # --- Chunking ---
+
+    def _read_chunk(self):
+        width = len(self.columns)
+        records = []
+        index = []
+
+        while self._buffered and len(records) < self.chunk_size:
+            row = self._buffered.pop(0)
+            if not _is_blank_row(row):
+                records.append(row)
+                index.append(self._next_index)
+            self._next_index += 1
+
+        if width:
+            for row in self._rows:
+                if not _is_blank_row(row):
+                    records.append(self._fit(row, width))
+                    index.append(self._next_index)
+                self._next_index += 1
+                if len(records) >= self.chunk_size:
+                    break
+
+        self.rows_read += len(records)
+        return pd.DataFrame.from_records(records, columns=self.columns, index=pd.Index(index, dtype='int64'))
+
+    def __iter__(self):
+        """Yields the sample chunk, then the rest of the sheet chunk by chunk."""
+        chunk, self.sample = self.sample, None
+        try:
+            while chunk is not None and not chunk.empty:
+                yield chunk
+                chunk = self._read_chunk()
+        finally:
+            self.close()
+
+    def iterrows(self):
+        """Row-by-row view across all chunks, like DataFrame.iterrows()."""
+        for chunk in self:
+            yield from chunk.iterrows()
+
+    def close(self):
+        if self._close:
+            self._close()
+            self._close = None
@@ -0,0 +1,164 @@
+import dataclasses
+from functools import lru_cache
+from operator import itemgetter
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # optional; the stdlib json module is used without it
+    orjson = None
+
+try:
+    import msgspec
+except ImportError: # optional; only tried when orjson is missing
+    msgspec = None
+
+
+# Items encoded per chunk by the streaming responses.
+STREAM_CHUNK_ITEMS = 500
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON through orjson, with the same output as Flask's default provider: sorted
+    keys, and dates, decimals and other extra types through DefaultJSONProvider.default."""
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+class MsgspecProvider(OrjsonProvider):
+    """JSON through msgspec when orjson is not installed."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        try:
+            self._encoder = msgspec.json.Encoder(enc_hook=self.default, order='sorted' if self.sort_keys else None)
+        except TypeError: # msgspec before 0.18 has no `order`
+            self._encoder = msgspec.json.Encoder(enc_hook=self.default)
+
+    def dumps_bytes(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, s, **kwargs):
+        return msgspec.json.decode(s)
+
+
+def init_json_provider(app):
+    """Installs the fastest available JSON provider on `app`; returns its name."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+        return 'orjson'
+    if msgspec is not None:
+        app.json = MsgspecProvider(app)
+        return 'msgspec'
+    return 'json'
+
+
+def _dumps_bytes(obj):
+    from flask import current_app
+
+    provider = current_app.json
+    if hasattr(provider, 'dumps_bytes'):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def record_type(fields):
+    """Dataclass with the given field names in sorted order, i.e. the key order
+    sorted JSON output uses; orjson and msgspec serialize it natively."""
+    return dataclasses.make_dataclass('Record', sorted(fields))
+
+
+def _encodes_records():
+    from flask import current_app
+    return isinstance(current_app.json, OrjsonProvider)
+
+
+def record_factory(fields):
+    """Builds one JSON object with the given fields from keyword arguments: a
+    record_type(fields) instance under orjson/msgspec, else a plain dict (the
+    stdlib provider would turn a dataclass into one anyway, only slower)."""
+    return record_type(tuple(fields)) if _encodes_records() else dict
+
+
+def records(rows, fields, convert=None):
+    """JSON objects for tuples whose first values are in `fields` order; trailing
+    values (e.g. a cursor column) are ignored. `convert` maps a field name to a
+    function applied to its non-null values, e.g. date.isoformat.
+
+    The field list is resolved once, so rows are serialized through the record
+    type (see record_factory) without going through each model's to_dict().
+    """
+    fields = tuple(fields)
+    if convert:
+        converters = [(position, convert[name]) for position, name in enumerate(fields) if name in convert]
+
+        def converted(row):
+            row = list(row)
+            for position, fn in converters:
+                if row[position] is not None:
+                    row[position] = fn(row[position])
+            return row
+
+        rows = map(converted, rows)
+    names = sorted(fields)
+    reorder = itemgetter(*sorted(range(len(fields)), key=fields.__getitem__)) if len(fields) > 1 else None
+    if _encodes_records():
+        record = record_type(fields)
+        if reorder is None:
+            return [record(*row[:len(fields)]) for row in rows]
+        return [record(*reorder(row)) for row in rows]
+    if reorder is None:
+        return [dict(zip(names, row[:len(fields)])) for row in rows]
+    return [dict(zip(names, reorder(row))) for row in rows]
+
+
+def _array_chunks(items):
+    """Encodes `items` as one JSON array, STREAM_CHUNK_ITEMS at a time."""
+    yield b'['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == STREAM_CHUNK_ITEMS:
+            yield (b'' if first else b',') + _dumps_bytes(chunk)[1:-1]
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + _dumps_bytes(chunk)[1:-1]
+    yield b']'
+
+
+def streamed_json(obj, stream_key):
+    """Streams the JSON object `obj` whose `stream_key` holds an iterable that is
+    encoded chunk by chunk as it is consumed; keys come out sorted, as with jsonify."""
+
+    def generate():
+        yield b'{'
+        for index, key in enumerate(sorted(obj)):
+            yield (b',' if index else b'') + _dumps_bytes(key) + b':'
+            if key == stream_key:
+                yield from _array_chunks(obj[key])
+            else:
+                yield _dumps_bytes(obj[key])
+        yield b'}\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+
+# Fields an actual_hours_bulk column mapping must cover.
+MAPPING_FIELDS = ('emp_name', 'project_name', 'function_name', 'week_days', 'hours')
+
+
+def header_fingerprint(columns):
+    """Hashes a header row. Column order matters (the fallback mapping is positional),
+    case and surrounding whitespace do not."""
+    normalized = [str(col).strip().lower() for col in columns]
+    return hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+
+
+def validate_mapping(mapping, columns):
+    """Returns an error message if `mapping` does not map every field to one of `columns`."""
+    if not isinstance(mapping, dict):
+        return "Mapping must be an object of field -> column name."
+    missing = [field for field in MAPPING_FIELDS if field not in mapping]
+    if missing:
+        return f"Mapping is missing fields: {', '.join(missing)}"
+    unknown = [mapping[field] for field in MAPPING_FIELDS if mapping[field] not in columns]
+    if unknown:
+        return f"Mapping refers to columns not in the header row: {', '.join(map(str, unknown))}"
+    return None
+
+
+def find_column_mapping(columns):
+    """Returns the saved column mapping for this header row, or None for a new layout.
+
+    A hit bumps the profile's usage counters through a separate connection so it
+    never touches the import's own transaction.
+    """
+    from app import db, ColumnMappingProfile
+
+    profile = ColumnMappingProfile.query.filter_by(fingerprint=header_fingerprint(columns)).first()
+    if not profile:
+        return None
+
+    mapping = json.loads(profile.mapping_json)
+    if validate_mapping(mapping, list(columns)):
+        return None
+
+    table = ColumnMappingProfile.__table__
+    with db.engine.begin() as conn:
+        conn.execute(
+            table.update()
+            .where(table.c.id == profile.id)
+            .values(hit_count=table.c.hit_count + 1, last_used_at=datetime.now())
+        )
+    return {field: mapping[field] for field in MAPPING_FIELDS}
+
+
+def save_column_mapping(columns, mapping):
+    """Stores the mapping detected for a new header row. Never overwrites a pinned profile."""
+    from app import app, db, ColumnMappingProfile
+
+    if validate_mapping(mapping, list(columns)):
+        return None
+
+    fingerprint = header_fingerprint(columns)
+    profile = ColumnMappingProfile.query.filter_by(fingerprint=fingerprint).first()
+    if profile and profile.pinned:
+        return profile
+
+    now = datetime.now()
+    if not profile:
+        profile = ColumnMappingProfile(fingerprint=fingerprint, columns_json=json.dumps([str(col) for col in columns]), created_at=now)
+        db.session.add(profile)
+    profile.mapping_json = json.dumps({field: mapping[field] for field in MAPPING_FIELDS})
+    profile.last_used_at = now
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another import saved the same layout first; its profile is just as good
+        db.session.rollback()
+        app.logger.info(f"Column mapping profile {fingerprint[:12]} was saved concurrently")
+        return None
+    return profile
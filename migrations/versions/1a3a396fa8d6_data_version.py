@@ -0,0 +1,33 @@
+"""data_version table: per-table change counters for caches
+
+Revision ID: 1a3a396fa8d6
+Revises: 2e8a92c789ed
+Create Date: 2026-10-18 13:00:00.000000
+
+Earlier versions of the app created this table on first use, so it is only
+created when it is still missing. Counters start at 0 and each commit bumps
+the counters of the tables it wrote to.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a3a396fa8d6'
+down_revision = '2e8a92c789ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'data_version' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('data_version',
+            sa.Column('table_name', sa.String(length=64), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('table_name')
+        )
+
+
+def downgrade():
+    op.drop_table('data_version')
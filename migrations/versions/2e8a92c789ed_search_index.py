@@ -0,0 +1,87 @@
+"""search index: FTS5 trigram tables on SQLite, pg_trgm indexes on PostgreSQL
+
+Revision ID: 2e8a92c789ed
+Revises: 36df9748ca4f
+Create Date: 2026-10-18 12:00:00.000000
+
+SQLite gets one external-content FTS5 table per searchable table
+(<table>_fts, trigram tokenizer) kept in sync by insert/update/delete
+triggers. PostgreSQL gets GIN gin_trgm_ops indexes, which serve the ILIKE
+substring filters directly. Other databases are left unchanged and search
+falls back to plain LIKE.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8a92c789ed'
+down_revision = '36df9748ca4f'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of search.SEARCH_FIELDS at this revision
+SEARCH_FIELDS = {
+    'employee': ('name', 'email', 'role'),
+    'project': ('name',),
+    'weekly_hours': ('function_name',),
+}
+
+
+def _sqlite_has_trigram(bind):
+    version = bind.exec_driver_sql('SELECT sqlite_version()').scalar()
+    return tuple(int(part) for part in version.split('.')[:2]) >= (3, 34)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        if not _sqlite_has_trigram(bind):
+            return
+        for table_name, columns in SEARCH_FIELDS.items():
+            fts = f'{table_name}_fts'
+            names = ', '.join(columns)
+            new_values = ', '.join(f'new.{name}' for name in columns)
+            old_values = ', '.join(f'old.{name}' for name in columns)
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{names}, content='{table_name}', content_rowid='id', tokenize='trigram')"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table_name, columns in SEARCH_FIELDS.items():
+            for name in columns:
+                op.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{name}_trgm "
+                    f"ON {table_name} USING gin ({name} gin_trgm_ops)"
+                )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for table_name in SEARCH_FIELDS:
+            fts = f'{table_name}_fts'
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif bind.dialect.name == 'postgresql':
+        for table_name, columns in SEARCH_FIELDS.items():
+            for name in columns:
+                op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_{name}_trgm")
@@ -0,0 +1,38 @@
+"""indexes for the hot weekly hours, assignment and employee lookups
+
+Revision ID: 36df9748ca4f
+Revises: f4c88555d1d1
+Create Date: 2026-10-18 11:00:00.000000
+
+- weekly_hours.week_start_date: date-range filters in /api/weekly_hours
+- assignment(employee_id, project_id): assignment lookup when recording hours
+  and importing
+- assignment.project_id: a project's assignments (/api/projects, deletes)
+- employee.name: employee lookup by name during imports
+
+Check the plans with `flask explain-report`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '36df9748ca4f'
+down_revision = 'f4c88555d1d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_weekly_hours_week_start_date', 'weekly_hours', ['week_start_date'], unique=False)
+    op.create_index('ix_assignment_employee_project', 'assignment', ['employee_id', 'project_id'], unique=False)
+    op.create_index('ix_assignment_project_id', 'assignment', ['project_id'], unique=False)
+    op.create_index('ix_employee_name', 'employee', ['name'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_employee_name', table_name='employee')
+    op.drop_index('ix_assignment_project_id', table_name='assignment')
+    op.drop_index('ix_assignment_employee_project', table_name='assignment')
+    op.drop_index('ix_weekly_hours_week_start_date', table_name='weekly_hours')
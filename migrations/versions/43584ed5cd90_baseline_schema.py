@@ -0,0 +1,77 @@
+"""baseline schema: employee, project, assignment, weekly_hours
+
+Revision ID: 43584ed5cd90
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+Databases created earlier with `flask init-db` already have these tables, so
+only missing ones are created and `flask db upgrade` works on them directly.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '43584ed5cd90'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'employee' not in existing:
+        op.create_table('employee',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('role', sa.String(length=80), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+    if 'project' not in existing:
+        op.create_table('project',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('duration_months', sa.Integer(), nullable=False),
+            sa.Column('start_month', sa.String(length=20), nullable=False),
+            sa.Column('start_year', sa.Integer(), nullable=False),
+            sa.Column('end_month', sa.String(length=20), nullable=False),
+            sa.Column('end_year', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+    if 'assignment' not in existing:
+        op.create_table('assignment',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('employee_id', sa.Integer(), nullable=False),
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('assigned_hours_per_week', sa.Integer(), nullable=False),
+            sa.Column('assigned_start_month', sa.String(length=20), nullable=False),
+            sa.Column('assigned_start_year', sa.Integer(), nullable=False),
+            sa.Column('assigned_end_month', sa.String(length=20), nullable=False),
+            sa.Column('assigned_end_year', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['employee_id'], ['employee.id']),
+            sa.ForeignKeyConstraint(['project_id'], ['project.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'weekly_hours' not in existing:
+        op.create_table('weekly_hours',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('assignment_id', sa.Integer(), nullable=False),
+            sa.Column('week_start_date', sa.Date(), nullable=False),
+            sa.Column('hours_worked', sa.Integer(), nullable=False),
+            sa.Column('function_name', sa.String(length=80), nullable=True),
+            sa.ForeignKeyConstraint(['assignment_id'], ['assignment.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('assignment_id', 'week_start_date', 'function_name', name='_assignment_week_function_uc')
+        )
+
+
+def downgrade():
+    op.drop_table('weekly_hours')
+    op.drop_table('assignment')
+    op.drop_table('project')
+    op.drop_table('employee')
@@ -0,0 +1,73 @@
+"""import_job, column_mapping_profile and monthly_load tables
+
+Revision ID: 6a2f1c11d4e6
+Revises: 43584ed5cd90
+Create Date: 2026-10-18 10:05:00.000000
+
+Earlier versions of the app created these tables on first use, so each one is
+only created when it is still missing. monthly_load rows are computed by the
+app: it fills an empty table on first use, or run `flask rebuild-monthly-load`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2f1c11d4e6'
+down_revision = '43584ed5cd90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'import_job' not in existing:
+        op.create_table('import_job',
+            sa.Column('id', sa.String(length=32), nullable=False),
+            sa.Column('data_type', sa.String(length=40), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('spool_path', sa.String(length=500), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('rows_total', sa.Integer(), nullable=False),
+            sa.Column('rows_parsed', sa.Integer(), nullable=False),
+            sa.Column('rows_written', sa.Integer(), nullable=False),
+            sa.Column('write_total', sa.Integer(), nullable=False),
+            sa.Column('result_json', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'column_mapping_profile' not in existing:
+        op.create_table('column_mapping_profile',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fingerprint', sa.String(length=64), nullable=False),
+            sa.Column('columns_json', sa.Text(), nullable=False),
+            sa.Column('mapping_json', sa.Text(), nullable=False),
+            sa.Column('pinned', sa.Boolean(), nullable=False),
+            sa.Column('hit_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('last_used_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('fingerprint')
+        )
+    if 'monthly_load' not in existing:
+        op.create_table('monthly_load',
+            sa.Column('employee_id', sa.Integer(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('assigned_hours', sa.Integer(), nullable=False),
+            sa.Column('actual_hours', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['employee_id'], ['employee.id']),
+            sa.PrimaryKeyConstraint('employee_id', 'year', 'month')
+        )
+        op.create_index('ix_monthly_load_year_month', 'monthly_load', ['year', 'month'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_monthly_load_year_month', table_name='monthly_load')
+    op.drop_table('monthly_load')
+    op.drop_table('column_mapping_profile')
+    op.drop_table('import_job')
@@ -0,0 +1,28 @@
+"""import_job.heartbeat_at: liveness of the process running a job
+
+Revision ID: 7c1e5b2d9a40
+Revises: 1a3a396fa8d6
+Create Date: 2026-10-19 09:00:00.000000
+
+Queued or running jobs whose heartbeat stops are marked failed.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5b2d9a40'
+down_revision = '1a3a396fa8d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
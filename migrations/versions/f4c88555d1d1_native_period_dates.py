@@ -0,0 +1,98 @@
+"""native start/end dates for project and assignment periods
+
+Revision ID: f4c88555d1d1
+Revises: 6a2f1c11d4e6
+Create Date: 2026-10-18 10:10:00.000000
+
+Adds project.start_date/end_date and assignment.assigned_start_date/
+assigned_end_date next to the existing month-name and year columns (which are
+kept), backfills them from those columns and indexes them for overlap filters.
+Rows whose month name is not a full English month name are left NULL.
+
+"""
+import calendar
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c88555d1d1'
+down_revision = '6a2f1c11d4e6'
+branch_labels = None
+depends_on = None
+
+MONTH_NUMBERS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _period(month_name, year, end):
+    month = MONTH_NUMBERS.get(month_name)
+    if not month or year is None:
+        return None
+    day = calendar.monthrange(int(year), month)[1] if end else 1
+    return date(int(year), month, day)
+
+
+def _backfill(table_name, start_month, start_year, end_month, end_year, start_date, end_date):
+    conn = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer), sa.column(start_month, sa.String), sa.column(start_year, sa.Integer),
+        sa.column(end_month, sa.String), sa.column(end_year, sa.Integer),
+        sa.column(start_date, sa.Date), sa.column(end_date, sa.Date)
+    )
+    rows = conn.execute(sa.select(
+        table.c.id, table.c[start_month], table.c[start_year], table.c[end_month], table.c[end_year]
+    )).all()
+
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values({start_date: sa.bindparam('start'), end_date: sa.bindparam('end')})
+    )
+    params = [
+        {
+            'row_id': row_id,
+            'start': _period(s_month, s_year, end=False),
+            'end': _period(e_month, e_year, end=True)
+        }
+        for row_id, s_month, s_year, e_month, e_year in rows
+    ]
+    for offset in range(0, len(params), BACKFILL_BATCH_SIZE):
+        conn.execute(update, params[offset:offset + BACKFILL_BATCH_SIZE])
+
+
+def upgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('start_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('end_date', sa.Date(), nullable=True))
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('assigned_start_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('assigned_end_date', sa.Date(), nullable=True))
+
+    _backfill('project', 'start_month', 'start_year', 'end_month', 'end_year', 'start_date', 'end_date')
+    _backfill('assignment', 'assigned_start_month', 'assigned_start_year', 'assigned_end_month', 'assigned_end_year',
+              'assigned_start_date', 'assigned_end_date')
+
+    op.create_index('ix_project_period', 'project', ['start_date', 'end_date'], unique=False)
+    op.create_index('ix_assignment_period', 'assignment', ['assigned_start_date', 'assigned_end_date'], unique=False)
+    op.create_index('ix_assignment_employee_period', 'assignment',
+                    ['employee_id', 'assigned_start_date', 'assigned_end_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_assignment_employee_period', table_name='assignment')
+    op.drop_index('ix_assignment_period', table_name='assignment')
+    op.drop_index('ix_project_period', table_name='project')
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.drop_column('assigned_end_date')
+        batch_op.drop_column('assigned_start_date')
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_column('end_date')
+        batch_op.drop_column('start_date')
@@ -0,0 +1,72 @@
+import threading
+from workload_engine import load_assignments, load_weekly_hours, monthly_hours
+
+
+# Employee ids per refresh batch (keeps IN lists well below bind-parameter limits).
+REFRESH_CHUNK_SIZE = 500
+
+_fill_checked = False
+_fill_lock = threading.Lock()
+
+
+def _chunked(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def needs_full_refresh():
+    """True once per process when monthly_load is empty while assignments exist,
+    e.g. right after `flask db upgrade` created it; the caller then fills it
+    with a full refresh. The lock keeps concurrent requests from both doing so.
+    """
+    global _fill_checked
+    from app import db, Assignment, MonthlyLoad
+
+    with _fill_lock:
+        if _fill_checked:
+            return False
+        needs_refresh = (
+            db.session.query(MonthlyLoad.employee_id).first() is None and
+            db.session.query(Assignment.id).first() is not None
+        )
+        _fill_checked = True
+    return needs_refresh
+
+
+def refresh_monthly_load(employee_ids=None):
+    """Recomputes the monthly_load rows of the given employees (all when None)
+    with the workload engine.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    from app import db, MonthlyLoad
+
+    if needs_full_refresh():
+        employee_ids = None
+
+    table = MonthlyLoad.__table__
+    if employee_ids is None:
+        batches = [None]
+        db.session.execute(table.delete())
+    else:
+        batches = list(_chunked(sorted({int(employee_id) for employee_id in employee_ids}), REFRESH_CHUNK_SIZE))
+
+    for batch in batches:
+        if batch is not None:
+            db.session.execute(table.delete().where(table.c.employee_id.in_(batch)))
+        hours = monthly_hours(load_assignments(batch), load_weekly_hours(batch))
+        rows = [
+            {
+                'employee_id': employee_id,
+                'year': month // 12,
+                'month': month % 12 + 1,
+                'assigned_hours': assigned,
+                'actual_hours': actual
+            }
+            for (employee_id, month), assigned, actual in zip(
+                hours.index.tolist(), hours['assigned_hours'].tolist(), hours['actual_hours'].tolist()
+            )
+        ]
+        for chunk in _chunked(rows, 1000):
+            db.session.execute(table.insert(), chunk)
@@ -0,0 +1,101 @@
+import threading
+import time
+from flask import jsonify
+
+
+# Page size used when a list endpoint is called without `limit`.
+DEFAULT_PAGE_SIZE = 500
+# Largest `limit` a client may ask for.
+MAX_PAGE_SIZE = 2000
+# Seconds a total row count is reused before it is counted again.
+COUNT_CACHE_SECONDS = 30
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+class PageRequest:
+    """Parsed `limit`, `after` and `fields` query parameters of a list endpoint.
+
+    Pages are keyset-paginated on an integer id: `after` is the id of the last
+    item on the previous page (the X-Next-Cursor header), so fetching page N
+    never scans the N-1 pages before it.
+    """
+
+    def __init__(self, args, allowed_fields):
+        try:
+            self.limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+            self.after = int(args['after']) if args.get('after') else None
+        except ValueError:
+            raise ValueError("'limit' and 'after' must be integers.")
+        if self.limit < 1:
+            raise ValueError("'limit' must be at least 1.")
+        self.limit = min(self.limit, MAX_PAGE_SIZE)
+
+        self.fields = None
+        if args.get('fields'):
+            self.fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+            unknown = [field for field in self.fields if field not in allowed_fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed_fields)}")
+
+    def wants(self, field):
+        return self.fields is None or field in self.fields
+
+    def field_names(self, all_fields):
+        """The requested fields in `all_fields` order (all of them without `fields`)."""
+        return [field for field in all_fields if self.wants(field)]
+
+    def select(self, record):
+        """Trims a serialized record down to the requested fields; json_provider
+        records are built with only those fields and pass through as they are."""
+        if self.fields is None or not isinstance(record, dict):
+            return record
+        return {field: record[field] for field in self.fields if field in record}
+
+    def apply(self, query, id_column):
+        """Orders `query` by `id_column` and restricts it to this page (plus one row
+        to tell whether another page follows)."""
+        query = query.order_by(id_column)
+        if self.after is not None:
+            query = query.filter(id_column > self.after)
+        return query.limit(self.limit + 1)
+
+    def split(self, rows, key=lambda row: row.id):
+        """Returns (rows on this page, cursor for the next page or None)."""
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            return rows, key(rows[-1])
+        return rows, None
+
+
+def cached_count(cache_key, query, tables):
+    """Total rows matched by `query`, reused for COUNT_CACHE_SECONDS per cache_key.
+
+    Every page of a listing asks for the same total, so only the first request in
+    a window pays for the COUNT. The data_version counters of `tables` (the ones
+    the query reads) are part of the entry, so a committed create, import or
+    delete recounts right away instead of serving a stale total.
+    """
+    from data_versions import data_versions
+
+    versions = data_versions(tables)
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(cache_key)
+        if cached and cached[2] == versions and now - cached[1] < COUNT_CACHE_SECONDS:
+            return cached[0]
+
+    total = query.order_by(None).count()
+    with _count_cache_lock:
+        _count_cache[cache_key] = (total, now, versions)
+    return total
+
+
+def paged_response(page, items, next_cursor, total):
+    """JSON array of the page's items with X-Total-Count / X-Next-Cursor headers."""
+    response = jsonify([page.select(item) for item in items])
+    response.headers['X-Total-Count'] = str(total)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response
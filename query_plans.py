@@ -0,0 +1,140 @@
+import re
+from sqlalchemy import exists, literal_column, select, tuple_
+
+
+# Index seeks as they appear in SQLite ("SEARCH t USING [COVERING] INDEX x") and
+# PostgreSQL ("Index [Only] Scan using x", "Bitmap Index Scan on x") plans. A SQLite
+# "SCAN t USING COVERING INDEX x" reads the whole index, so it does not count.
+_INDEX_PATTERNS = (
+    re.compile(r'^SEARCH \S+ USING (?:COVERING )?INDEX (\w+)'),
+    re.compile(r'Index (?:Only )?Scan (?:Backward )?using (\w+)'),
+    re.compile(r'Bitmap Index Scan on (\w+)'),
+)
+_PRIMARY_KEY_PATTERNS = (
+    re.compile(r'^SEARCH \S+ USING (?:INTEGER )?PRIMARY KEY'),
+    re.compile(r'Scan (?:Backward )?using (\w+_pkey)'),
+)
+# Full reads of a table: SQLite "SCAN t [USING ...]", PostgreSQL "Seq Scan on t"
+_SCAN_PATTERNS = (
+    re.compile(r'^SCAN (\w+)'),
+    re.compile(r'Seq Scan on (\w+)'),
+)
+
+# Marker for "the table's primary key", whatever the database calls it
+PRIMARY_KEY = 'PRIMARY KEY'
+
+
+def _hot_queries():
+    """(name, statement, table, acceptable indexes) for each endpoint's main query."""
+    from app import Assignment, Employee, MonthlyLoad, Project, WeeklyHours
+
+    week_from = literal_column("'2025-01-06'")
+    week_to = literal_column("'2025-03-31'")
+
+    return [
+        ("GET /api/employees page",
+         select(Employee).where(Employee.id > 500).order_by(Employee.id).limit(501),
+         'employee', {PRIMARY_KEY}),
+        ("GET /api/projects page",
+         select(Project).where(Project.id > 500).order_by(Project.id).limit(501),
+         'project', {PRIMARY_KEY}),
+        ("GET /api/projects assignments of a page",
+         select(Assignment).where(Assignment.project_id.in_([1, 2, 3])),
+         'assignment', {'ix_assignment_project_id'}),
+        ("GET /api/weekly_hours week range",
+         select(WeeklyHours).join(Assignment).join(Employee).join(Project)
+         .where(WeeklyHours.week_start_date >= week_from, WeeklyHours.week_start_date <= week_to),
+         'weekly_hours', {'ix_weekly_hours_week_start_date'}),
+        ("GET /api/employee_project_assignments employees with assignments",
+         select(Employee).where(Employee.id > 500, exists().where(Assignment.employee_id == Employee.id))
+         .order_by(Employee.id).limit(501),
+         'assignment', {'ix_assignment_employee_project', 'ix_assignment_employee_period'}),
+        ("POST /api/record_actual_hours assignment lookup",
+         select(Assignment).where(Assignment.employee_id == 1, Assignment.project_id == 2),
+         'assignment', {'ix_assignment_employee_project'}),
+        ("POST /api/record_actual_hours existing week",
+         select(WeeklyHours).where(
+             WeeklyHours.assignment_id == 1, WeeklyHours.week_start_date == week_from,
+             WeeklyHours.function_name == 'Design'),
+         'weekly_hours', {'_assignment_week_function_uc', 'sqlite_autoindex_weekly_hours_1'}),
+        ("import: employees by name",
+         select(Employee.id, Employee.name).where(Employee.name.in_(['Asha Rao', 'Vikram Das'])),
+         'employee', {'ix_employee_name'}),
+        ("import: assignments by (employee, project)",
+         select(Assignment.id).where(Assignment.employee_id.in_([1, 3]), Assignment.project_id.in_([2, 4])),
+         'assignment', {'ix_assignment_employee_project'}),
+        ("batch hours: existing weeks of assignments",
+         select(WeeklyHours.id).where(
+             WeeklyHours.assignment_id.in_([1, 2]), WeeklyHours.week_start_date.in_([week_from, week_to])),
+         'weekly_hours', {'_assignment_week_function_uc', 'sqlite_autoindex_weekly_hours_1'}),
+        ("GET /api/monthly_workload month range",
+         select(MonthlyLoad).where(
+             tuple_(MonthlyLoad.year, MonthlyLoad.month) >= tuple_(2025, 1),
+             tuple_(MonthlyLoad.year, MonthlyLoad.month) <= tuple_(2025, 12)),
+         'monthly_load', {'ix_monthly_load_year_month', PRIMARY_KEY}),
+        ("workload engine: assignments overlapping a window",
+         select(Assignment.id).where(
+             Assignment.assigned_start_date <= literal_column("'2025-12-31'"),
+             Assignment.assigned_end_date >= literal_column("'2025-01-01'")),
+         'assignment', {'ix_assignment_period'}),
+    ]
+
+
+def _indexes_used(plan_lines):
+    used = set()
+    for line in plan_lines:
+        line = line.strip()
+        for pattern in _INDEX_PATTERNS:
+            used.update(pattern.findall(line))
+        for pattern in _PRIMARY_KEY_PATTERNS:
+            if pattern.search(line):
+                used.add(PRIMARY_KEY)
+    return used
+
+
+def _tables_scanned(plan_lines, table_names):
+    """Tables of `table_names` the plan reads in full (VALUES lists and the like are ignored)."""
+    scanned = set()
+    for line in plan_lines:
+        line = line.strip().lstrip('-> ')
+        for pattern in _SCAN_PATTERNS:
+            scanned.update(name for name in pattern.findall(line) if name in table_names)
+    return scanned
+
+
+def explain_report():
+    """Runs EXPLAIN for each hot query on the configured database.
+
+    Returns a list of {name, table, expected, used, scanned, ok, plan} dicts. A
+    query is ok when it seeks on one of the expected indexes and reads no table in
+    full. On PostgreSQL sequential scans are disabled for the EXPLAIN so small
+    development tables still show whether a usable index exists.
+    """
+    from app import db
+
+    table_names = set(db.metadata.tables)
+    results = []
+    with db.engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == 'postgresql':
+            conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        for name, statement, table, expected in _hot_queries():
+            sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+            if dialect == 'sqlite':
+                plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+            else:
+                plan = [row[0] for row in conn.exec_driver_sql(f'EXPLAIN {sql}')]
+            used = _indexes_used(plan)
+            scanned = _tables_scanned(plan, table_names)
+            results.append({
+                'name': name,
+                'table': table,
+                'expected': sorted(expected),
+                'used': sorted(used),
+                'scanned': sorted(scanned),
+                'ok': bool(used & expected) and not scanned,
+                'plan': plan
+            })
+        # Nothing here writes; rolling back also ends the SET LOCAL
+        conn.rollback()
+    return results
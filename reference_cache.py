@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import select
+from data_versions import data_versions, on_tables_changed
+
+
+# Tables held in the reference cache
+REFERENCE_TABLES = ('employee', 'project', 'assignment')
+
+EmployeeRef = namedtuple('EmployeeRef', 'id name email role')
+ProjectRef = namedtuple('ProjectRef', 'id name')
+AssignmentRef = namedtuple('AssignmentRef', 'id employee_id project_id assigned_start_date assigned_end_date')
+
+_reference_data = None
+_local_version = 0
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class ReferenceData:
+    """Read-only snapshot of employees, projects and assignments with the lookups
+    the request handlers and the import need. Rows are plain namedtuples, so a
+    snapshot can be shared by every thread of the process."""
+
+    def __init__(self, employees, projects, assignments, versions, local_version):
+        self.versions = versions
+        self.local_version = local_version
+
+        self.employees = {row.id: row for row in employees}
+        self.projects = {row.id: row for row in projects}
+        self.employee_ids_by_name = {}
+        for row in employees:
+            self.employee_ids_by_name.setdefault(row.name, row.id)
+        self.project_ids_by_name = {}
+        for row in projects:
+            self.project_ids_by_name.setdefault(row.name, row.id)
+        self.assignments_by_pair = {}
+        for row in assignments:
+            self.assignments_by_pair.setdefault((row.employee_id, row.project_id), []).append(row)
+
+    def employee(self, employee_id):
+        return self.employees.get(employee_id)
+
+    def project(self, project_id):
+        return self.projects.get(project_id)
+
+    def assignment(self, employee_id, project_id, week_start_date=None):
+        """The employee's assignment on the project (see pick_assignment); None when there is none."""
+        return pick_assignment(self.assignments_by_pair.get((employee_id, project_id)), week_start_date)
+
+
+def pick_assignment(candidates, week_start_date=None):
+    """Of one employee's assignments on one project (AssignmentRefs in id order), the
+    lowest id whose period covers `week_start_date` when one does, else the lowest
+    id; None when there are none."""
+    if not candidates:
+        return None
+    if week_start_date is not None:
+        for row in candidates:
+            if row.assigned_start_date and row.assigned_end_date and \
+               row.assigned_start_date <= week_start_date <= row.assigned_end_date:
+                return row
+    return candidates[0]
+
+
+def _load(local_version):
+    from app import db, Assignment, Employee, Project
+
+    # Versions first: a write landing during the load makes the next check reload
+    versions = data_versions(REFERENCE_TABLES)
+    employees = [EmployeeRef(*row) for row in db.session.execute(
+        select(Employee.id, Employee.name, Employee.email, Employee.role).order_by(Employee.id))]
+    projects = [ProjectRef(*row) for row in db.session.execute(
+        select(Project.id, Project.name).order_by(Project.id))]
+    assignments = [AssignmentRef(*row) for row in db.session.execute(
+        select(Assignment.id, Assignment.employee_id, Assignment.project_id,
+               Assignment.assigned_start_date, Assignment.assigned_end_date).order_by(Assignment.id))]
+    return ReferenceData(employees, projects, assignments, versions, local_version)
+
+
+def get_reference_data():
+    """The process-wide reference snapshot, reloaded after it was invalidated.
+
+    Commits in this process that touch employee, project or assignment invalidate
+    it immediately. Writes from other workers are noticed by comparing the
+    data_version rows at most every REFERENCE_CACHE_CHECK_SECONDS (set it to 0 to
+    skip that check, e.g. with a single worker); between checks lookups never
+    touch the database.
+    """
+    global _reference_data, _checked_at
+    from app import app
+
+    check_seconds = app.config.get('REFERENCE_CACHE_CHECK_SECONDS', 5)
+    with _lock:
+        cached = _reference_data
+        local_version = _local_version
+    now = time.monotonic()
+
+    if cached is not None and cached.local_version == local_version:
+        if not check_seconds or now - _checked_at < check_seconds:
+            return cached
+        _checked_at = now
+        if data_versions(REFERENCE_TABLES) == cached.versions:
+            return cached
+
+    reference_data = _load(local_version)
+    with _lock:
+        if _local_version == local_version:
+            _reference_data = reference_data
+            _checked_at = now
+    return reference_data
+
+
+def invalidate_reference_data():
+    """Drops the snapshot; the next get_reference_data() reloads it."""
+    global _local_version
+    with _lock:
+        _local_version += 1
+
+
+@on_tables_changed
+def _invalidate_on_write(table_names):
+    if not table_names.isdisjoint(REFERENCE_TABLES):
+        invalidate_reference_data()
@@ -0,0 +1,135 @@
+import threading
+from sqlalchemy import column, inspect, literal, literal_column, or_, select, table
+
+
+# Searchable columns per table; every `q=` parameter matches substrings of these.
+SEARCH_FIELDS = {
+    'employee': ('name', 'email', 'role'),
+    'project': ('name',),
+    'weekly_hours': ('function_name',),
+}
+
+# The trigram tokenizer can only use its index for terms of at least 3 characters.
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _search_table(table_name, columns):
+    return table(table_name, column('id'), *[column(name) for name in columns])
+
+
+class LikeSearchBackend:
+    """Case-insensitive substring search with ILIKE. Works everywhere; on PostgreSQL
+    the pg_trgm GIN indexes created by install_search_index() serve these queries."""
+
+    name = 'like'
+
+    def matching_ids(self, table_name, term, columns=None):
+        """SELECT of the ids in `table_name` whose `columns` contain `term`."""
+        columns = columns or SEARCH_FIELDS[table_name]
+        source = _search_table(table_name, columns)
+        pattern = f'%{term}%'
+        return select(source.c.id).where(or_(*[source.c[name].ilike(pattern) for name in columns]))
+
+
+class PostgresTrigramSearchBackend(LikeSearchBackend):
+    name = 'pg_trgm'
+
+
+class SqliteFtsSearchBackend(LikeSearchBackend):
+    """Substring search through FTS5 trigram tables (<table>_fts) that triggers keep
+    in sync with their source tables."""
+
+    name = 'sqlite_fts5'
+
+    def matching_ids(self, table_name, term, columns=None):
+        if len(term) < MIN_TRIGRAM_TERM_LENGTH:
+            return super().matching_ids(table_name, term, columns)
+
+        columns = columns or SEARCH_FIELDS[table_name]
+        fts_name = f'{table_name}_fts'
+        phrase = '"' + term.replace('"', '""') + '"'
+        query = '{' + ' '.join(columns) + '} : ' + phrase
+        fts = table(fts_name, column('rowid'))
+        return select(fts.c.rowid).where(literal_column(fts_name).op('MATCH')(literal(query)))
+
+
+def _sqlite_has_trigram(connection):
+    version = connection.exec_driver_sql('SELECT sqlite_version()').scalar()
+    return tuple(int(part) for part in version.split('.')[:2]) >= (3, 34)
+
+
+def get_search_backend():
+    """Picks the search backend for the configured database once per process."""
+    global _backend
+    from app import app, db
+
+    with _backend_lock:
+        if _backend is None:
+            dialect = db.engine.dialect.name
+            if dialect == 'sqlite' and inspect(db.engine).has_table('employee_fts'):
+                _backend = SqliteFtsSearchBackend()
+            elif dialect == 'postgresql':
+                _backend = PostgresTrigramSearchBackend()
+            else:
+                if dialect == 'sqlite':
+                    app.logger.warning("Search index tables are missing; run 'flask db upgrade'. Falling back to LIKE search.")
+                _backend = LikeSearchBackend()
+    return _backend
+
+
+def search_index_statements(dialect_name):
+    """DDL that (re)creates the search index for `dialect_name`; empty when unsupported."""
+    statements = []
+    if dialect_name == 'sqlite':
+        for table_name, columns in SEARCH_FIELDS.items():
+            fts = f'{table_name}_fts'
+            names = ', '.join(columns)
+            new_values = ', '.join(f'new.{name}' for name in columns)
+            old_values = ', '.join(f'old.{name}' for name in columns)
+            statements += [
+                f"DROP TRIGGER IF EXISTS {fts}_ai",
+                f"DROP TRIGGER IF EXISTS {fts}_ad",
+                f"DROP TRIGGER IF EXISTS {fts}_au",
+                f"DROP TABLE IF EXISTS {fts}",
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table_name}', content_rowid='id', tokenize='trigram')",
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+    elif dialect_name == 'postgresql':
+        statements.append("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table_name, columns in SEARCH_FIELDS.items():
+            for name in columns:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{name}_trgm ON {table_name} USING gin ({name} gin_trgm_ops)"
+                )
+    return statements
+
+
+def install_search_index(connection):
+    """Creates (or rebuilds) the search index on an existing schema, e.g. after init-db."""
+    global _backend
+
+    if connection.dialect.name == 'sqlite' and not _sqlite_has_trigram(connection):
+        return
+    for statement in search_index_statements(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+    _backend = None
+
+
+def include_in_migrations(name, type_, parent_names):
+    """Keeps autogenerate from treating the search index (FTS5 tables and their shadow
+    tables, pg_trgm indexes) as schema drift."""
+    if type_ == 'table':
+        return not any(name == f'{t}_fts' or name.startswith(f'{t}_fts_') for t in SEARCH_FIELDS)
+    if type_ == 'index':
+        return not (name or '').endswith('_trgm')
+    return True
@@ -165,6 +165,45 @@ function deleteWeeklyHours(weeklyHoursId, employeeName, projectName, weekDate) {
     });
 }
 
+// Polls a background import job until it completes or fails, showing progress as it goes.
+// Gives up when the job no longer exists or shows no progress for `maxIdleMs`
+// (the server marks jobs of a restarted process as failed, so this is a last resort).
+async function pollImportJob(statusUrl, messageContainer, intervalMs = 1000, maxIdleMs = 10 * 60 * 1000) {
+    let lastProgress = null;
+    let lastProgressAt = Date.now();
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        const response = await fetch(statusUrl);
+        const job = await response.json().catch(() => ({}));
+        if (response.status === 404) {
+            throw new Error('The import job no longer exists. Please upload the file again.');
+        }
+        if (!response.ok) {
+            throw new Error(job.message || 'Could not read import job status');
+        }
+        if (job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+
+        const progress = `${job.status}:${job.rows_parsed}:${job.rows_written}`;
+        if (progress !== lastProgress) {
+            lastProgress = progress;
+            lastProgressAt = Date.now();
+        } else if (Date.now() - lastProgressAt > maxIdleMs) {
+            throw new Error('The import stopped making progress. Check the imported data and upload the file again if needed.');
+        }
+
+        let progressText = job.status === 'queued' ? 'Import queued...' : `Importing: ${job.rows_parsed} of ${job.rows_total} rows parsed`;
+        if (job.write_total) {
+            progressText += `, ${job.rows_written} of ${job.write_total} entries written`;
+        }
+        if (job.eta_seconds !== null && job.eta_seconds !== undefined) {
+            progressText += ` (about ${Math.ceil(job.eta_seconds)}s left)`;
+        }
+        showMessage(progressText, 'info', messageContainer);
+    }
+}
+
 // This function handles the download logic for various report types
 function downloadExcel(reportType) {
     let url = '';
@@ -264,18 +303,36 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // --- General Data Fetching Helper (Includes search term parameter) ---
-    async function fetchData(baseUrl, errorMsg, searchTerm = '') {
-        let url = baseUrl;
+    // List endpoints are keyset-paginated: each page carries an X-Next-Cursor header
+    // until the last one, so follow it and return the concatenated items.
+    // `fields` (e.g. ['id', 'name']) asks the server for just the columns a screen renders.
+    async function fetchData(baseUrl, errorMsg, searchTerm = '', fields = null) {
+        const url = new URL(baseUrl, window.location.origin);
         if (searchTerm) {
-            url += `?q=${encodeURIComponent(searchTerm)}`;
+            url.searchParams.set('q', searchTerm);
+        }
+        if (fields) {
+            url.searchParams.set('fields', fields.join(','));
         }
         try {
-            const response = await fetch(url);
-            if (!response.ok) {
-                const errorDetail = await response.json().catch(() => ({ message: response.statusText }));
-                throw new Error(`${errorMsg}: ${errorDetail.message || 'Unknown error'}`);
+            let items = null;
+            while (true) {
+                const response = await fetch(url);
+                if (!response.ok) {
+                    const errorDetail = await response.json().catch(() => ({ message: response.statusText }));
+                    throw new Error(`${errorMsg}: ${errorDetail.message || 'Unknown error'}`);
+                }
+                const page = await response.json();
+                const nextCursor = response.headers.get('X-Next-Cursor');
+                if (!Array.isArray(page)) {
+                    return page;
+                }
+                items = items ? items.concat(page) : page;
+                if (!nextCursor) {
+                    return items;
+                }
+                url.searchParams.set('after', nextCursor);
             }
-            return await response.json();
         } catch (error) {
             console.error(errorMsg, error);
             showMessage(`Failed to load data: ${error.message || errorMsg}`, 'error');
@@ -285,7 +342,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- Employee Section Logic (Includes search term parameter) ---
     window.loadEmployees = async function(searchTerm = '') { // Added searchTerm parameter
-        const employees = await fetchData('/api/employees', 'Error loading employees', searchTerm); // Pass searchTerm
+        const employees = await fetchData('/api/employees', 'Error loading employees', searchTerm, ['id', 'name', 'role', 'email']); // Pass searchTerm
         const employeesTableBody = document.getElementById('employees-table')?.querySelector('tbody');
 
         if (employees && employeesTableBody) {
@@ -325,7 +382,7 @@ document.addEventListener('DOMContentLoaded', function() {
     };
 
     window.loadProjects = async function(searchTerm = '') { // Added searchTerm parameter
-        const projects = await fetchData('/api/projects', 'Error loading projects', searchTerm); // Pass searchTerm
+        const projects = await fetchData('/api/projects', 'Error loading projects', searchTerm, ['id', 'name', 'duration_months', 'start_month', 'start_year', 'end_month', 'end_year']); // Pass searchTerm
         const projectsTableBody = document.getElementById('projects-table')?.querySelector('tbody');
 
         if (projects && projectsTableBody) {
@@ -373,7 +430,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- Functions to populate dropdowns ---
     window.populateEmployeeDropdowns = async function() {
-        const employees = await fetchData('/api/employees', 'Error loading employees for dropdowns');
+        const employees = await fetchData('/api/employees', 'Error loading employees for dropdowns', '', ['id', 'name']);
         if (employees) {
             const employeeSelects = [
                 document.getElementById('assign-employee-id'),
@@ -390,7 +447,7 @@ document.addEventListener('DOMContentLoaded', function() {
     };
 
     window.populateProjectDropdownsForActualHours = async function() {
-        const projects = await fetchData('/api/projects', 'Error loading projects for actual hours dropdown');
+        const projects = await fetchData('/api/projects', 'Error loading projects for actual hours dropdown', '', ['id', 'name']);
         const actualHoursProjectSelect = document.getElementById('actual-hours-project-id');
 
         if (projects && actualHoursProjectSelect) {
@@ -406,7 +463,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const projectIdInput = document.getElementById('assign-project-id');
         if (!projectInput || !projectIdInput) return;
 
-        const projects = await fetchData('/api/projects', 'Error loading projects for assignment dropdown');
+        const projects = await fetchData('/api/projects', 'Error loading projects for assignment dropdown', '', ['id', 'name']);
         if (projects) {
             projectInput.addEventListener('input', () => {
                 const inputVal = projectInput.value.trim();
@@ -598,7 +655,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 const projectName = assignProjectNameInput.value.trim();
 
                 if (!assignmentData.project_id) {
-                    const existingProjects = await fetchData('/api/projects', 'Error loading projects for new project check');
+                    const existingProjects = await fetchData('/api/projects', 'Error loading projects for new project check', '', ['id', 'name']);
                     let matchedProject = null;
 
                     if (existingProjects) {
@@ -738,54 +795,49 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- Workload, Assignments, Actual Hours Loading (Includes search term parameter) ---
 
-    // Function to load and display current workload (no change to loadWorkload itself yet, depends on backend)
+    // Function to load and display the workload of one ISO week (current week by default)
     window.loadWorkload = async function() {
         const workloadContainer = document.getElementById('workload-container');
         if (!workloadContainer) return;
 
-        const employees = await fetchData('/api/employees', 'Error loading workload data (expected structured workload)');
-
-        if (employees) {
-            workloadContainer.innerHTML = '';
-            if (employees.length > 0) {
-                const normalHours = 40;
-                let tableHtml = `
-                    <h3>Current Workload Overview (Employee List Only)</h3>
-                    <p><i>Note: Full workload calculations require the /api/employee_workload endpoint in app.py.</i></p>
-                    <div class="workload-summary">
-                        <div class="summary-box">Standard Weekly Hours: ${normalHours}</div>
-                    </div>
-                    <table id="employee-workload-table">
-                        <thead>
-                            <tr>
-                                <th>Employee Name</th>
-                                <th>Position</th>
-                                <th>Email</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                `;
+        const weekInput = document.getElementById('workload-week');
+        const url = new URL('/api/employee_workload', window.location.origin);
+        if (weekInput && weekInput.value) {
+            url.searchParams.set('week', weekInput.value);
+        }
+        const workload = await fetchData(url.toString(), 'Error loading workload data');
+        const tableBody = workloadContainer.querySelector('tbody');
+        if (!workload || !tableBody) return;
 
-                employees.forEach(employee => {
-                    const row = document.createElement('tr');
-                    row.insertCell().textContent = employee.name;
-                    row.insertCell().textContent = employee.role || 'N/A';
-                    row.insertCell().textContent = employee.email || 'N/A';
-                    // Append row to a temporary tbody to avoid reflows
-                    const tempTbody = document.createElement('tbody');
-                    tempTbody.appendChild(row);
-                    tableHtml += tempTbody.innerHTML;
-                });
+        if (weekInput && !weekInput.value) {
+            weekInput.value = workload.week;
+        }
+        const normalHoursDisplay = document.getElementById('workload-normal-hours');
+        if (normalHoursDisplay) normalHoursDisplay.textContent = workload.normal_weekly_hours;
+        const weekRange = document.getElementById('workload-week-range');
+        if (weekRange) weekRange.textContent = `${workload.week_start_date} to ${workload.week_end_date}`;
 
-                tableHtml += `
-                        </tbody>
-                    </table>
-                `;
-                workloadContainer.innerHTML = tableHtml;
-            } else {
-                workloadContainer.innerHTML = '<p>No employees found to display workload overview.</p>';
-            }
+        tableBody.innerHTML = '';
+        if (workload.employees.length === 0) {
+            tableBody.innerHTML = '<tr><td colspan="5">No employees found to display workload overview.</td></tr>';
+            return;
         }
+
+        const statusClasses = { 'Overloaded': 'cell-overloaded', 'Normal': 'cell-normal', 'Free': 'cell-free' };
+        workload.employees.forEach(employee => {
+            const row = tableBody.insertRow();
+            row.insertCell().textContent = employee.employee_name;
+            row.insertCell().textContent = employee.role || 'N/A';
+            const projectsCell = row.insertCell();
+            projectsCell.textContent = employee.projects.map(project => {
+                const functions = project.functions.map(f => `${f.function_name}: ${f.hours}`).join(', ');
+                return `${project.project_name || 'Unknown project'} (${project.hours}h; ${functions})`;
+            }).join('; ') || '-';
+            row.insertCell().textContent = employee.total_hours;
+            const statusCell = row.insertCell();
+            statusCell.textContent = employee.status;
+            statusCell.className = statusClasses[employee.status] || '';
+        });
     };
 
     // Function to load and display monthly workload (no change here)
@@ -927,7 +979,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const tableBody = actualHoursReportTable.querySelector('tbody');
         tableBody.innerHTML = '<tr><td colspan="4" style="text-align: center;">Loading report data...</td></tr>'; // Reset loading message
 
-        const allWeeklyHours = await fetchData('/api/weekly_hours', 'Error loading actual hours report', searchTerm);
+        const allWeeklyHours = await fetchData('/api/weekly_hours', 'Error loading actual hours report', searchTerm, ['employee_id', 'employee_name', 'project_name', 'function_name', 'week_start_date', 'hours_worked']);
 
         if (!allWeeklyHours || allWeeklyHours.length === 0) {
             tableBody.innerHTML = '<tr><td colspan="4" style="text-align: center;">No actual hours recorded for the report.</td></tr>';
@@ -1227,7 +1279,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 const formData = new FormData(importForm); // Get form data, including the file
 
-                showMessage('Uploading and importing data...', 'info', importMessageContainer);
+                showMessage('Uploading file...', 'info', importMessageContainer);
 
                 try {
                     const response = await fetch('/api/import_data', {
@@ -1235,9 +1287,18 @@ document.addEventListener('DOMContentLoaded', function() {
                         body: formData // Send FormData directly for file uploads
                     });
 
-                    const result = await response.json();
+                    const queued = await response.json();
+                    if (!response.ok || !queued.status_url) {
+                        showMessage(queued.message || 'An error occurred during import.', 'error', importMessageContainer);
+                        return;
+                    }
 
-                    if (response.ok) {
+                    // The server imports in the background; poll the job until it finishes
+                    showMessage(queued.message, 'info', importMessageContainer);
+                    const job = await pollImportJob(queued.status_url, importMessageContainer);
+                    const result = job.result || {};
+
+                    if (job.status === 'completed') {
                         showMessage(result.message, 'success', importMessageContainer);
                         if (result.errors && result.errors.length > 0) {
                             // Display specific errors if any
@@ -1262,11 +1323,12 @@ document.addEventListener('DOMContentLoaded', function() {
                         }
                         window.dispatchEvent(new Event('workloadUpdated')); // Trigger global workload update
                     } else {
-                        showMessage(result.message || 'An error occurred during import.', 'error', importMessageContainer);
+                        showMessage(result.message || job.message || 'An error occurred during import.', 'error', importMessageContainer);
                     }
                 } catch (error) {
                     console.error('Error during import:', error);
-                    showMessage('Network error or server unavailable.', 'error', importMessageContainer);
+                    // fetch() rejects with a TypeError when the server cannot be reached
+                    showMessage(error instanceof TypeError ? 'Network error or server unavailable.' : error.message, 'error', importMessageContainer);
                 }
             });
         }
@@ -0,0 +1,66 @@
+from datetime import date, datetime
+
+import pandas as pd
+
+from import_engine import parse_actual_hours_frame
+
+
+COLUMN_MAPPING = {
+    'emp_name': 'Emp Name', 'project_name': 'Project Name', 'function_name': 'Function',
+    'week_days': 'Week Days', 'hours': 'Hours'
+}
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=['Emp Name', 'Project Name', 'Function', 'Week Days', 'Hours'])
+
+
+def test_row_messages_and_totals():
+    df = _frame([
+        ('Alice', 'Apollo', 'Dev', '2025-06-16', 10),
+        ('Alice', 'Apollo', 'Dev', date(2025, 6, 16), '7/2'),
+        ('Alice', 'Apollo', 'Dev', datetime(2025, 6, 16, 9, 30), '8 hrs'),
+        ('Bob', 'Apollo', 'QA', 'not a date', '7.5/2'),
+        ('Bob', 'Apollo', 'QA', '06/23/2025', '1/0'),
+        ('Bob', 'Apollo', 'QA', 45831, 4.9),  # Excel serial for 2025-06-23
+        ('Carol', 'Zeus', None, '13/04/2025', 200),
+        ('Carol', 'Zeus', 'Ops', 1e20, 'lots'),
+        (None, None, None, None, None),
+        ('Dave', 'Zeus', 'Ops', 'Jun 30, 2025', None),
+    ])
+    errors = []
+
+    totals = parse_actual_hours_frame(df, COLUMN_MAPPING, errors)
+
+    assert errors == [
+        "Row 5: Could not parse date 'not a date', using current date",
+        "Row 5: Could not parse hours '7.5/2', using default 8 hours",
+        "Row 6: Could not parse hours '1/0', using default 8 hours",
+        "Row 9: Date parsing failed, using current date",
+        "Row 9: Could not parse hours 'lots', using default 8 hours",
+    ]
+    today = datetime.now().date()
+    assert totals == {
+        ('Alice', 'Apollo', 'Dev', date(2025, 6, 16)): 10 + 3 + 8,
+        ('Bob', 'Apollo', 'QA', today): 8,
+        ('Bob', 'Apollo', 'QA', date(2025, 6, 23)): 8 + 4,
+        ('Carol', 'Zeus', 'General', date(2025, 4, 13)): 168,
+        ('Carol', 'Zeus', 'Ops', today): 8,
+        ('Dave', 'Zeus', 'Ops', date(2025, 6, 30)): 0,
+    }
+
+
+def test_blank_names_fall_back_to_row_labels():
+    df = _frame([
+        (None, 'Apollo', 'Dev', '2025-06-16', 5),
+        ('Alice', '', 'Dev', '2025-06-16', '6h'),
+    ])
+    errors = []
+
+    totals = parse_actual_hours_frame(df, COLUMN_MAPPING, errors)
+
+    assert errors == []
+    assert totals == {
+        ('Employee_1', 'Apollo', 'Dev', date(2025, 6, 16)): 5,
+        ('Alice', 'Project_2', 'Dev', date(2025, 6, 16)): 6,
+    }
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from datetime import date
+
+# app.py reads DATABASE_URL at import time, so point it at a scratch database first
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest
+
+from app import app, db, Assignment, Employee, Project, WeeklyHours
+from import_engine import upsert_actual_hours
+from reference_cache import invalidate_reference_data
+
+WEEK = date(2026, 10, 12)
+NEXT_WEEK = date(2026, 10, 19)
+
+
+@pytest.fixture
+def app_context():
+    with app.app_context():
+        db.create_all()
+        # Another module's database may have left its snapshot behind
+        invalidate_reference_data()
+        db.session.add(Employee(name='Ada', email='ada@example.com', role='Engineer'))
+        db.session.commit()
+        yield
+        db.session.remove()
+        db.drop_all()
+
+
+def _saved_hours():
+    return {
+        (row.assignment.employee.name, row.assignment.project.name, row.function_name, row.week_start_date): row.hours_worked
+        for row in WeeklyHours.query.all()
+    }
+
+
+def test_reimport_updates_only_changed_hours(app_context):
+    hours = {
+        ('Ada', 'Apollo', 'Dev', WEEK): 10,
+        ('Ada', 'Apollo', 'QA', WEEK): 4,
+        ('Ada', 'Zeus', 'Dev', NEXT_WEEK): 6,
+        ('Bob', 'Apollo', 'Dev', WEEK): 8,
+    }
+    errors = []
+
+    # Small chunks so the statements and commits are split across chunks as well
+    assert upsert_actual_hours(hours, errors, chunk_size=3) == 4
+    assert errors == [
+        "Created new employee 'Bob' (temp email: bob.temp@example.com).",
+        "Created new project 'Apollo'.",
+        "Created new project 'Zeus'.",
+        "Created new assignment for 'Ada' on 'Apollo'.",
+        "Created new assignment for 'Ada' on 'Zeus'.",
+        "Created new assignment for 'Bob' on 'Apollo'.",
+    ]
+    assert _saved_hours() == hours
+
+    # The same hours again: every row hits ON CONFLICT and none of them changes
+    errors = []
+    assert upsert_actual_hours(hours, errors, chunk_size=3) == 0
+    assert errors == []
+    assert _saved_hours() == hours
+
+    # One changed row and one new one: one update plus one insert
+    changed = dict(hours)
+    changed[('Ada', 'Apollo', 'QA', WEEK)] = 5
+    changed[('Bob', 'Apollo', 'Dev', NEXT_WEEK)] = 7
+    errors = []
+    assert upsert_actual_hours(changed, errors, chunk_size=3) == 2
+    assert errors == []
+    assert _saved_hours() == changed
+
+    assert Employee.query.count() == 2
+    assert Project.query.count() == 2
+    assert Assignment.query.count() == 3
+    assert WeeklyHours.query.count() == 5
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+# app.py reads DATABASE_URL at import time, so point it at a scratch database first
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest
+from sqlalchemy import event
+
+import pagination
+from app import app, db, Assignment, Employee, Project
+
+
+@pytest.fixture
+def client():
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+    yield client
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _add_projects(start, count):
+    with app.app_context():
+        for i in range(start, start + count):
+            employee = Employee(name=f'Employee {i}', email=f'employee{i}@example.com', role='Engineer')
+            project = Project(name=f'Project {i}', duration_months=12, start_month='January',
+                              start_year=2025, end_month='December', end_year=2025)
+            db.session.add_all([employee, project])
+            db.session.flush()
+            db.session.add(Assignment(employee_id=employee.id, project_id=project.id, assigned_hours_per_week=40,
+                                      assigned_start_month='January', assigned_start_year=2025,
+                                      assigned_end_month='December', assigned_end_year=2025))
+        db.session.commit()
+
+
+def _count_statements(client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Both calls pay for the total-count query, as a listing's first page does
+    pagination._count_cache.clear()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    return len(statements), response.get_json()
+
+
+def test_projects_list_runs_a_fixed_number_of_statements(client):
+    _add_projects(0, 10)
+    small_count, small_page = _count_statements(client, '/api/projects')
+    _add_projects(10, 10)
+    large_count, large_page = _count_statements(client, '/api/projects')
+
+    assert len(small_page) == 10
+    assert len(large_page) == 20
+    assert all(len(project['assignments']) == 1 for project in large_page)
+    assert large_count == small_count
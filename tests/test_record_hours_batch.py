@@ -0,0 +1,134 @@
+import os
+import tempfile
+from datetime import date
+
+# app.py reads DATABASE_URL at import time, so point it at a scratch database first
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest
+from sqlalchemy import event
+
+import import_engine
+from app import app, db, Assignment, Employee, Project, WeeklyHours
+from reference_cache import invalidate_reference_data
+
+WEEK = date(2026, 10, 12)
+NEXT_WEEK = date(2026, 10, 19)
+
+
+@pytest.fixture
+def client():
+    with app.app_context():
+        db.create_all()
+    # Another module's database may have left its snapshot behind
+    invalidate_reference_data()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+    yield client
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def data():
+    """Two employees and two projects; Ada works on Apollo and has 5 hours of Dev in WEEK."""
+    with app.app_context():
+        ada = Employee(name='Ada', email='ada@example.com', role='Engineer')
+        bob = Employee(name='Bob', email='bob@example.com', role='Engineer')
+        apollo = Project(name='Apollo', duration_months=12, start_month='January',
+                         start_year=2026, end_month='December', end_year=2026)
+        zeus = Project(name='Zeus', duration_months=12, start_month='January',
+                       start_year=2026, end_month='December', end_year=2026)
+        db.session.add_all([ada, bob, apollo, zeus])
+        db.session.flush()
+        assignment = Assignment(employee_id=ada.id, project_id=apollo.id, assigned_hours_per_week=40,
+                                assigned_start_month='January', assigned_start_year=2026,
+                                assigned_end_month='December', assigned_end_year=2026)
+        db.session.add(assignment)
+        db.session.flush()
+        existing = WeeklyHours(assignment_id=assignment.id, week_start_date=WEEK, hours_worked=5, function_name='Dev')
+        db.session.add(existing)
+        db.session.commit()
+        return {'ada': ada.id, 'bob': bob.id, 'apollo': apollo.id, 'zeus': zeus.id,
+                'assignment': assignment.id, 'existing': existing.id}
+
+
+def _entry(employee_id, project_id, week, hours, function_name='Dev'):
+    return {'employee_id': employee_id, 'project_id': project_id, 'week_start_date': week.isoformat(),
+            'hours_worked': hours, 'function_name': function_name}
+
+
+def _post_counting_commits(client, entries):
+    commits = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn: commits.append(conn)
+    event.listen(engine, 'commit', listener)
+    try:
+        response = client.post('/api/record_actual_hours/batch', json=entries)
+    finally:
+        event.remove(engine, 'commit', listener)
+    return response, len(commits)
+
+
+def test_mixed_batch_reports_each_entry(client, data):
+    entries = [
+        _entry(data['ada'], data['apollo'], WEEK, 7),
+        _entry(data['ada'], data['zeus'], WEEK, 3),
+        _entry(data['bob'], data['apollo'], NEXT_WEEK, 4, 'QA'),
+        _entry(data['bob'], data['apollo'], NEXT_WEEK, 6, 'QA'),
+        _entry(999, data['apollo'], WEEK, 8),
+        _entry(data['ada'], data['apollo'], WEEK, 8, ['x']),
+        _entry(data['ada'], data['apollo'], WEEK, 'lots'),
+        'not an object',
+    ]
+
+    response, commits = _post_counting_commits(client, entries)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == [200, 201, 409, 201, 404, 400, 400, 400]
+    assert [result['index'] for result in body['results']] == list(range(len(entries)))
+    assert (body['saved'], body['failed']) == (3, 5)
+    assert commits == 1
+
+    with app.app_context():
+        rows = {(row.assignment.employee_id, row.assignment.project_id, row.week_start_date, row.function_name): row
+                for row in WeeklyHours.query.all()}
+        assert len(rows) == 3
+        updated = rows[(data['ada'], data['apollo'], WEEK, 'Dev')]
+        created = rows[(data['ada'], data['zeus'], WEEK, 'Dev')]
+        last_wins = rows[(data['bob'], data['apollo'], NEXT_WEEK, 'QA')]
+        assert (updated.id, updated.hours_worked) == (data['existing'], 7)
+        assert created.hours_worked == 3
+        assert last_wins.hours_worked == 6
+        # The missing Ada/Zeus and Bob/Apollo assignments were created once each
+        assert Assignment.query.count() == 3
+
+    results = body['results']
+    assert (results[0]['id'], results[0]['record']) == (updated.id, 7)
+    assert (results[1]['id'], results[1]['record']) == (created.id, 3)
+    assert (results[3]['id'], results[3]['record']) == (last_wins.id, 6)
+    assert all('id' not in result for result in results[4:])
+    assert results[5]['message'] == "Invalid function name. It must be text."
+
+
+def test_failed_batch_saves_nothing(client, data, monkeypatch):
+    def fail(employee_ids):
+        raise RuntimeError('monthly_load is locked')
+
+    monkeypatch.setattr(import_engine, 'refresh_monthly_load', fail)
+    entries = [
+        _entry(data['ada'], data['apollo'], WEEK, 7),
+        _entry(data['ada'], data['zeus'], WEEK, 3),
+    ]
+
+    response = client.post('/api/record_actual_hours/batch', json=entries)
+
+    assert response.status_code == 500
+    with app.app_context():
+        assert [(row.id, row.hours_worked) for row in WeeklyHours.query.all()] == [(data['existing'], 5)]
+        assert Assignment.query.count() == 1
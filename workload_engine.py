@@ -0,0 +1,150 @@
+import calendar
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+
+# Assignments are planned in whole months at this many weeks each.
+WEEKS_PER_MONTH = 4
+
+MONTH_NUMBERS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+
+def month_index(year, month):
+    """Months since year 0, so month ranges compare as plain integers."""
+    return year * 12 + month - 1
+
+
+def month_start_date(month_name, year):
+    """First day of e.g. ('March', 2025); None when the month name or year is invalid."""
+    try:
+        return date(int(year), MONTH_NUMBERS[month_name], 1)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def month_end_date(month_name, year):
+    """Last day of e.g. ('March', 2025); None when the month name or year is invalid."""
+    start = month_start_date(month_name, year)
+    if start is None:
+        return None
+    return date(start.year, start.month, calendar.monthrange(start.year, start.month)[1])
+
+
+def load_assignments(employee_ids=None, first_month=None, last_month=None):
+    """Assignments as columns: id, employee_id, hours_per_week and the first/last
+    month index they cover, read from the native period date columns.
+
+    When a month window is given, only assignments overlapping it are read, with an
+    indexed range predicate on the period dates. Assignments without period dates
+    (unrecognized month names) are skipped.
+    """
+    from app import db, Assignment
+
+    stmt = select(
+        Assignment.id, Assignment.employee_id, Assignment.assigned_hours_per_week,
+        Assignment.assigned_start_date, Assignment.assigned_end_date
+    ).where(Assignment.assigned_start_date.isnot(None), Assignment.assigned_end_date.isnot(None))
+    if employee_ids is not None:
+        stmt = stmt.where(Assignment.employee_id.in_(employee_ids))
+    if last_month is not None:
+        year, month0 = divmod(last_month, 12)
+        stmt = stmt.where(Assignment.assigned_start_date <= month_end_date(calendar.month_name[month0 + 1], year))
+    if first_month is not None:
+        year, month0 = divmod(first_month, 12)
+        stmt = stmt.where(Assignment.assigned_end_date >= date(year, month0 + 1, 1))
+    frame = pd.DataFrame(db.session.execute(stmt).all(), columns=[
+        'id', 'employee_id', 'hours_per_week', 'start_date', 'end_date'
+    ])
+
+    start = pd.to_datetime(frame['start_date'])
+    end = pd.to_datetime(frame['end_date'])
+    return pd.DataFrame({
+        'id': frame['id'].astype('int64'),
+        'employee_id': frame['employee_id'].astype('int64'),
+        'hours_per_week': frame['hours_per_week'].astype('int64'),
+        'first': (start.dt.year * 12 + start.dt.month - 1).astype('int64'),
+        'last': (end.dt.year * 12 + end.dt.month - 1).astype('int64')
+    })
+
+
+def load_weekly_hours(employee_ids=None):
+    """Weekly hours as columns: assignment_id, month index of the week start, hours_worked."""
+    from app import db, Assignment, WeeklyHours
+
+    stmt = select(WeeklyHours.assignment_id, WeeklyHours.week_start_date, WeeklyHours.hours_worked)
+    if employee_ids is not None:
+        stmt = stmt.join(Assignment).where(Assignment.employee_id.in_(employee_ids))
+    frame = pd.DataFrame(db.session.execute(stmt).all(), columns=['assignment_id', 'week_start_date', 'hours_worked'])
+
+    week_start = pd.to_datetime(frame['week_start_date'])
+    return pd.DataFrame({
+        'assignment_id': frame['assignment_id'].astype('int64'),
+        'month': (week_start.dt.year * 12 + week_start.dt.month - 1).astype('int64'),
+        'hours_worked': frame['hours_worked'].astype('int64')
+    })
+
+
+def monthly_hours(assignments, weekly_hours, first_month=None, last_month=None):
+    """Assigned and actual hours per (employee_id, month index).
+
+    Every assignment adds hours_per_week * WEEKS_PER_MONTH to each month it covers;
+    actual hours are the weekly hours booked in a month against an assignment
+    covering that month. Assignment ranges are expanded with np.repeat rather than
+    a loop, and the weekly hours are bucketed with one groupby. Only months in
+    [first_month, last_month] are produced when either bound is given.
+
+    Returns a DataFrame indexed by (employee_id, month) with integer
+    assigned_hours and actual_hours columns; months with neither are absent.
+    """
+    first = assignments['first'].to_numpy()
+    last = assignments['last'].to_numpy()
+    if first_month is not None:
+        first = np.maximum(first, first_month)
+    if last_month is not None:
+        last = np.minimum(last, last_month)
+
+    # Expand each [first, last] range into one row per covered month
+    lengths = np.clip(last - first + 1, 0, None)
+    total = int(lengths.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    assigned = pd.DataFrame({
+        'employee_id': np.repeat(assignments['employee_id'].to_numpy(), lengths),
+        'month': np.repeat(first, lengths) + offsets,
+        'assigned_hours': np.repeat(assignments['hours_per_week'].to_numpy() * WEEKS_PER_MONTH, lengths)
+    }).groupby(['employee_id', 'month'])['assigned_hours'].sum()
+
+    # Weekly hours count only inside their assignment's (original, unclipped) range
+    booked = weekly_hours.merge(
+        assignments[['id', 'employee_id', 'first', 'last']], left_on='assignment_id', right_on='id'
+    )
+    in_range = (booked['month'] >= booked['first']) & (booked['month'] <= booked['last'])
+    if first_month is not None:
+        in_range &= booked['month'] >= first_month
+    if last_month is not None:
+        in_range &= booked['month'] <= last_month
+    actual = booked[in_range].groupby(['employee_id', 'month'])['hours_worked'].sum().rename('actual_hours')
+
+    result = pd.concat([assigned, actual], axis=1).fillna(0).astype('int64')
+    result.index.names = ['employee_id', 'month']
+    return result
+
+
+def workload_matrix(hours, employee_ids, months):
+    """Dense (len(employee_ids) x len(months)) assigned/actual arrays from monthly_hours() output."""
+    index = pd.MultiIndex.from_product([list(employee_ids), list(months)], names=['employee_id', 'month'])
+    dense = hours.reindex(index, fill_value=0)
+    shape = (len(employee_ids), len(months))
+    return (
+        dense['assigned_hours'].to_numpy().reshape(shape),
+        dense['actual_hours'].to_numpy().reshape(shape)
+    )
+
+
+def monthly_load_percentages(assigned, actual, normal_weekly_hours=40):
+    """The load shown per month (actual hours when any were booked, else assigned)
+    and its percentage of a normal month."""
+    load = np.where(actual > 0, actual, assigned)
+    hours_per_month = normal_weekly_hours * WEEKS_PER_MONTH
+    return load, load / hours_per_month * 100 if hours_per_month > 0 else np.zeros(load.shape)
@@ -0,0 +1,241 @@
+import tempfile
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from sqlalchemy import func, select
+from exports import EXPORT_SPOOL_BYTES
+
+
+# Weekly hours above this are 'Overloaded', below it 'Free'.
+NORMAL_HOURS_PER_WEEK = 40
+
+FIXED_REPORT_COLUMNS = ['S.No.', 'Employee Name']
+
+# Format of each hours cell, chosen per cell by hours_formats()
+_BOLD, _GREY, _RED, _ORANGE, _GREEN = range(5)
+
+
+def weekly_totals(start_date=None, end_date=None, employee_ids=None, project_ids=None, function_name=None):
+    """Hours worked per (employee name, week start date), summed in SQL.
+
+    Every filter is optional and applied in the WHERE clause: weeks starting in
+    [start_date, end_date], assignments of the given employees and projects, and
+    hours booked against one function.
+
+    Returns a DataFrame with employee, week_start_date and hours columns.
+    """
+    from app import db, Assignment, Employee, Project, WeeklyHours
+
+    stmt = (
+        select(Employee.name, WeeklyHours.week_start_date, func.sum(WeeklyHours.hours_worked))
+        .select_from(WeeklyHours)
+        .join(Assignment, WeeklyHours.assignment_id == Assignment.id)
+        .join(Employee, Assignment.employee_id == Employee.id)
+        .join(Project, Assignment.project_id == Project.id)
+        .group_by(Employee.name, WeeklyHours.week_start_date)
+    )
+    if start_date is not None:
+        stmt = stmt.where(WeeklyHours.week_start_date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(WeeklyHours.week_start_date <= end_date)
+    if employee_ids:
+        stmt = stmt.where(Assignment.employee_id.in_(employee_ids))
+    if project_ids:
+        stmt = stmt.where(Assignment.project_id.in_(project_ids))
+    if function_name:
+        stmt = stmt.where(WeeklyHours.function_name == function_name)
+    return pd.DataFrame(db.session.execute(stmt).all(), columns=['employee', 'week_start_date', 'hours'])
+
+
+def week_workload(week_start_date, employee_ids=None):
+    """Each employee's hours in the week starting on `week_start_date` (a Monday),
+    broken down by project and function, with the week's status.
+
+    The hours come from one grouped query; names come from the reference cache.
+    Employees without hours that week are included with 0 hours ('Free').
+    `employee_ids` limits the result to those employees.
+    """
+    from app import db, Assignment, WeeklyHours
+    from reference_cache import get_reference_data
+
+    stmt = (
+        select(Assignment.employee_id, Assignment.project_id, WeeklyHours.function_name,
+               func.sum(WeeklyHours.hours_worked))
+        .select_from(WeeklyHours)
+        .join(Assignment, WeeklyHours.assignment_id == Assignment.id)
+        .where(WeeklyHours.week_start_date >= week_start_date,
+               WeeklyHours.week_start_date <= week_start_date + timedelta(days=6))
+        .group_by(Assignment.employee_id, Assignment.project_id, WeeklyHours.function_name)
+    )
+    if employee_ids is not None:
+        stmt = stmt.where(Assignment.employee_id.in_(employee_ids))
+
+    reference_data = get_reference_data()
+    by_employee = {}
+    for employee_id, project_id, function_name, hours in db.session.execute(stmt):
+        projects = by_employee.setdefault(employee_id, {})
+        project = projects.get(project_id)
+        if project is None:
+            project_ref = reference_data.project(project_id)
+            project = projects[project_id] = {
+                'project_id': project_id,
+                'project_name': project_ref.name if project_ref else None,
+                'hours': 0,
+                'functions': []
+            }
+        project['hours'] += int(hours or 0)
+        project['functions'].append({'function_name': function_name or 'General', 'hours': int(hours or 0)})
+
+    if employee_ids is None:
+        employees = list(reference_data.employees.values())
+    else:
+        employees = [reference_data.employee(employee_id) for employee_id in employee_ids]
+    employees = sorted((employee for employee in employees if employee), key=lambda employee: (employee.name, employee.id))
+
+    totals = np.array([
+        sum(project['hours'] for project in by_employee.get(employee.id, {}).values()) for employee in employees
+    ], dtype='float64')
+    statuses = weekly_status(totals)
+    result = []
+    for employee, total, status in zip(employees, totals, statuses):
+        projects = sorted(by_employee.get(employee.id, {}).values(), key=lambda project: project['project_name'] or '')
+        for project in projects:
+            project['functions'].sort(key=lambda function: function['function_name'])
+        result.append({
+            'employee_id': employee.id,
+            'employee_name': employee.name,
+            'role': employee.role,
+            'total_hours': int(total),
+            'status': str(status),
+            'projects': projects
+        })
+    return result
+
+
+def week_header(week_start_date):
+    """'WK12 (Mar 17 - Mar 23)' for the week starting on `week_start_date`."""
+    week_end_date = week_start_date + timedelta(days=6)
+    return (
+        f"WK{week_start_date.isocalendar()[1]} "
+        f"({week_start_date.strftime('%b %d')} - {week_end_date.strftime('%b %d')})"
+    )
+
+
+def weekly_status(hours):
+    """'Overloaded' / 'Free' / 'Normal' against NORMAL_HOURS_PER_WEEK; '' where hours is NaN."""
+    return np.select(
+        [hours > NORMAL_HOURS_PER_WEEK, hours < NORMAL_HOURS_PER_WEEK, hours == NORMAL_HOURS_PER_WEEK],
+        ['Overloaded', 'Free', 'Normal'], ''
+    )
+
+
+def hours_formats(hours):
+    """Format code per hours cell: grey when blank or 0, red when overloaded, orange
+    when partly free, green at exactly the normal hours, plain bold otherwise."""
+    return np.select(
+        [
+            np.isnan(hours),
+            hours > NORMAL_HOURS_PER_WEEK,
+            (hours > 0) & (hours < NORMAL_HOURS_PER_WEEK),
+            hours == NORMAL_HOURS_PER_WEEK,
+            hours == 0,
+        ],
+        [_GREY, _RED, _ORANGE, _GREEN, _GREY], _BOLD
+    )
+
+
+def write_workload_report(totals, split_by_quarter=False):
+    """Writes the weekly actual hours report (one row per employee, an hours and a
+    status column per week) and returns the .xlsx file rewound.
+
+    `totals` is weekly_totals() output. With `split_by_quarter` each calendar
+    quarter (by week start date) gets its own sheet, so long ranges stay narrow.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+    formats = {
+        'header': workbook.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#4F81BD', 'align': 'center', 'valign': 'vcenter'}),
+        'sub_header': workbook.add_format({'bold': True, 'align': 'center'}),
+        _BOLD: workbook.add_format({'bold': True}),
+        _GREY: workbook.add_format({'bold': True, 'bg_color': '#F2F2F2', 'font_color': '#666666'}),
+        _RED: workbook.add_format({'bold': True, 'bg_color': '#FFC7CE', 'font_color': '#9C0006'}),
+        _ORANGE: workbook.add_format({'bold': True, 'bg_color': '#FFEB9C', 'font_color': '#9C6500'}),
+        _GREEN: workbook.add_format({'bold': True, 'bg_color': '#C6EFCE', 'font_color': '#006100'}),
+    }
+
+    if split_by_quarter:
+        quarters = totals['week_start_date'].map(lambda day: (day.year, (day.month - 1) // 3 + 1))
+        for (year, quarter), quarter_totals in totals.groupby(quarters):
+            _write_report_sheet(workbook, formats, f'Actual Hours Q{quarter} {year}', quarter_totals)
+    else:
+        _write_report_sheet(workbook, formats, 'Actual Hours Report', totals)
+
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def _write_report_sheet(workbook, formats, sheet_name, totals):
+    """Adds one report sheet for `totals`.
+
+    The totals are pivoted once into an employee x week matrix; statuses, cell
+    formats, headers and column widths are computed per column or per week up
+    front, and the sheet is then written row by row (constant_memory mode).
+    """
+    matrix = totals.pivot_table(index='employee', columns='week_start_date', values='hours', aggfunc='sum')
+    employees = matrix.index.tolist()
+    week_start_dates = matrix.columns.tolist()
+    hours = matrix.to_numpy(dtype='float64')
+    statuses = weekly_status(hours)
+    cell_formats = hours_formats(hours)
+    hours_text = np.where(np.isnan(hours), '', np.nan_to_num(hours).astype('int64').astype(str))
+    headers = [week_header(week_start_date) for week_start_date in week_start_dates]
+
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = formats['header']
+    sub_header_format = formats['sub_header']
+    bold_text_format = formats[_BOLD]
+
+    # Column widths from the longest header or value in each column
+    fixed_columns = len(FIXED_REPORT_COLUMNS)
+    worksheet.set_column(0, 0, max(len('S.No.'), len(str(len(employees)))) + 2)
+    worksheet.set_column(1, 1, max([len('Employee Name')] + [len(name) for name in employees]) + 2)
+    longest_hours = np.char.str_len(hours_text).max(axis=0) if employees else []
+    longest_status = np.char.str_len(statuses.astype(str)).max(axis=0) if employees else []
+    for week, header in enumerate(headers):
+        col = fixed_columns + week * 2
+        worksheet.set_column(col, col, max(len(header), len('Working Hours'), int(longest_hours[week])) + 2)
+        worksheet.set_column(col + 1, col + 1, max(len(header), len('Status'), int(longest_status[week])) + 2)
+
+    for col, name in enumerate(FIXED_REPORT_COLUMNS):
+        worksheet.write(0, col, name, header_format)
+    for week, header in enumerate(headers):
+        col = fixed_columns + week * 2
+        worksheet.merge_range(0, col, 0, col + 1, header, header_format)
+    for col in range(fixed_columns):
+        worksheet.write_blank(1, col, None, sub_header_format)
+    for week in range(len(headers)):
+        col = fixed_columns + week * 2
+        worksheet.write(1, col, "Working Hours", sub_header_format)
+        worksheet.write(1, col + 1, "Status", sub_header_format)
+
+    for r_idx, employee_name in enumerate(employees):
+        row = r_idx + 2
+        worksheet.write(row, 0, r_idx + 1, bold_text_format)
+        worksheet.write(row, 1, employee_name, bold_text_format)
+        row_hours = hours[r_idx]
+        row_statuses = statuses[r_idx]
+        row_formats = cell_formats[r_idx]
+        col = fixed_columns
+        for week in range(len(headers)):
+            cell_format = formats[row_formats[week]]
+            if np.isnan(row_hours[week]):
+                worksheet.write_blank(row, col, None, cell_format)
+                worksheet.write_blank(row, col + 1, None, bold_text_format)
+            else:
+                worksheet.write_number(row, col, int(row_hours[week]), cell_format)
+                worksheet.write_string(row, col + 1, row_statuses[week], bold_text_format)
+            col += 2
+
+    worksheet.freeze_panes(2, fixed_columns)